@@ -0,0 +1,227 @@
+from typing import Any, Optional
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from .export import to_sparse_adjacency
+
+
+def _grant_matrix(graph: nx.Graph, weight: str = "amount"):
+    matrix, nodes = to_sparse_adjacency(graph, weight=weight, label="GrantFunded")
+    return matrix, nodes, {node: i for i, node in enumerate(nodes)}
+
+
+def _names(graph: nx.Graph, nodes: list) -> list[Optional[str]]:
+    return [graph.nodes[node].get("name") for node in nodes]
+
+
+def _source_index(index: dict[Any, int], source) -> int:
+    if source not in index:
+        raise KeyError(f"{source} is not in the graph")
+    return index[source]
+
+
+def propagate_flow(
+    graph: nx.Graph,
+    source,
+    decay: float = 1.0,
+    max_depth: int = 10,
+    min_flow: float = 1.0,
+) -> pd.DataFrame:
+    """
+    Trace the dollars that flow downstream from a funder.
+
+    The source's grants are followed level by level. Each recipient passes on
+    the money it received in proportion to its own grants, but never more
+    than it actually granted, and each level is multiplied by `decay`. This
+    attributes downstream grants to the source rather than just summing every
+    grant that is reachable from it.
+
+    Arguments:
+        graph (nx.Graph): A grant network.
+        source: The EIN of the funder.
+        decay (float): The fraction of attributed money that survives each
+            additional level (1.0 for no decay).
+        max_depth (int): The number of levels to follow.
+        min_flow (float): Stop once less than this many dollars are still
+            flowing.
+
+    Returns:
+        pd.DataFrame: Indexed by EIN, with the `name` of each organization
+            the money reaches, the `depth` at which it is first reached, and
+            the attributed `flow` it receives, largest flow first.
+    """
+    matrix, nodes, index = _grant_matrix(graph)
+    granted = np.asarray(matrix.sum(axis=1)).ravel()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inverse_granted = np.where(granted > 0, 1.0 / granted, 0.0)
+
+    n = len(nodes)
+    flow = np.zeros(n)
+    depth = np.full(n, -1)
+    level = np.zeros(n)
+    level[_source_index(index, source)] = granted[index[source]]
+    for d in range(1, max_depth + 1):
+        # The share of each node's received money that it passes on, spread
+        # over its recipients in proportion to its grants
+        passed = np.minimum(level, granted) * inverse_granted
+        level = matrix.T @ passed
+        if d > 1:
+            level *= decay
+        if level.sum() < min_flow:
+            break
+        flow += level
+        depth[(depth < 0) & (level > 0)] = d
+
+    reached = np.flatnonzero(depth > 0)
+    reached_nodes = [nodes[i] for i in reached]
+    result = pd.DataFrame(
+        {
+            "name": _names(graph, reached_nodes),
+            "depth": depth[reached],
+            "flow": flow[reached],
+        },
+        index=pd.Index(reached_nodes, name="ein"),
+    )
+    return result.sort_values("flow", ascending=False)
+
+
+def depth_totals(
+    graph: nx.Graph, source, max_depth: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Aggregate the grants made at each level below a funder.
+
+    Arguments:
+        graph (nx.Graph): A grant network.
+        source: The EIN of the funder.
+        max_depth (int): The number of levels to aggregate. Defaults to every
+            level reachable from the source.
+
+    Returns:
+        pd.DataFrame: Indexed by depth (1 for the source's own grants), with
+            the number of `organizations` first reached at that depth, and
+            the number and total `amount` of the `grants` made by the
+            organizations one level above.
+    """
+    matrix, nodes, index = _grant_matrix(graph)
+    counts, _ = to_sparse_adjacency(graph, weight=None, label="GrantFunded")
+
+    frontier = np.zeros(len(nodes), dtype=bool)
+    frontier[_source_index(index, source)] = True
+    reached = frontier.copy()
+    rows = []
+    depth = 0
+    while frontier.any() and (max_depth is None or depth < max_depth):
+        depth += 1
+        weights = frontier.astype(np.float64)
+        grants = counts.T @ weights
+        amount = matrix.T @ weights
+        if not grants.any():
+            break
+        frontier = (grants > 0) & ~reached
+        reached |= frontier
+        rows.append(
+            {
+                "depth": depth,
+                "organizations": int(frontier.sum()),
+                "grants": int(grants.sum()),
+                "amount": float(amount.sum()),
+            }
+        )
+    return pd.DataFrame(
+        rows, columns=["depth", "organizations", "grants", "amount"]
+    ).set_index("depth")
+
+
+def weighted_pagerank(
+    graph: nx.Graph,
+    alpha: float = 0.85,
+    weight: str = "amount",
+    max_iter: int = 100,
+    tol: float = 1.0e-6,
+) -> pd.DataFrame:
+    """
+    Compute an amount-weighted PageRank of the organizations in a grant
+    network by sparse power iteration. Organizations that make no grants
+    spread their rank evenly, as in `nx.pagerank`.
+
+    Arguments:
+        graph (nx.Graph): A grant network.
+        alpha (float): The damping factor.
+        weight (str): The edge attribute to weight grants by.
+        max_iter (int): The maximum number of iterations.
+        tol (float): The convergence tolerance, per node.
+
+    Returns:
+        pd.DataFrame: Indexed by EIN, with `name` and `pagerank`, highest
+            rank first.
+    """
+    matrix, nodes, _ = _grant_matrix(graph, weight=weight)
+    n = len(nodes)
+    if n == 0:
+        return pd.DataFrame(columns=["name", "pagerank"])
+    granted = np.asarray(matrix.sum(axis=1)).ravel()
+    dangling = granted == 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inverse_granted = np.where(dangling, 0.0, 1.0 / granted)
+    transition = matrix.T.tocsr()
+
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        previous = rank
+        rank = (
+            alpha
+            * (transition @ (previous * inverse_granted) + previous[dangling].sum() / n)
+            + (1 - alpha) / n
+        )
+        if np.abs(rank - previous).sum() < n * tol:
+            break
+    result = pd.DataFrame(
+        {"name": _names(graph, nodes), "pagerank": rank},
+        index=pd.Index(nodes, name="ein"),
+    )
+    return result.sort_values("pagerank", ascending=False)
+
+
+def flow_summary(graph: nx.Graph) -> pd.DataFrame:
+    """
+    Summarize how much each organization in a grant network receives and
+    grants. `pass_through` is the smaller of the two, which ranks the
+    intermediaries that move the most money.
+
+    Returns:
+        pd.DataFrame: Indexed by EIN, with `name`, `received`, `granted` and
+            `pass_through`, largest pass-through first.
+    """
+    matrix, nodes, _ = _grant_matrix(graph)
+    received = np.asarray(matrix.sum(axis=0)).ravel()
+    granted = np.asarray(matrix.sum(axis=1)).ravel()
+    result = pd.DataFrame(
+        {
+            "name": _names(graph, nodes),
+            "received": received,
+            "granted": granted,
+            "pass_through": np.minimum(received, granted),
+        },
+        index=pd.Index(nodes, name="ein"),
+    )
+    return result.sort_values("pass_through", ascending=False)
+
+
+def top_intermediaries(graph: nx.Graph, n: int = 10) -> pd.DataFrame:
+    """
+    The `n` organizations that pass the most money through to others.
+    """
+    summary = flow_summary(graph)
+    return summary[summary["pass_through"] > 0].head(n)
+
+
+__all__ = [
+    "depth_totals",
+    "flow_summary",
+    "propagate_flow",
+    "top_intermediaries",
+    "weighted_pagerank",
+]
@@ -0,0 +1,356 @@
+import math
+from array import array
+from collections.abc import MutableMapping
+from typing import Any, Iterable, Iterator, Optional
+
+import networkx as nx
+import numpy as np
+
+from .utils import as_amount
+
+# Node attributes stored in columns; every other node attribute (the filing
+# handle, object_id, ...) is kept in a per-node dictionary.
+_NODE_FLOAT_COLUMNS = ("net_assets", "revenue", "expenses")
+
+_NO_CODE = -1
+
+
+def _from_float(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+class _Interner:
+    """
+    Dictionary-encodes hashable values as consecutive integer codes.
+    """
+
+    def __init__(self):
+        self.values: list = []
+        self.codes: dict[Any, int] = {}
+
+    def code(self, value) -> int:
+        if value is None:
+            return _NO_CODE
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+    def value(self, code: int):
+        return None if code == _NO_CODE else self.values[code]
+
+
+class _NodeAttributes(MutableMapping):
+    """
+    A dict-like view of one node's attributes, reading and writing the
+    graph's columns.
+    """
+
+    __slots__ = ("_graph", "_i")
+
+    def __init__(self, graph: "ArrayGraph", i: int):
+        self._graph = graph
+        self._i = i
+
+    def __getitem__(self, key):
+        value = self._graph._node_value(self._i, key)
+        if value is None and key not in self:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._graph._set_node_value(self._i, key, value)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._graph._set_node_value(self._i, key, None)
+        self._graph._node_extra.get(self._i, {}).pop(key, None)
+
+    def _keys(self) -> list[str]:
+        graph, i = self._graph, self._i
+        keys = [
+            key
+            for key in ("name", "__labels__", *_NODE_FLOAT_COLUMNS)
+            if graph._node_value(i, key) is not None
+        ]
+        return keys + list(graph._node_extra.get(i, {}))
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class _NodeView:
+    """
+    The subset of networkx's `graph.nodes` that the builders use.
+    """
+
+    def __init__(self, graph: "ArrayGraph"):
+        self._graph = graph
+
+    def __call__(self, data: bool = False):
+        if not data:
+            return iter(self)
+        graph = self._graph
+        return (
+            (ein, _NodeAttributes(graph, i)) for i, ein in enumerate(graph._eins.values)
+        )
+
+    def __getitem__(self, ein) -> _NodeAttributes:
+        return _NodeAttributes(self._graph, self._graph._eins.codes[ein])
+
+    def __contains__(self, ein) -> bool:
+        return ein in self._graph
+
+    def __iter__(self):
+        return iter(self._graph._eins.values)
+
+    def __len__(self) -> int:
+        return len(self._graph)
+
+
+class ArrayGraph:
+    """
+    A compact directed multigraph stored in columns.
+
+    EINs are interned to integer ids, and edges are stored as growable arrays
+    of source and target ids, float amounts, years, and integer codes for
+    labels and (dictionary-encoded) memos, rather than as a Python dict per
+    edge. This makes crawls with millions of grants affordable in memory.
+
+    It supports the part of the `nx.MultiDiGraph` API that the network
+    builders use; call `to_networkx()` for everything else.
+    """
+
+    def __init__(self):
+        self.graph: dict[str, Any] = {}
+        self._eins = _Interner()
+        self._labels = _Interner()
+        self._memos = _Interner()
+        # Node columns
+        self._node_names: list[Optional[str]] = []
+        self._node_labels = array("i")
+        self._node_floats = {column: array("d") for column in _NODE_FLOAT_COLUMNS}
+        self._node_extra: dict[int, dict[str, Any]] = {}
+        # Edge columns
+        self._sources = array("i")
+        self._targets = array("i")
+        self._edge_labels = array("i")
+        self._amounts = array("d")
+        self._memo_codes = array("i")
+        self._years = array("i")
+        self._alive = array("b")
+        self._out: dict[int, array] = {}
+        self._edge_count = 0
+
+    @classmethod
+    def from_networkx(cls, graph: nx.Graph) -> "ArrayGraph":
+        """
+        Copy a networkx graph into a new ArrayGraph.
+        """
+        array_graph = cls()
+        array_graph.graph.update(graph.graph)
+        for node, data in graph.nodes(data=True):
+            array_graph.add_node(node, **data)
+        for u, v, data in graph.edges(data=True):
+            array_graph.add_edge(u, v, **data)
+        return array_graph
+
+    def to_networkx(self) -> nx.MultiDiGraph:
+        """
+        Build an `nx.MultiDiGraph` with the same nodes, edges and attributes.
+        """
+        graph = nx.MultiDiGraph()
+        graph.graph.update(self.graph)
+        graph.add_nodes_from((ein, dict(data)) for ein, data in self.nodes(data=True))
+        graph.add_edges_from(self.edges(data=True))
+        return graph
+
+    def is_directed(self) -> bool:
+        return True
+
+    def is_multigraph(self) -> bool:
+        return True
+
+    def __contains__(self, ein) -> bool:
+        return ein in self._eins.codes
+
+    def __len__(self) -> int:
+        return len(self._eins.values)
+
+    def __iter__(self):
+        return iter(self._eins.values)
+
+    def number_of_nodes(self) -> int:
+        return len(self)
+
+    def number_of_edges(self) -> int:
+        return self._edge_count
+
+    @property
+    def nodes(self) -> _NodeView:
+        return _NodeView(self)
+
+    def _label_code(self, labels) -> int:
+        if not labels:
+            return _NO_CODE
+        return self._labels.code(frozenset(labels))
+
+    def _node_id(self, ein) -> int:
+        i = self._eins.codes.get(ein)
+        if i is None:
+            i = self._eins.code(ein)
+            self._node_names.append(None)
+            self._node_labels.append(_NO_CODE)
+            for column in self._node_floats.values():
+                column.append(math.nan)
+        return i
+
+    def _node_value(self, i: int, key: str):
+        if key == "name":
+            return self._node_names[i]
+        if key == "__labels__":
+            labels = self._labels.value(self._node_labels[i])
+            return None if labels is None else set(labels)
+        if key in self._node_floats:
+            return _from_float(self._node_floats[key][i])
+        return self._node_extra.get(i, {}).get(key)
+
+    def _set_node_value(self, i: int, key: str, value):
+        if key == "name":
+            self._node_names[i] = value
+        elif key == "__labels__":
+            self._node_labels[i] = self._label_code(value)
+        elif key in self._node_floats:
+            self._node_floats[key][i] = as_amount(value, default=math.nan)
+        else:
+            self._node_extra.setdefault(i, {})[key] = value
+
+    def add_node(self, ein, **attributes):
+        i = self._node_id(ein)
+        for key, value in attributes.items():
+            self._set_node_value(i, key, value)
+
+    def add_edge(self, u, v, **attributes) -> int:
+        """
+        Add an edge, returning its key. Only the `amount`, `memo`, `year` and
+        `__labels__` attributes are kept.
+        """
+        source, target = self._node_id(u), self._node_id(v)
+        key = len(self._sources)
+        self._sources.append(source)
+        self._targets.append(target)
+        self._edge_labels.append(self._label_code(attributes.get("__labels__")))
+        self._amounts.append(as_amount(attributes.get("amount"), default=math.nan))
+        self._memo_codes.append(self._memos.code(attributes.get("memo")))
+        year = attributes.get("year")
+        self._years.append(_NO_CODE if year is None else int(year))
+        self._alive.append(1)
+        self._out.setdefault(source, array("i")).append(key)
+        self._edge_count += 1
+        return key
+
+    def _edge_data(self, key: int) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "amount": _from_float(self._amounts[key]),
+            "memo": self._memos.value(self._memo_codes[key]),
+        }
+        if self._years[key] != _NO_CODE:
+            data["year"] = self._years[key]
+        labels = self._labels.value(self._edge_labels[key])
+        if labels is not None:
+            data["__labels__"] = set(labels)
+        return data
+
+    def _out_keys(self, source: int) -> Iterator[int]:
+        return (key for key in self._out.get(source, ()) if self._alive[key])
+
+    def edges(self, data: bool = False):
+        eins = self._eins.values
+        for key in range(len(self._sources)):
+            if not self._alive[key]:
+                continue
+            u, v = eins[self._sources[key]], eins[self._targets[key]]
+            yield (u, v, self._edge_data(key)) if data else (u, v)
+
+    def out_edges(self, ein, keys: bool = False, data: bool | str = False):
+        source = self._eins.codes.get(ein)
+        if source is None:
+            return
+        for key in self._out_keys(source):
+            edge = (ein, self._eins.values[self._targets[key]])
+            if keys:
+                edge += (key,)
+            if data is True:
+                edge += (self._edge_data(key),)
+            elif data:
+                edge += (self._edge_data(key).get(data),)
+            yield edge
+
+    def has_edge(self, u, v) -> bool:
+        source, target = self._eins.codes.get(u), self._eins.codes.get(v)
+        if source is None or target is None:
+            return False
+        return any(self._targets[key] == target for key in self._out_keys(source))
+
+    def __getitem__(self, ein) -> dict[Any, dict[int, dict[str, Any]]]:
+        source = self._eins.codes[ein]
+        adjacency: dict[Any, dict[int, dict[str, Any]]] = {}
+        for key in self._out_keys(source):
+            target = self._eins.values[self._targets[key]]
+            adjacency.setdefault(target, {})[key] = self._edge_data(key)
+        return adjacency
+
+    def remove_edges_from(self, edges: Iterable[tuple]):
+        """
+        Remove edges given as (u, v, key) tuples.
+        """
+        for _, _, key in edges:
+            if self._alive[key]:
+                self._alive[key] = 0
+                self._edge_count -= 1
+
+    def to_sparse_adjacency(
+        self, weight: Optional[str] = "amount", label: Optional[str] = "GrantFunded"
+    ):
+        """
+        Build a SciPy CSR adjacency matrix directly from the edge columns.
+        See `export.to_sparse_adjacency`.
+        """
+        from scipy import sparse
+
+        if weight not in (None, "amount"):
+            raise ValueError(
+                f"ArrayGraph can only weight edges by amount, not {weight}"
+            )
+        mask = np.frombuffer(self._alive, dtype=np.int8).astype(bool)
+        if label is not None:
+            codes = [
+                code
+                for code, labels in enumerate(self._labels.values)
+                if label in labels
+            ]
+            mask &= np.isin(np.frombuffer(self._edge_labels, dtype=np.int32), codes)
+        rows = np.frombuffer(self._sources, dtype=np.int32)[mask]
+        cols = np.frombuffer(self._targets, dtype=np.int32)[mask]
+        if weight is None:
+            values = np.ones(len(rows))
+        else:
+            values = np.nan_to_num(np.frombuffer(self._amounts, dtype=np.float64)[mask])
+        n = len(self)
+        matrix = sparse.coo_matrix((values, (rows, cols)), shape=(n, n)).tocsr()
+        return matrix, list(self._eins.values)
+
+
+__all__ = ["ArrayGraph"]
@@ -0,0 +1,188 @@
+import gzip
+import os
+import shutil
+import tempfile
+from typing import IO, Dict, Optional
+
+# File name suffix of each supported compression
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+# Cached artifacts that are compressed: extracted filings and API responses.
+# IRS index files are left alone, since new rows are appended to them in place.
+_COMPRESSIBLE = (".xml", ".json")
+_SKIPPED_DIRECTORIES = {"irs_indices"}
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            "zstd cache compression needs zstandard: pip install zstandard"
+        ) from e
+    return zstandard
+
+
+def check_compression(compression: Optional[str]) -> Optional[str]:
+    """
+    Validate a compression name (None, "gzip" or "zstd"), raising if it is
+    unknown or its library is not installed.
+    """
+    if compression is not None and compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(
+            f"Unknown cache compression {compression!r}; "
+            f"use one of {sorted(COMPRESSION_SUFFIXES)} or None"
+        )
+    if compression == "zstd":
+        _zstandard()
+    return compression
+
+
+def compressed_path(path: str, compression: Optional[str]) -> str:
+    """
+    The path of a cached file when it is stored with a compression.
+    """
+    return path + COMPRESSION_SUFFIXES[compression] if compression else path
+
+
+def find_cached(path: str) -> Optional[str]:
+    """
+    Find a cached file stored uncompressed or with any compression.
+
+    Arguments:
+        path (str): The path of the uncompressed file, e.g. `1234.xml`.
+
+    Returns:
+        str: The path of the stored file (e.g. `1234.xml.gz`), or None if it
+            is not cached.
+    """
+    for candidate in (path, *(path + s for s in COMPRESSION_SUFFIXES.values())):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def base_path(path: str) -> str:
+    """
+    The path of a cached file without its compression suffix.
+    """
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if path.endswith(suffix):
+            return path[: -len(suffix)]
+    return path
+
+
+def open_cached(path: str) -> IO[bytes]:
+    """
+    Open a cached file for reading as a binary stream, decompressing it on
+    the fly according to its suffix. The stream can be passed straight to
+    `xmltodict.parse` or `json.load`.
+    """
+    if path.endswith(COMPRESSION_SUFFIXES["gzip"]):
+        return gzip.open(path, "rb")
+    if path.endswith(COMPRESSION_SUFFIXES["zstd"]):
+        return (
+            _zstandard()
+            .ZstdDecompressor()
+            .stream_reader(open(path, "rb"), closefd=True)
+        )
+    return open(path, "rb")
+
+
+def _open_writer(f: IO[bytes], compression: Optional[str]) -> IO[bytes]:
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=f, mode="wb", compresslevel=6)
+    if compression == "zstd":
+        return _zstandard().ZstdCompressor(level=10).stream_writer(f, closefd=False)
+    return f
+
+
+def write_cached(path: str, source, compression: Optional[str]) -> str:
+    """
+    Store a cached file, replacing any copy of it in another format.
+
+    Arguments:
+        path (str): The path of the uncompressed file.
+        source (bytes | str | binary file): The content, or a stream of it
+            (e.g. a member of a zip file), which is copied without loading it
+            all into memory.
+        compression (str): None, "gzip" or "zstd".
+
+    Returns:
+        str: The path the file was stored at.
+    """
+    target = compressed_path(path, compression)
+    directory = os.path.dirname(target) or "."
+    os.makedirs(directory, exist_ok=True)
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    # Write to a temporary file first, so readers never see a partial file
+    with tempfile.NamedTemporaryFile("wb", dir=directory, delete=False) as f:
+        try:
+            writer = _open_writer(f, compression)
+            if isinstance(source, bytes):
+                writer.write(source)
+            else:
+                shutil.copyfileobj(source, writer, 1 << 20)
+            if writer is not f:
+                writer.close()
+        except BaseException:
+            f.close()
+            os.remove(f.name)
+            raise
+    os.replace(f.name, target)
+    for suffix in ("", *COMPRESSION_SUFFIXES.values()):
+        stale = path + suffix
+        if stale != target and os.path.exists(stale):
+            os.remove(stale)
+    return target
+
+
+def migrate_cache(
+    cache_directory: str, compression: Optional[str] = "gzip"
+) -> Dict[str, int]:
+    """
+    Convert every cached filing XML and JSON response in a cache directory to
+    one storage format, in one pass. Interrupted migrations can be re-run;
+    files already in the target format are left untouched.
+
+    Arguments:
+        cache_directory (str): The cache directory of a ProPublicaClient.
+        compression (str): The target format: "gzip", "zstd", or None to
+            decompress everything.
+
+    Returns:
+        dict: The number of files `converted` and already `unchanged`, and
+            the `bytes_before` and `bytes_after` of the converted files.
+    """
+    check_compression(compression)
+    target_suffix = COMPRESSION_SUFFIXES.get(compression, "")
+    counts = {"converted": 0, "unchanged": 0, "bytes_before": 0, "bytes_after": 0}
+    for dirpath, dirnames, filenames in os.walk(cache_directory):
+        dirnames[:] = [d for d in dirnames if d not in _SKIPPED_DIRECTORIES]
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            original = base_path(path)
+            if not original.endswith(_COMPRESSIBLE) or original.endswith(".meta.json"):
+                continue
+            if path == original + target_suffix:
+                counts["unchanged"] += 1
+                continue
+            counts["bytes_before"] += os.path.getsize(path)
+            with open_cached(path) as source:
+                stored = write_cached(original, source, compression)
+            counts["bytes_after"] += os.path.getsize(stored)
+            counts["converted"] += 1
+    return counts
+
+
+__all__ = [
+    "COMPRESSION_SUFFIXES",
+    "base_path",
+    "check_compression",
+    "compressed_path",
+    "find_cached",
+    "migrate_cache",
+    "open_cached",
+    "write_cached",
+]
@@ -0,0 +1,423 @@
+import argparse
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterable, Optional, TextIO
+
+from .propublica_sdk import ProPublicaClient
+
+
+class ProgressReporter:
+    """
+    Periodically prints the throughput of a client while a job runs: its
+    requests and parsed filings per second, and its cache hit rate.
+
+    Use as a context manager around the job. Jobs with a known number of
+    items can set `total` and call `advance()` to also show how far along
+    they are, and `fail()` to report the items that failed.
+    """
+
+    def __init__(
+        self,
+        client: ProPublicaClient,
+        interval: float = 2.0,
+        stream: Optional[TextIO] = None,
+        enabled: bool = True,
+    ):
+        self.client = client
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self.enabled = enabled
+        self.total: Optional[int] = None
+        self.done = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_stats = client.stats()
+        self._start_time = time.monotonic()
+
+    def advance(self, count: int = 1):
+        with self._lock:
+            self.done += count
+
+    def fail(self, item: str, error):
+        """
+        Report an item that failed, on its own line, whether or not progress
+        lines are printed.
+        """
+        with self._lock:
+            self.failed += 1
+            # Clear a progress line that is being overwritten in place
+            tty = self._thread is not None and self.stream.isatty()
+            clear = "\r\033[K" if tty else ""
+            self.stream.write(f"{clear}{item}\tfailed\t{error}\n")
+            self.stream.flush()
+
+    def line(self) -> str:
+        """
+        The current progress, as one line of text.
+        """
+        stats = self.client.stats()
+        delta = {key: stats[key] - self._start_stats[key] for key in stats}
+        elapsed = max(time.monotonic() - self._start_time, 1e-9)
+        lookups = delta["cache_hits"] + delta["cache_misses"]
+        hit_rate = f"{delta['cache_hits'] / lookups:.0%}" if lookups else "-"
+        parts = []
+        if self.total is not None:
+            parts.append(f"{self.done}/{self.total} done")
+        if self.failed:
+            parts.append(f"{self.failed} failed")
+        parts += [
+            f"{delta['requests']} requests ({delta['requests'] / elapsed:.1f}/s)",
+            f"{delta['filings']} filings ({delta['filings'] / elapsed:.1f}/s)",
+            f"cache hits {hit_rate}",
+            f"{elapsed:.0f}s",
+        ]
+        return " | ".join(parts)
+
+    def _print(self, final: bool = False):
+        line = self.line()
+        with self._lock:
+            if self.stream.isatty():
+                end = "\n" if final else ""
+                self.stream.write(f"\r\033[K{line}{end}")
+            else:
+                self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self._print()
+
+    def __enter__(self) -> "ProgressReporter":
+        self._start_stats = self.client.stats()
+        self._start_time = time.monotonic()
+        if self.enabled:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._print(final=True)
+
+
+def read_list(path: str) -> list[str]:
+    """
+    Read one EIN (or other identifier) per line from a file, or from stdin if
+    the path is "-". Blank lines and lines starting with "#" are skipped.
+    """
+    if path == "-":
+        lines: Iterable[str] = sys.stdin
+    else:
+        with open(path, "r") as f:
+            lines = f.readlines()
+    return [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+
+
+def _load_graph(path: str):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _save_graph(graph, path: str):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "wb") as f:
+        pickle.dump(graph, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _budget(args):
+    from .network_builder import CrawlBudget
+
+    limits = {
+        "max_nodes": args.max_nodes,
+        "max_requests": args.max_requests,
+        "max_seconds": args.max_seconds,
+        "min_grant_amount": args.min_grant_amount,
+    }
+    if all(value is None for value in limits.values()):
+        return None
+    return CrawlBudget(**limits)
+
+
+def _indices(client: ProPublicaClient, args, progress: ProgressReporter) -> int:
+    statuses = client.download_irs_indices(
+        args.years or None, force=args.force, max_workers=args.workers
+    )
+    progress.advance(len(statuses))
+    for year, status in sorted(statuses.items()):
+        print(f"{year}\t{status}")
+    return 1 if "failed" in statuses.values() else 0
+
+
+def _filings(client: ProPublicaClient, args, progress: ProgressReporter) -> int:
+    eins = read_list(args.eins)
+    progress.total = len(eins)
+
+    def fetch(ein: str):
+        try:
+            return client.get_full_filing(ein, args.year, args.month, as_json=True)
+        except Exception as e:
+            progress.fail(ein, e)
+            return None
+        finally:
+            progress.advance()
+
+    output = open(args.output, "w") if args.output else None
+    fetched = 0
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            for ein, filing in zip(eins, pool.map(fetch, eins)):
+                if filing is None:
+                    continue
+                fetched += 1
+                if output is not None:
+                    record = {"ein": ein, "year": args.year, "filing": filing}
+                    output.write(json.dumps(record) + "\n")
+    finally:
+        if output is not None:
+            output.close()
+    print(f"Fetched {fetched} of {len(eins)} filings")
+    return 0 if fetched == len(eins) else 1
+
+
+def _grants(client: ProPublicaClient, args, progress: ProgressReporter) -> int:
+    from .network_builder import ArrayGrantmakerNetworkBuilder, GrantmakerNetworkBuilder
+
+    seeds = read_list(args.seeds)
+    progress.total = len(seeds)
+    options = {
+        "max_workers": args.workers,
+        "checkpoint_path": args.checkpoint,
+    }
+    if args.compact:
+        builder = ArrayGrantmakerNetworkBuilder(client, **options)
+    else:
+        builder = GrantmakerNetworkBuilder(client, aggregate=args.aggregate, **options)
+    budget = _budget(args)
+    failed = 0
+    for seed in seeds:
+        try:
+            builder.build_network(
+                seed, args.depth, args.year, budget=budget, best_first=args.best_first
+            )
+        except Exception as e:
+            # Keep the graphs of the other seeds
+            progress.fail(seed, e)
+            failed += 1
+            continue
+        finally:
+            progress.advance()
+        if builder.budget_exhausted:
+            print(f"Stopped early: {builder.budget_exhausted}", file=sys.stderr)
+            break
+    graph = builder.get_graph()
+    _save_graph(graph, args.output)
+    print(
+        f"Saved {graph.number_of_nodes()} nodes and {graph.number_of_edges()} "
+        f"edges to {args.output}"
+    )
+    return 1 if failed else 0
+
+
+def _staff(client: ProPublicaClient, args, progress: ProgressReporter) -> int:
+    from .filing_store import FilingStore
+    from .network_builder import GrantmakerNetworkBuilder, StaffNetworkBuilder
+
+    if not args.seeds and not args.graph:
+        print("staff needs --seeds, --graph or both", file=sys.stderr)
+        return 2
+    store = FilingStore(client)
+    graph = _load_graph(args.graph) if args.graph else None
+    subset = None
+    failed = False
+    if args.seeds:
+        # Add the seed organizations (with their filings) without any grants
+        seeds = read_list(args.seeds)
+        progress.total = len(seeds)
+        organizations = GrantmakerNetworkBuilder(
+            client, existing_graph=graph, max_workers=args.workers, filing_store=store
+        )
+        subset = organizations.add_organizations(seeds, args.year)
+        progress.advance(len(seeds))
+        for seed in sorted(set(seeds) - set(subset)):
+            progress.fail(seed, f"no filing for {args.year}")
+            failed = True
+        graph = organizations.get_graph()
+    builder = StaffNetworkBuilder(
+        client,
+        existing_graph=graph,
+        organization_subset=subset,
+        filing_store=store,
+        max_workers=args.workers,
+    )
+    try:
+        builder.build_network()
+    except Exception as e:
+        # Save the organizations and whatever staff were found
+        progress.fail("staff", e)
+        failed = True
+    graph = builder.get_graph()
+    _save_graph(graph, args.output)
+    print(
+        f"Saved {graph.number_of_nodes()} nodes and {graph.number_of_edges()} "
+        f"edges to {args.output}"
+    )
+    return 1 if failed else 0
+
+
+def _export(client: ProPublicaClient, args, progress: ProgressReporter) -> int:
+    from . import export
+
+    graph = _load_graph(args.graph)
+    if args.format == "graphml":
+        export.write_graphml(graph, args.output)
+    elif args.format == "ndjson":
+        export.write_ndjson(graph, args.output)
+    else:
+        if not args.edges_output:
+            print("--format parquet needs --edges-output", file=sys.stderr)
+            return 2
+        export.to_parquet(graph, args.output, args.edges_output)
+    print(f"Wrote {args.format} to {args.output}")
+    return 0
+
+
+def _migrate_cache(client: ProPublicaClient, args, progress: ProgressReporter) -> int:
+    counts = client.migrate_cache()
+    print(
+        f"Converted {counts['converted']} files "
+        f"({counts['bytes_before']:,} to {counts['bytes_after']:,} bytes), "
+        f"{counts['unchanged']} already {client.cache_compression or 'uncompressed'}"
+    )
+    return 0
+
+
+def _add_crawl_options(parser: argparse.ArgumentParser):
+    default_year = datetime.now().year - 1
+    parser.add_argument(
+        "--year",
+        type=int,
+        default=default_year,
+        help=f"Filing year (default: {default_year})",
+    )
+    parser.add_argument(
+        "--output", required=True, help="Where to pickle the resulting graph"
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="nonprofit-networks",
+        description="Batch jobs over ProPublica and IRS nonprofit data.",
+    )
+    parser.add_argument(
+        "--cache-directory", help="Cache directory of the ProPublica client"
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=2.0,
+        help="Seconds between progress lines (default: 2)",
+    )
+    parser.add_argument(
+        "--quiet", action="store_true", help="Do not print progress lines"
+    )
+    parser.add_argument(
+        "--cache-compression",
+        choices=["gzip", "zstd"],
+        help="Compress filings and responses written to the cache",
+    )
+    parser.add_argument(
+        "--remote-zip",
+        action="store_true",
+        help="Read single filings out of IRS batch zips with HTTP range "
+        "requests instead of downloading whole batches",
+    )
+    parser.add_argument("--debug", action="store_true", help="Debug output")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    indices = commands.add_parser("indices", help="Download or refresh IRS indices")
+    indices.add_argument("years", type=int, nargs="*", help="Default: every year")
+    indices.add_argument("--force", action="store_true", help="Re-download")
+    indices.add_argument("--workers", type=int, default=4)
+    indices.set_defaults(run=_indices)
+
+    filings = commands.add_parser("filings", help="Fetch the filings of a list of EINs")
+    filings.add_argument("eins", help="File with one EIN per line, or - for stdin")
+    filings.add_argument("--year", type=int, required=True, help="Filing year")
+    filings.add_argument("--month", type=int, help="Tax period month")
+    filings.add_argument("--workers", type=int, default=8)
+    filings.add_argument("--output", help="Write the filings to this NDJSON file")
+    filings.set_defaults(run=_filings)
+
+    grants = commands.add_parser("grants", help="Crawl grant networks from seeds")
+    grants.add_argument("seeds", help="File with one seed EIN per line, or -")
+    _add_crawl_options(grants)
+    grants.add_argument("--depth", type=int, default=1)
+    grants.add_argument("--workers", type=int, default=8)
+    grants.add_argument("--best-first", action="store_true")
+    representation = grants.add_mutually_exclusive_group()
+    representation.add_argument(
+        "--aggregate", action="store_true", help="One weighted edge per pair"
+    )
+    representation.add_argument(
+        "--compact", action="store_true", help="Use ArrayGrantmakerNetworkBuilder"
+    )
+    grants.add_argument("--checkpoint", help="Checkpoint file for resuming")
+    grants.add_argument("--max-nodes", type=int)
+    grants.add_argument("--max-requests", type=int)
+    grants.add_argument("--max-seconds", type=float)
+    grants.add_argument("--min-grant-amount", type=float)
+    grants.set_defaults(run=_grants)
+
+    staff = commands.add_parser("staff", help="Add staff to organizations")
+    staff.add_argument("--seeds", help="File with one organization EIN per line")
+    staff.add_argument("--graph", help="Pickled graph to add staff to")
+    _add_crawl_options(staff)
+    staff.add_argument("--workers", type=int, default=8)
+    staff.set_defaults(run=_staff)
+
+    export = commands.add_parser("export", help="Convert a pickled graph")
+    export.add_argument("graph", help="Pickled graph, e.g. from grants or staff")
+    export.add_argument(
+        "--format", choices=["graphml", "ndjson", "parquet"], default="graphml"
+    )
+    export.add_argument("--output", required=True)
+    export.add_argument("--edges-output", help="Edge table path for parquet")
+    export.set_defaults(run=_export)
+
+    migrate = commands.add_parser(
+        "migrate-cache",
+        help="Convert the cache to --cache-compression (or decompress it)",
+    )
+    migrate.set_defaults(run=_migrate_cache)
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    client = ProPublicaClient(
+        cache_directory=args.cache_directory,
+        debug=args.debug,
+        cache_compression=args.cache_compression,
+        remote_zip=args.remote_zip,
+    )
+    progress = ProgressReporter(
+        client, interval=args.progress_interval, enabled=not args.quiet
+    )
+    with progress:
+        return args.run(client, args, progress)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any, Iterator, Optional
+from xml.sax.saxutils import escape, quoteattr
+
+import networkx as nx
+
+from .utils import as_amount
+
+# pandas is slow to import, so it is imported by the functions that use it
+# rather than when the builders load this module
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Scalar node and edge attributes that are exported. Everything else (filing
+# handles, Schedule I rows, ...) stays in the graph.
+NODE_COLUMNS = ["name", "net_assets", "revenue", "expenses"]
+EDGE_COLUMNS = ["amount", "memo", "year"]
+
+
+def _labels(data: dict) -> str:
+    """
+    The `__labels__` of a node or edge as a single string, e.g. "Organization".
+    """
+    labels = data.get("__labels__")
+    if not labels:
+        return ""
+    return ";".join(sorted(labels))
+
+
+def _scalar(value) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def node_index(graph: nx.Graph) -> dict[Any, int]:
+    """
+    A stable mapping from node to row/column index, in node insertion order.
+    """
+    return {node: i for i, node in enumerate(graph.nodes)}
+
+
+def to_sparse_adjacency(
+    graph: nx.Graph, weight: str = "amount", label: Optional[str] = "GrantFunded"
+):
+    """
+    Build a SciPy CSR adjacency matrix of a graph, without ever allocating a
+    dense N×N array.
+
+    Arguments:
+        graph (nx.Graph): The graph to export.
+        weight (str): The edge attribute to use as weight. Parallel edges are
+            summed. If None, every edge counts as 1.
+        label (str): Only include edges with this label. If None, every edge
+            is included.
+
+    Returns:
+        tuple[scipy.sparse.csr_matrix, list]: The adjacency matrix, and the
+            node at each row/column index.
+    """
+    if hasattr(graph, "to_sparse_adjacency"):
+        # Column-backed graphs (ArrayGraph) build the matrix without a loop
+        return graph.to_sparse_adjacency(weight=weight, label=label)
+
+    import numpy as np
+    from scipy import sparse
+
+    index = node_index(graph)
+    rows, cols, values = [], [], []
+    for u, v, data in graph.edges(data=True):
+        if label is not None and label not in (data.get("__labels__") or ()):
+            continue
+        rows.append(index[u])
+        cols.append(index[v])
+        values.append(
+            1.0 if weight is None else as_amount(data.get(weight), default=0.0)
+        )
+    n = len(index)
+    # Duplicate (row, col) entries are summed when converting to CSR
+    matrix = sparse.coo_matrix(
+        (np.asarray(values, dtype=np.float64), (rows, cols)), shape=(n, n)
+    ).tocsr()
+    return matrix, list(index)
+
+
+def node_record(node, data: dict) -> dict[str, Any]:
+    """
+    The exported columns of one node: `id`, `label` and NODE_COLUMNS.
+    """
+    record = {"id": str(node), "label": _labels(data)}
+    for column in NODE_COLUMNS:
+        record[column] = _scalar(data.get(column))
+    return record
+
+
+def edge_record(u, v, data: dict) -> dict[str, Any]:
+    """
+    The exported columns of one edge: `source`, `target`, `label` and
+    EDGE_COLUMNS.
+    """
+    record = {"source": str(u), "target": str(v), "label": _labels(data)}
+    for column in EDGE_COLUMNS:
+        record[column] = _scalar(data.get(column))
+    return record
+
+
+def iter_node_records(graph: nx.Graph) -> Iterator[dict[str, Any]]:
+    for node, data in graph.nodes(data=True):
+        yield node_record(node, data)
+
+
+def iter_edge_records(graph: nx.Graph) -> Iterator[dict[str, Any]]:
+    for u, v, data in graph.edges(data=True):
+        yield edge_record(u, v, data)
+
+
+def node_table(graph: nx.Graph) -> pd.DataFrame:
+    """
+    The nodes of a graph as a DataFrame with an `id` (EIN or person name),
+    `label` and the scalar node attributes.
+    """
+    import pandas as pd
+
+    return pd.DataFrame(
+        iter_node_records(graph), columns=["id", "label", *NODE_COLUMNS]
+    )
+
+
+def edge_table(graph: nx.Graph) -> pd.DataFrame:
+    """
+    The edges of a graph as a DataFrame with `source`, `target`, `label`,
+    `amount`, `memo` and `year`.
+    """
+    import pandas as pd
+
+    edges = pd.DataFrame(
+        iter_edge_records(graph), columns=["source", "target", "label", *EDGE_COLUMNS]
+    )
+    edges["amount"] = pd.to_numeric(edges["amount"], errors="coerce")
+    return edges
+
+
+def _pyarrow():
+    """
+    pyarrow and pyarrow.parquet, which are optional dependencies.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "Arrow and Parquet export need pyarrow: pip install pyarrow"
+        ) from e
+    return pyarrow, pyarrow.parquet
+
+
+def to_arrow(graph: nx.Graph):
+    """
+    The node and edge tables of a graph as Arrow tables.
+
+    Returns:
+        tuple[pyarrow.Table, pyarrow.Table]: The node and edge tables.
+    """
+    pa, _ = _pyarrow()
+    return (
+        pa.Table.from_pandas(node_table(graph), preserve_index=False),
+        pa.Table.from_pandas(edge_table(graph), preserve_index=False),
+    )
+
+
+def to_parquet(graph: nx.Graph, nodes_path: str, edges_path: str) -> None:
+    """
+    Write the node and edge tables of a graph to Parquet files.
+    """
+    _, pq = _pyarrow()
+    nodes, edges = to_arrow(graph)
+    pq.write_table(nodes, nodes_path)
+    pq.write_table(edges, edges_path)
+
+
+def write_ndjson(graph: nx.Graph, path: str) -> None:
+    """
+    Stream a graph to newline-delimited JSON, one node or edge per line, with
+    a `type` of "node" or "edge". Only one record is serialized at a time.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        for record in iter_node_records(graph):
+            f.write(json.dumps({"type": "node", **record}) + "\n")
+        for record in iter_edge_records(graph):
+            f.write(json.dumps({"type": "edge", **record}) + "\n")
+
+
+class NDJSONSink:
+    """
+    Writes graph events (see `GrantmakerNetworkBuilder(on_event=...)`) to a
+    newline-delimited JSON file as they arrive, in the same format as
+    `write_ndjson`.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "w", encoding="utf-8")
+
+    def __call__(self, event: dict[str, Any]) -> None:
+        self._file.write(json.dumps(event) + "\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ParquetSink:
+    """
+    Writes graph events to a node and an edge Parquet file as they arrive,
+    one row group every `batch_size` events. Requires pyarrow.
+    """
+
+    def __init__(self, nodes_path: str, edges_path: str, batch_size: int = 10_000):
+        pa, pq = _pyarrow()
+        self._pa, self._pq = pa, pq
+        self._schemas = {
+            "node": pa.schema(
+                [("id", pa.string()), ("label", pa.string()), ("name", pa.string())]
+                + [(c, pa.float64()) for c in NODE_COLUMNS if c != "name"]
+            ),
+            "edge": pa.schema(
+                [
+                    ("source", pa.string()),
+                    ("target", pa.string()),
+                    ("label", pa.string()),
+                    ("amount", pa.float64()),
+                    ("memo", pa.string()),
+                    ("year", pa.int64()),
+                ]
+            ),
+        }
+        self._float_columns = {
+            "node": [c for c in NODE_COLUMNS if c != "name"],
+            "edge": ["amount"],
+        }
+        self._paths = {"node": nodes_path, "edge": edges_path}
+        self._writers: dict[str, Any] = {}
+        self._buffers: dict[str, list] = {"node": [], "edge": []}
+        self.batch_size = batch_size
+
+    def __call__(self, event: dict[str, Any]) -> None:
+        kind = event["type"]
+        row = {name: event.get(name) for name in self._schemas[kind].names}
+        for name in self._float_columns[kind]:
+            if row[name] is not None:
+                row[name] = as_amount(row[name], default=0.0)
+        self._buffers[kind].append(row)
+        if len(self._buffers[kind]) >= self.batch_size:
+            self._flush(kind)
+
+    def _flush(self, kind: str) -> None:
+        schema = self._schemas[kind]
+        if kind not in self._writers:
+            self._writers[kind] = self._pq.ParquetWriter(self._paths[kind], schema)
+        if self._buffers[kind]:
+            table = self._pa.Table.from_pylist(self._buffers[kind], schema=schema)
+            self._writers[kind].write_table(table)
+        self._buffers[kind] = []
+
+    def close(self) -> None:
+        for kind in ("node", "edge"):
+            self._flush(kind)
+            self._writers[kind].close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _graphml_data(key: str, kind: str, value) -> str:
+    if value is None or value == "":
+        return ""
+    if kind in ("double", "long"):
+        try:
+            value = float(value) if kind == "double" else int(value)
+        except (TypeError, ValueError):
+            return ""
+    return f"<data key={quoteattr(key)}>{escape(str(value))}</data>"
+
+
+def write_graphml(graph: nx.Graph, path: str) -> None:
+    """
+    Stream a graph to GraphML, one element at a time, rather than building
+    the whole XML document in memory like `nx.write_graphml` does.
+    """
+    node_keys = {"label": "string", "name": "string"}
+    node_keys.update({c: "double" for c in NODE_COLUMNS if c != "name"})
+    edge_keys = {
+        "label": "string",
+        "amount": "double",
+        "memo": "string",
+        "year": "long",
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+        for domain, keys in (("node", node_keys), ("edge", edge_keys)):
+            for key, kind in keys.items():
+                f.write(
+                    f'  <key id="{domain}_{key}" for="{domain}" '
+                    f'attr.name="{key}" attr.type="{kind}"/>\n'
+                )
+        directed = "directed" if graph.is_directed() else "undirected"
+        f.write(f'  <graph edgedefault="{directed}">\n')
+        for record in iter_node_records(graph):
+            data = "".join(
+                _graphml_data(f"node_{key}", kind, record[key])
+                for key, kind in node_keys.items()
+            )
+            f.write(f"    <node id={quoteattr(record['id'])}>{data}</node>\n")
+        for record in iter_edge_records(graph):
+            data = "".join(
+                _graphml_data(f"edge_{key}", kind, record[key])
+                for key, kind in edge_keys.items()
+            )
+            f.write(
+                f"    <edge source={quoteattr(record['source'])} "
+                f"target={quoteattr(record['target'])}>{data}</edge>\n"
+            )
+        f.write("  </graph>\n</graphml>\n")
+
+
+__all__ = [
+    "NDJSONSink",
+    "ParquetSink",
+    "edge_record",
+    "edge_table",
+    "node_index",
+    "node_record",
+    "node_table",
+    "to_arrow",
+    "to_parquet",
+    "to_sparse_adjacency",
+    "write_graphml",
+    "write_ndjson",
+]
@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Tuple
+
+from .propublica_sdk import ProPublicaClient
+
+if TYPE_CHECKING:
+    from .response_types import FullFiling
+
+FilingKey = Tuple[str, int]
+
+# The attributes of a filing that FilingStore keeps without the filing
+SUMMARY_FIELDS = ("name", "net_assets", "revenue", "expenses")
+
+
+def _is_filing_attribute(name: str) -> bool:
+    from .response_types import FullFiling
+
+    return name in FullFiling.model_fields or hasattr(FullFiling, name)
+
+
+class FilingHandle:
+    """
+    A lightweight reference to a filing held in a FilingStore.
+
+    Graph nodes carry a handle instead of the full parsed filing, so that
+    graphs stay small and are cheap to copy and pickle. The filing is loaded
+    from the store on demand, and access to the attributes of a FullFiling
+    is forwarded to it, so `handle.get_name()` works just like
+    `filing.get_name()`. The summary attributes (`handle.name`, ...) are read
+    from the store without loading the filing, and any other attribute
+    raises AttributeError without loading anything.
+
+    A handle that has been unpickled is no longer bound to a store; use
+    `FilingStore.attach` (or pass a store to `load`) to bind it again.
+    """
+
+    __slots__ = ("ein", "year", "_store")
+
+    def __init__(self, ein: str, year: int, store: Optional["FilingStore"] = None):
+        self.ein = ein
+        self.year = year
+        self._store = store
+
+    def load(self, store: Optional["FilingStore"] = None) -> FullFiling:
+        """
+        Load the full filing from the store.
+
+        Arguments:
+            store (FilingStore): The store to load from. Defaults to the store
+                that created this handle.
+
+        Returns:
+            FullFiling: The parsed filing
+        """
+        return self._bound(store).get(self.ein, self.year)
+
+    def _bound(self, store: Optional["FilingStore"] = None) -> "FilingStore":
+        store = store or self._store
+        if store is None:
+            raise ValueError(
+                f"Filing handle for {self.ein} ({self.year}) is not attached to a FilingStore"
+            )
+        return store
+
+    def __getattr__(self, name: str):
+        if name in SUMMARY_FIELDS:
+            return self._bound().summary(self.ein, self.year)[name]
+        if name.startswith("_") or not _is_filing_attribute(name):
+            raise AttributeError(
+                f"{type(self).__name__!r} object has no attribute {name!r}"
+            )
+        return getattr(self.load(), name)
+
+    def __reduce__(self):
+        # Never pickle the store (and its cached filings) along with the handle
+        return (FilingHandle, (self.ein, self.year))
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, FilingHandle)
+            and self.ein == other.ein
+            and self.year == other.year
+        )
+
+    def __hash__(self):
+        return hash((self.ein, self.year))
+
+    def __repr__(self):
+        return f"FilingHandle(ein={self.ein!r}, year={self.year!r})"
+
+
+class FilingStore:
+    """
+    A shared, deduplicating store of filings keyed by (EIN, year).
+
+    Each filing is fetched from the client at most once, even when several
+    threads ask for it at the same time. Parsed filings are kept in a bounded
+    LRU cache and reloaded through the client (and its on-disk cache) when
+    needed again; a few scalar attributes of each filing are kept forever so
+    that graph nodes can carry them without holding the filing itself.
+    """
+
+    def __init__(self, client: ProPublicaClient, max_cached: int = 256):
+        """
+        Create a new FilingStore.
+
+        Arguments:
+            client (ProPublicaClient): The client used to fetch filings.
+            max_cached (int): The maximum number of parsed filings to keep in
+                memory at once.
+        """
+        self.client = client
+        self.max_cached = max_cached
+        self._filings: OrderedDict[FilingKey, FullFiling] = OrderedDict()
+        self._summaries: Dict[FilingKey, Dict[str, Any]] = {}
+        self._failures: Dict[FilingKey, Exception] = {}
+        self._inflight: Dict[FilingKey, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(ein: str, year: int) -> FilingKey:
+        return (str(ein), int(year))
+
+    def __contains__(self, key: FilingKey) -> bool:
+        return self._key(*key) in self._summaries
+
+    def get(self, ein: str, year: int) -> FullFiling:
+        """
+        Get a filing, fetching it from the client if it is not in memory.
+
+        Raises whatever the client raised if the filing cannot be fetched
+        (or summarized); failures are remembered and not retried.
+        """
+        key = self._key(ein, year)
+        while True:
+            with self._lock:
+                if key in self._filings:
+                    self._filings.move_to_end(key)
+                    return self._filings[key]
+                if key in self._failures:
+                    raise self._failures[key]
+                event = self._inflight.get(key)
+                if event is None:
+                    event = threading.Event()
+                    self._inflight[key] = event
+                    break
+            # Another thread is fetching this filing; wait for it and look again
+            event.wait()
+
+        try:
+            filing = self.client.get_full_filing(key[0], key[1])
+            summary = self._summarize(filing)
+        except Exception as e:
+            with self._lock:
+                self._failures[key] = e
+            raise
+        else:
+            with self._lock:
+                self._summaries[key] = summary
+                self._filings[key] = filing
+                while len(self._filings) > self.max_cached:
+                    self._filings.popitem(last=False)
+        finally:
+            # Whatever happened, wake up the threads waiting for this filing
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+        return filing
+
+    def prefetch(
+        self, eins: Iterable[str], year: int, max_workers: int = 8
+    ) -> Dict[str, FullFiling]:
+        """
+        Fetch the filings of many organizations for a year in bulk, through
+        the client's `get_indexed_filings`, if it has one. Organizations that
+        cannot be fetched that way are left to `get`, which fetches them one
+        by one. Filings that cannot be summarized are recorded as failed, as
+        by `get`.
+
+        Returns:
+            dict: The filings that were fetched or already in memory, by EIN.
+                They are all kept here, even those that do not fit in the
+                LRU cache.
+        """
+        get_indexed_filings = getattr(self.client, "get_indexed_filings", None)
+        filings: Dict[str, FullFiling] = {}
+        wanted: Dict[str, threading.Event] = {}
+        with self._lock:
+            for ein in dict.fromkeys(str(ein) for ein in eins):
+                key = self._key(ein, year)
+                if key in self._filings:
+                    filings[ein] = self._filings[key]
+                elif (
+                    get_indexed_filings is not None
+                    and key not in self._failures
+                    and key not in self._inflight
+                ):
+                    # Threads that `get` these filings meanwhile wait for us
+                    wanted[ein] = self._inflight[key] = threading.Event()
+        if not wanted:
+            return filings
+
+        try:
+            fetched = get_indexed_filings(
+                list(wanted), int(year), max_workers=max_workers
+            )
+            for ein, filing in fetched.items():
+                key = self._key(ein, year)
+                try:
+                    summary = self._summarize(filing)
+                except Exception as e:
+                    with self._lock:
+                        self._failures[key] = e
+                    continue
+                with self._lock:
+                    self._summaries[key] = summary
+                    self._filings[key] = filing
+                filings[ein] = filing
+            with self._lock:
+                while len(self._filings) > self.max_cached:
+                    self._filings.popitem(last=False)
+        finally:
+            # Wake up the threads waiting for these filings, which fetch the
+            # ones that were not fetched here themselves
+            with self._lock:
+                for ein in wanted:
+                    self._inflight.pop(self._key(ein, year), None)
+            for event in wanted.values():
+                event.set()
+        return filings
+
+    def failed(self, ein: str, year: int) -> bool:
+        """
+        Whether fetching a filing has been tried and failed.
+        """
+        return self._key(ein, year) in self._failures
+
+    def invalidate(self, ein: str, year: int) -> None:
+        """
+        Forget everything known about a filing, so that it is fetched again
+        (bypassing the client's on-disk cache) the next time it is needed.
+        """
+        key = self._key(ein, year)
+        with self._lock:
+            self._filings.pop(key, None)
+            self._summaries.pop(key, None)
+            self._failures.pop(key, None)
+        invalidate = getattr(self.client, "invalidate_filing", None)
+        if invalidate is not None:
+            invalidate(*key)
+
+    def try_get(self, ein: str, year: int) -> Optional[FullFiling]:
+        """
+        Get a filing, or None if it cannot be fetched.
+        """
+        try:
+            return self.get(ein, year)
+        except Exception:
+            return None
+
+    def handle(self, ein: str, year: int) -> FilingHandle:
+        """
+        Get a lightweight handle to a filing in this store.
+        """
+        ein, year = self._key(ein, year)
+        return FilingHandle(ein, year, self)
+
+    def summary(self, ein: str, year: int) -> Dict[str, Any]:
+        """
+        Get the scalar attributes (name, net assets, revenue, expenses) of a
+        filing, fetching it if needed.
+        """
+        key = self._key(ein, year)
+        if key not in self._summaries:
+            self.get(*key)
+        return self._summaries[key]
+
+    def node_attributes(self, ein: str, year: int) -> Dict[str, Any]:
+        """
+        Get the attributes to store on an organization's graph node: a handle
+        to the filing plus its scalar attributes.
+        """
+        return {"filing": self.handle(ein, year), **self.summary(ein, year)}
+
+    def attach(self, graph) -> None:
+        """
+        Bind every filing handle on the nodes of a graph to this store, for
+        example after the graph has been unpickled.
+        """
+        for _, data in graph.nodes(data=True):
+            handle = data.get("filing")
+            if isinstance(handle, FilingHandle):
+                handle._store = self
+
+    @staticmethod
+    def _summarize(filing: FullFiling) -> Dict[str, Any]:
+        # The keys are SUMMARY_FIELDS
+        revenue, expenses = filing.get_total_revexp()
+        return {
+            "name": filing.get_name(),
+            "net_assets": filing.get_net_assets(),
+            "revenue": revenue,
+            "expenses": expenses,
+        }
+
+
+__all__ = ["FilingHandle", "FilingStore"]
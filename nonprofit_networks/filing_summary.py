@@ -0,0 +1,87 @@
+import xml.etree.ElementTree as ElementTree
+from typing import IO, Any, Dict, Union
+
+from .utils import as_amount
+
+# The fields read from a filing, by their path below the <Return> element
+_HEADER_FIELDS = {
+    ("ReturnHeader", "ReturnTypeCd"): "return_type",
+    ("ReturnHeader", "TaxPeriodEndDt"): "tax_period",
+    ("ReturnHeader", "Filer", "BusinessName", "BusinessNameLine1Txt"): "name",
+    ("ReturnHeader", "Filer", "BusinessName", "BusinessNameLine2Txt"): "name_line2",
+}
+_IRS990_FIELDS = {
+    "CYTotalRevenueAmt": "revenue",
+    "CYTotalExpensesAmt": "expenses",
+    "NetAssetsOrFundBalancesEOYAmt": "net_assets",
+    "TotalAssetsEOYAmt": "total_assets",
+    "TotalLiabilitiesEOYAmt": "total_liabilities",
+}
+_FIELDS = {
+    **_HEADER_FIELDS,
+    **{("ReturnData", "IRS990", tag): column for tag, column in _IRS990_FIELDS.items()},
+}
+
+# The columns of a summary, in order
+SUMMARY_COLUMNS = [
+    "name",
+    "tax_period",
+    "return_type",
+    *_IRS990_FIELDS.values(),
+]
+
+
+def _local_name(tag: str) -> str:
+    # IRS filings put every element in the http://www.irs.gov/efile namespace
+    return tag.rsplit("}", 1)[-1]
+
+
+def summarize_filing(source: Union[str, IO[bytes]]) -> Dict[str, Any]:
+    """
+    Read the IRS990 summary fields of a filing XML, without parsing the rest.
+
+    The XML is streamed and parsing stops at the end of the main form, so the
+    schedules (most of a large filing) are never read. The values are those
+    of `FullFiling.get_name()`, `get_total_revexp()` and `get_net_assets()`,
+    with amounts as floats.
+
+    Arguments:
+        source (str | file): The path of an XML file, or a binary stream.
+
+    Returns:
+        dict: The `name`, `tax_period` (as YYYYMM), `return_type`, and the
+            `revenue`, `expenses`, `net_assets`, `total_assets` and
+            `total_liabilities` from the IRS990 form, or None for the fields
+            a filing does not have (e.g. a 990-PF has no IRS990 form).
+    """
+    values: Dict[str, Any] = {}
+    path: list[str] = []
+    for event, element in ElementTree.iterparse(source, events=("start", "end")):
+        if event == "start":
+            path.append(_local_name(element.tag))
+            continue
+        # Paths are relative to <Return>
+        column = _FIELDS.get(tuple(path[1:]))
+        if column is not None:
+            values[column] = (element.text or "").strip()
+        finished_form = len(path) == 3 and path[1] == "ReturnData"
+        path.pop()
+        element.clear()
+        if finished_form:
+            # The main form comes first in ReturnData; the rest are schedules
+            break
+
+    name = values.pop("name", None)
+    line2 = values.pop("name_line2", None)
+    if name is not None and line2:
+        name += line2
+    tax_period = values.get("tax_period")
+    return {
+        "name": name,
+        "tax_period": int(tax_period[:7].replace("-", "")) if tax_period else None,
+        "return_type": values.get("return_type"),
+        **{column: as_amount(values.get(column)) for column in _IRS990_FIELDS.values()},
+    }
+
+
+__all__ = ["SUMMARY_COLUMNS", "summarize_filing"]
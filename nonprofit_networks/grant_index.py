@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+from pydantic import BaseModel
+
+from .utils import FilingIndex, as_amount, deep_dict_access, filing_rows
+
+if TYPE_CHECKING:
+    from .response_types import FullFiling
+
+
+class GrantRecord(BaseModel):
+    grantor_ein: str
+    recipient_ein: str
+    year: Optional[int] = None
+    grantor_name: Optional[str] = None
+    recipient_name: Optional[str] = None
+    amount: float = 0.0
+    purpose: Optional[str] = None
+
+
+def _grant_records(filing: Union[FullFiling, dict[str, Any]]) -> list[GrantRecord]:
+    """
+    Extract the Schedule I rows with a recipient EIN from a filing, either a
+    FullFiling or the parsed XML dictionary of one.
+    """
+    grantor, grantor_name, year, rows = filing_rows(
+        filing,
+        "get_grant_recipients",
+        "Return.ReturnData.IRS990ScheduleI.RecipientTable",
+    )
+    if not grantor:
+        return []
+    records = []
+    for row in rows:
+        recipient = row.get("RecipientEIN")
+        if not recipient or not isinstance(recipient, str):
+            continue
+        recipient_name = deep_dict_access(
+            row, "RecipientBusinessName.BusinessNameLine1Txt"
+        )
+        purpose = row.get("PurposeOfGrantTxt")
+        records.append(
+            GrantRecord(
+                grantor_ein=grantor,
+                recipient_ein=recipient,
+                year=year,
+                grantor_name=grantor_name,
+                recipient_name=(
+                    recipient_name if isinstance(recipient_name, str) else None
+                ),
+                amount=as_amount(row.get("CashGrantAmt"), default=0.0),
+                purpose=purpose if isinstance(purpose, str) else None,
+            )
+        )
+    return records
+
+
+class GrantIndex(FilingIndex):
+    """
+    An in-memory index of Schedule I grants, by grantor and by recipient.
+
+    The recipient side answers "who funds this EIN?" without crawling every
+    grantmaker, which makes upstream traversal possible.
+    """
+
+    def __init__(self):
+        self._by_recipient: dict[str, list[GrantRecord]] = {}
+        self._by_grantor: dict[str, list[GrantRecord]] = {}
+        self._names: dict[str, str] = {}
+        self._indexed: set[tuple[str, Optional[int]]] = set()
+
+    def __len__(self) -> int:
+        return sum(len(records) for records in self._by_recipient.values())
+
+    def add_filing(self, filing: Union[FullFiling, dict[str, Any]]):
+        """
+        Add the grants of a filing (a FullFiling or its parsed XML) to the
+        index. Only the first filing of a grantor for a year is indexed, so
+        adding the same filing twice has no effect.
+        """
+        records = _grant_records(filing)
+        if not records:
+            return
+        filed = (records[0].grantor_ein, records[0].year)
+        if filed in self._indexed:
+            return
+        self._indexed.add(filed)
+        for record in records:
+            self.add_record(record)
+
+    def add_record(self, record: GrantRecord):
+        self._by_recipient.setdefault(record.recipient_ein, []).append(record)
+        self._by_grantor.setdefault(record.grantor_ein, []).append(record)
+        if record.grantor_name:
+            self._names[record.grantor_ein] = record.grantor_name
+        if record.recipient_name:
+            self._names.setdefault(record.recipient_ein, record.recipient_name)
+
+    def name(self, ein: str) -> Optional[str]:
+        """
+        The name of an organization, as reported in the indexed filings.
+        """
+        return self._names.get(ein)
+
+    def funders(self, ein: str, year: Optional[int] = None) -> list[GrantRecord]:
+        """
+        Get the grants made to an organization.
+
+        Arguments:
+            ein (str): The recipient's EIN.
+            year (int): Only include grants reported for this year.
+
+        Returns:
+            list[GrantRecord]: The grants, largest first.
+        """
+        records = [
+            record
+            for record in self._by_recipient.get(ein, [])
+            if year is None or record.year == year
+        ]
+        return sorted(records, key=lambda record: -record.amount)
+
+    def grants(self, ein: str, year: Optional[int] = None) -> list[GrantRecord]:
+        """
+        Get the grants made by an organization.
+
+        Arguments:
+            ein (str): The grantor's EIN.
+            year (int): Only include grants reported for this year.
+
+        Returns:
+            list[GrantRecord]: The grants, largest first.
+        """
+        records = [
+            record
+            for record in self._by_grantor.get(ein, [])
+            if year is None or record.year == year
+        ]
+        return sorted(records, key=lambda record: -record.amount)
+
+
+__all__ = ["GrantIndex", "GrantRecord"]
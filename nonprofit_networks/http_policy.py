@@ -0,0 +1,404 @@
+import contextlib
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from pydantic import BaseModel
+
+
+class RequestPolicy(BaseModel):
+    """
+    How requests to one kind of endpoint are timed out, retried and hedged.
+    Any limit that is None is not enforced.
+    """
+
+    # Seconds to wait for a connection, and between two bytes of a response
+    connect_timeout: float = 5.0
+    read_timeout: Optional[float] = 15.0
+    # Seconds for the whole request, across all its attempts
+    deadline: Optional[float] = 60.0
+    # Attempts after the first, for connection errors, timeouts and the
+    # `retry_statuses`, with a random ("full jitter") delay of up to
+    # backoff * 2 ** attempt seconds, capped at max_backoff, between them
+    retries: int = 2
+    backoff: float = 0.5
+    max_backoff: float = 8.0
+    retry_statuses: frozenset[int] = frozenset({429, 502, 503, 504})
+    # If set, a duplicate of a request still running after this percentile
+    # (e.g. 0.95) of the endpoint's recent latencies is sent, and whichever of
+    # the two succeeds first is used, without waiting for a retry.
+    # Only used once `hedge_min_samples` latencies are known.
+    hedge_percentile: Optional[float] = None
+    hedge_min_samples: int = 20
+
+
+# The endpoints of ProPublicaClient and their default policies. The batch zip
+# download has its own retry loop, and index downloads are streamed to disk,
+# so they are neither retried nor bounded by a deadline here.
+DEFAULT_REQUEST_POLICIES: Dict[str, RequestPolicy] = {
+    "api": RequestPolicy(),
+    "organization_page": RequestPolicy(),
+    "download_xml": RequestPolicy(read_timeout=30.0, deadline=120.0),
+    "people_search": RequestPolicy(),
+    "irs_index": RequestPolicy(
+        connect_timeout=30.0, read_timeout=60.0, deadline=None, retries=0
+    ),
+    "irs_batch": RequestPolicy(
+        connect_timeout=30.0, read_timeout=None, deadline=None, retries=0
+    ),
+    "irs_range": RequestPolicy(read_timeout=30.0, deadline=120.0),
+}
+
+
+class CircuitOpenError(httpx.TransportError):
+    """
+    Raised instead of sending a request to a host whose circuit breaker is
+    open, i.e. that has failed too many times in a row recently.
+    """
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a host after `failure_threshold` consecutive
+    failures (connection errors, timeouts, 429 and 5xx responses), for
+    `reset_timeout` seconds. After that, a single trial request is let
+    through: the circuit closes again if it succeeds, and stays open for
+    another `reset_timeout` if it fails.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def before_request(self, host: str):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if self._trial or time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpenError(f"Circuit breaker for {host} is open")
+            self._trial = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+    def abandon_trial(self):
+        """
+        Let another trial request through, after one that ended without a
+        response or transport error to judge the host by.
+        """
+        with self._lock:
+            self._trial = False
+
+
+class RequestRunner:
+    """
+    Sends GET requests according to the RequestPolicy of their endpoint,
+    through a circuit breaker per host.
+    """
+
+    def __init__(
+        self,
+        policies: Optional[Dict[str, RequestPolicy]] = None,
+        failure_threshold: Optional[int] = 5,
+        reset_timeout: float = 30.0,
+        latency_window: int = 200,
+        max_hedged: int = 16,
+    ):
+        """
+        Arguments:
+            policies (dict): Policies by endpoint name, overriding
+                DEFAULT_REQUEST_POLICIES.
+            failure_threshold (int): Consecutive failures after which a
+                host's circuit opens. None disables the circuit breakers.
+            reset_timeout (float): Seconds before an open circuit lets a
+                trial request through.
+            latency_window (int): The number of recent latencies per endpoint
+                that hedging percentiles are computed from.
+            max_hedged (int): The number of requests that may be hedged at
+                once. Requests beyond it are sent without a duplicate.
+        """
+        self.policies = {**DEFAULT_REQUEST_POLICIES, **(policies or {})}
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latencies: Dict[str, deque] = {}
+        self._latency_window = latency_window
+        self._lock = threading.Lock()
+        self.max_hedged = max_hedged
+        self._hedge_slots = threading.BoundedSemaphore(max_hedged)
+        self._request_pool: Optional[ThreadPoolExecutor] = None
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+
+    def policy(self, endpoint: str) -> RequestPolicy:
+        return self.policies.get(endpoint) or self.policies["api"]
+
+    def breaker(self, url: str) -> Optional[CircuitBreaker]:
+        if self.failure_threshold is None:
+            return None
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(
+                    self.failure_threshold, self.reset_timeout
+                )
+            return self._breakers[host]
+
+    def _record_latency(self, endpoint: str, seconds: float):
+        with self._lock:
+            latencies = self._latencies.setdefault(
+                endpoint, deque(maxlen=self._latency_window)
+            )
+            latencies.append(seconds)
+
+    def latency_percentile(self, endpoint: str, percentile: float) -> Optional[float]:
+        """
+        The given percentile (0 to 1) of the endpoint's recent latencies, or
+        None if none have been recorded yet.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies.get(endpoint, ()))
+        if not latencies:
+            return None
+        return latencies[min(int(percentile * len(latencies)), len(latencies) - 1)]
+
+    def _timeout(self, policy: RequestPolicy, started: float) -> httpx.Timeout:
+        connect, read = policy.connect_timeout, policy.read_timeout
+        if policy.deadline is not None:
+            remaining = policy.deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                raise httpx.TimeoutException("Request deadline exceeded")
+            connect = min(connect, remaining)
+            read = remaining if read is None else min(read, remaining)
+        return httpx.Timeout(connect, connect=connect, read=read, pool=connect)
+
+    @staticmethod
+    def _is_failure(response: httpx.Response) -> bool:
+        return response.status_code == 429 or response.status_code >= 500
+
+    def _hedge_delay(self, endpoint: str, policy: RequestPolicy) -> Optional[float]:
+        if policy.hedge_percentile is None:
+            return None
+        with self._lock:
+            samples = len(self._latencies.get(endpoint, ()))
+        if samples < policy.hedge_min_samples:
+            return None
+        return self.latency_percentile(endpoint, policy.hedge_percentile)
+
+    def _attempt(
+        self,
+        endpoint: str,
+        url: str,
+        send: Callable[[httpx.Timeout], httpx.Response],
+        timeout: httpx.Timeout,
+        hedge_delay: Optional[float],
+    ) -> httpx.Response:
+        breaker = self.breaker(url)
+
+        def timed() -> httpx.Response:
+            if breaker is not None:
+                breaker.before_request(urlsplit(url).netloc)
+            started = time.monotonic()
+            try:
+                response = send(timeout)
+            except httpx.TransportError as e:
+                if breaker is not None and not isinstance(e, CircuitOpenError):
+                    breaker.record_failure()
+                raise
+            except BaseException:
+                if breaker is not None:
+                    breaker.abandon_trial()
+                raise
+            if self._is_failure(response):
+                if breaker is not None:
+                    breaker.record_failure()
+            else:
+                if breaker is not None:
+                    breaker.record_success()
+                self._record_latency(endpoint, time.monotonic() - started)
+            return response
+
+        if hedge_delay is None:
+            return timed()
+
+        # Hedged requests are sent from a pool of their own, with one thread
+        # per request that may be hedged, so they never queue behind each
+        # other or behind the duplicates. Beyond `max_hedged` requests at
+        # once, they are sent from the caller's thread without a duplicate.
+        if not self._hedge_slots.acquire(blocking=False):
+            return timed()
+        with self._lock:
+            if self._request_pool is None:
+                self._request_pool = ThreadPoolExecutor(
+                    max_workers=self.max_hedged,
+                    thread_name_prefix="hedged-request-primary",
+                )
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(
+                    max_workers=self.max_hedged, thread_name_prefix="hedged-request"
+                )
+            request_pool, pool = self._request_pool, self._hedge_pool
+        try:
+            first = request_pool.submit(timed)
+        except BaseException:
+            self._hedge_slots.release()
+            raise
+        first.add_done_callback(lambda _: self._hedge_slots.release())
+        done, _ = wait([first], timeout=hedge_delay)
+        if done:
+            return first.result()
+        # The request is slower than usual: race a duplicate against it, use
+        # the first successful response, and leave the loser to finish (or
+        # not start) in the background
+        pending = {first, pool.submit(timed)}
+        failed: Optional[httpx.Response] = None
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                elif self._is_failure(future.result()):
+                    failed = future.result()
+                else:
+                    for loser in pending:
+                        loser.cancel()
+                    return future.result()
+        if failed is not None:
+            return failed
+        raise error
+
+    def get(
+        self,
+        endpoint: str,
+        url: str,
+        send: Callable[[httpx.Timeout], httpx.Response],
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> httpx.Response:
+        """
+        Send a GET request with the policy of `endpoint`.
+
+        Arguments:
+            endpoint (str): The endpoint name, e.g. "organization_page".
+            url (str): The URL, whose host selects the circuit breaker.
+            send (Callable): Sends one attempt of the request with a timeout.
+
+        Returns:
+            httpx.Response: The first response that is not retried, or the
+                last one if every attempt was.
+        """
+        policy = self.policy(endpoint)
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            response = None
+            try:
+                response = self._attempt(
+                    endpoint,
+                    url,
+                    send,
+                    self._timeout(policy, started),
+                    self._hedge_delay(endpoint, policy),
+                )
+            except CircuitOpenError:
+                raise
+            except httpx.TransportError:
+                if attempt >= policy.retries:
+                    raise
+            if response is not None and (
+                attempt >= policy.retries
+                or response.status_code not in policy.retry_statuses
+            ):
+                return response
+
+            delay = self._backoff(policy, attempt, response)
+            if policy.deadline is not None:
+                remaining = policy.deadline - (time.monotonic() - started)
+                if remaining <= delay:
+                    # No time left for another attempt
+                    if response is not None:
+                        return response
+                    raise httpx.TimeoutException("Request deadline exceeded")
+            sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    def _backoff(
+        policy: RequestPolicy, attempt: int, response: Optional[httpx.Response]
+    ) -> float:
+        delay = random.uniform(0, min(policy.backoff * 2**attempt, policy.max_backoff))
+        retry_after = response.headers.get("Retry-After") if response else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), policy.max_backoff))
+        return delay
+
+    @contextlib.contextmanager
+    def stream(
+        self,
+        endpoint: str,
+        url: str,
+        open_stream: Callable[[httpx.Timeout], contextlib.AbstractContextManager],
+    ) -> Iterator[httpx.Response]:
+        """
+        Open a streaming GET request with the timeouts of `endpoint`, through
+        its host's circuit breaker. Streams are not retried or hedged.
+        """
+        policy = self.policy(endpoint)
+        breaker = self.breaker(url)
+        if breaker is not None:
+            breaker.before_request(urlsplit(url).netloc)
+        try:
+            with open_stream(self._timeout(policy, time.monotonic())) as response:
+                if breaker is not None:
+                    if self._is_failure(response):
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                yield response
+        except httpx.TransportError:
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+        except BaseException:
+            if breaker is not None:
+                breaker.abandon_trial()
+            raise
+
+    def close(self):
+        with self._lock:
+            pools = (self._request_pool, self._hedge_pool)
+            self._request_pool = self._hedge_pool = None
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=False)
+
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "DEFAULT_REQUEST_POLICIES",
+    "RequestPolicy",
+    "RequestRunner",
+]
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import math
+from difflib import SequenceMatcher
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from .utils import normalize_name
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Query tokens that match no indexed token exactly or by prefix are matched
+# to indexed tokens at least this similar
+_FUZZY_THRESHOLD = 0.8
+# How much a prefix or fuzzy token match counts, relative to an exact match
+_PREFIX_WEIGHT = 0.8
+_FUZZY_WEIGHT = 0.6
+# Shorter query tokens only match exactly
+_MIN_PREFIX_LENGTH = 3
+_MIN_FUZZY_LENGTH = 4
+# Fuzzy matches are looked for among the indexed tokens that share the most
+# trigrams with the query token, at most this many of them
+_MAX_FUZZY_CANDIDATES = 64
+
+
+class OrganizationNameIndex:
+    """
+    An in-memory full-text index of organization names, built from the
+    `EIN` and `TAXPAYER_NAME` columns of the IRS index files.
+
+    Every query token has to match a token of the name, either exactly, as a
+    prefix ("foun" matches "foundation"), or approximately ("fundation"
+    matches "foundation"). Matches are ranked by how rare the matched tokens
+    are and by how much of the name they cover.
+    """
+
+    def __init__(self):
+        self._eins: list[str] = []
+        self._names: list[str] = []
+        self._ids: dict[str, int] = {}
+        self._postings: dict[str, set[int]] = {}
+        self._token_counts: list[int] = []
+        # Sorted vocabulary, for prefix lookups; rebuilt lazily after adds
+        self._vocabulary: list[str] = []
+        self._vocabulary_dirty = False
+        # Every token in the order it was added, and the ids (positions) of
+        # the tokens by trigram, for fuzzy lookups. Tokens are added to the
+        # trigram index on the first fuzzy lookup after they were indexed.
+        self._tokens: list[str] = []
+        self._trigrams: dict[str, list[int]] = {}
+        self._trigram_indexed = 0
+
+    def __len__(self) -> int:
+        return len(self._eins)
+
+    def add(self, ein: str, name: str):
+        """
+        Add an organization, or rename it if its EIN is already indexed.
+        """
+        ein = str(ein)
+        if not isinstance(name, str) or not name.strip():
+            return
+        tokens = set(normalize_name(name).split())
+        i = self._ids.get(ein)
+        if i is None:
+            i = len(self._eins)
+            self._ids[ein] = i
+            self._eins.append(ein)
+            self._names.append(name)
+            self._token_counts.append(len(tokens))
+        else:
+            if self._names[i] == name:
+                return
+            for token in set(normalize_name(self._names[i]).split()) - tokens:
+                self._postings[token].discard(i)
+            self._names[i] = name
+            self._token_counts[i] = len(tokens)
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                self._tokens.append(token)
+                self._vocabulary_dirty = True
+            postings.add(i)
+
+    def add_rows(self, rows: pd.DataFrame):
+        """
+        Add the organizations in IRS index rows. Later rows win, so the
+        latest name of an organization is kept.
+        """
+        if rows.empty or "TAXPAYER_NAME" not in rows:
+            return
+        for ein, name in zip(rows["EIN"].astype(str), rows["TAXPAYER_NAME"]):
+            self.add(ein, name)
+
+    def name(self, ein: str) -> Optional[str]:
+        i = self._ids.get(str(ein))
+        return None if i is None else self._names[i]
+
+    def _sorted_vocabulary(self) -> list[str]:
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        return self._vocabulary
+
+    def _prefixed(self, prefix: str) -> Iterable[str]:
+        vocabulary = self._sorted_vocabulary()
+        start = bisect.bisect_left(vocabulary, prefix)
+        for token in vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            yield token
+
+    @staticmethod
+    def _trigrams_of(token: str) -> set[str]:
+        padded = f" {token} "
+        return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+    def _update_trigrams(self):
+        for token_id in range(self._trigram_indexed, len(self._tokens)):
+            token = self._tokens[token_id]
+            # Shorter tokens can't be similar to a query token
+            if len(token) >= _MIN_FUZZY_LENGTH - 2:
+                for trigram in self._trigrams_of(token):
+                    self._trigrams.setdefault(trigram, []).append(token_id)
+        self._trigram_indexed = len(self._tokens)
+
+    def _similar(self, token: str) -> Iterable[tuple[str, float]]:
+        self._update_trigrams()
+        shared: dict[int, int] = {}
+        for trigram in self._trigrams_of(token):
+            for token_id in self._trigrams.get(trigram, ()):
+                shared[token_id] = shared.get(token_id, 0) + 1
+        candidates = heapq.nlargest(
+            _MAX_FUZZY_CANDIDATES,
+            (
+                (count, self._tokens[token_id])
+                for token_id, count in shared.items()
+                # Only compare against tokens with the same first letter and
+                # about the same length
+                if self._tokens[token_id][0] == token[0]
+                and abs(len(self._tokens[token_id]) - len(token)) <= 2
+            ),
+        )
+        for _, candidate in candidates:
+            matcher = SequenceMatcher(None, token, candidate)
+            if matcher.quick_ratio() < _FUZZY_THRESHOLD:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= _FUZZY_THRESHOLD:
+                yield candidate, ratio
+
+    def _token_matches(self, token: str) -> dict[int, float]:
+        """
+        The organizations that match one query token, and the weight of the
+        match (higher for exact matches of rare tokens).
+        """
+        n = len(self._eins)
+        matches: list[tuple[str, float]] = []
+        if token in self._postings:
+            matches.append((token, 1.0))
+        if len(token) >= _MIN_PREFIX_LENGTH:
+            matches.extend(
+                (t, _PREFIX_WEIGHT) for t in self._prefixed(token) if t != token
+            )
+        if not matches and len(token) >= _MIN_FUZZY_LENGTH:
+            matches = [(t, _FUZZY_WEIGHT * r) for t, r in self._similar(token)]
+
+        weights: dict[int, float] = {}
+        for matched, quality in matches:
+            postings = self._postings[matched]
+            if not postings:
+                continue
+            weight = quality * math.log(1 + n / len(postings))
+            for i in postings:
+                if weight > weights.get(i, 0.0):
+                    weights[i] = weight
+        return weights
+
+    def search(self, query: str, limit: int = 100) -> list[tuple[str, str, float]]:
+        """
+        Find the organizations whose name matches a query.
+
+        Arguments:
+            query (str): The words to look for.
+            limit (int): The maximum number of results.
+
+        Returns:
+            list[tuple[str, str, float]]: The EIN, name and score (between 0
+                and 1) of the best matches, best first.
+        """
+        tokens = list(dict.fromkeys(normalize_name(query).split()))
+        if not tokens or not self._eins:
+            return []
+        scores: Optional[dict[int, float]] = None
+        best_possible = 0.0
+        # Rarest tokens first, so the candidate set shrinks quickly
+        for token in sorted(tokens, key=lambda t: len(self._postings.get(t, ()))):
+            matches = self._token_matches(token)
+            best_possible += max(matches.values(), default=0.0)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {
+                    i: score + matches[i] for i, score in scores.items() if i in matches
+                }
+            if not scores:
+                return []
+
+        results = []
+        for i, score in scores.items():
+            coverage = min(len(tokens) / max(self._token_counts[i], 1), 1.0)
+            results.append((score / best_possible * math.sqrt(coverage), i))
+        results.sort(key=lambda result: (-result[0], self._names[result[1]]))
+        return [
+            (self._eins[i], self._names[i], round(score, 6))
+            for score, i in results[:limit]
+        ]
+
+
+__all__ = ["OrganizationNameIndex"]
@@ -1,14 +1,36 @@
 import abc
 import datetime
+import heapq
+import os
+import pickle
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional
+
 import networkx as nx
+from pydantic import BaseModel
+
+from . import export
+from .filing_store import FilingHandle, FilingStore
+from .grant_index import GrantIndex
+from .propublica_sdk import FilingNotFoundError, ProPublicaClient
+from .officer_index import OfficerIndex
+from .streaming import Event, NodeSetGraph, iter_events
+from .utils import as_amount, normalize_name
+from .vendor_index import VendorIndex, vendor_attributes
 
-from nonprofit_networks.response_types import Form990PartVIISectionAGrp_
-from .propublica_sdk import ProPublicaClient
+# numpy (for ArrayGraph) and the filing models are only imported when used
+if TYPE_CHECKING:
+    from .array_graph import ArrayGraph
+    from .response_types import Form990PartVIISectionAGrp_
 
 Ein = str
 
 THIS_YEAR = datetime.datetime.now().year
 
+_CHECKPOINT_VERSION = 1
+
 
 class NetworkBuilder(abc.ABC):
     def get_graph(self): ...
@@ -20,47 +42,1091 @@ class NetworkXNetworkBuilder(NetworkBuilder):
     def get_graph(self):
         return self.graph
 
+    def to_sparse_adjacency(
+        self, weight: str = "amount", label: str | None = "GrantFunded"
+    ):
+        """
+        Get the graph as a SciPy CSR adjacency matrix, with the amounts of
+        parallel grants summed, and the node at each row/column index.
+        """
+        return export.to_sparse_adjacency(self.graph, weight=weight, label=label)
+
+    def node_table(self):
+        """
+        Get the nodes as a DataFrame (id, label, name, net_assets, ...).
+        """
+        return export.node_table(self.graph)
+
+    def edge_table(self):
+        """
+        Get the edges as a DataFrame (source, target, label, amount, memo).
+        """
+        return export.edge_table(self.graph)
+
+    def to_arrow(self):
+        """
+        Get the node and edge tables as Arrow tables. Requires pyarrow.
+        """
+        return export.to_arrow(self.graph)
+
+    def to_parquet(self, nodes_path: str, edges_path: str):
+        """
+        Write the node and edge tables to Parquet files. Requires pyarrow.
+        """
+        export.to_parquet(self.graph, nodes_path, edges_path)
+
+    def write_ndjson(self, path: str):
+        """
+        Stream the nodes and edges to a newline-delimited JSON file.
+        """
+        export.write_ndjson(self.graph, path)
+
+    def write_graphml(self, path: str):
+        """
+        Stream the graph to a GraphML file.
+        """
+        export.write_graphml(self.graph, path)
+
+
+class CrawlBudget(BaseModel):
+    """
+    Limits on how much work a network crawl may do. Any limit that is None is
+    not enforced.
+    """
+
+    # Maximum number of organizations the crawl may add to the graph
+    max_nodes: Optional[int] = None
+    # Maximum number of HTTP requests the client may issue during the crawl
+    max_requests: Optional[int] = None
+    # Wall-clock limit for the crawl, in seconds
+    max_seconds: Optional[float] = None
+    # Grants with a CashGrantAmt below this are neither added nor followed
+    min_grant_amount: Optional[float] = None
+
+
+def _grant_amount(grant) -> float:
+    return as_amount(grant.CashGrantAmt, default=0.0)
+
+
+class _BudgetTracker:
+    """
+    Keeps track of how much of a CrawlBudget a crawl has spent.
+    """
+
+    def __init__(self, budget: CrawlBudget | None, client: ProPublicaClient):
+        self.budget = budget or CrawlBudget()
+        self.client = client
+        self.started = time.monotonic()
+        self.start_requests = getattr(client, "request_count", 0)
+        self.nodes_added = 0
+        self.exhausted: str | None = None
+
+    def check(self) -> bool:
+        """
+        Return True if the crawl may continue, recording why it may not.
+        """
+        budget = self.budget
+        if budget.max_nodes is not None and self.nodes_added >= budget.max_nodes:
+            self.exhausted = "max_nodes"
+        elif (
+            budget.max_requests is not None
+            and getattr(self.client, "request_count", 0) - self.start_requests
+            >= budget.max_requests
+        ):
+            self.exhausted = "max_requests"
+        elif (
+            budget.max_seconds is not None
+            and time.monotonic() - self.started >= budget.max_seconds
+        ):
+            self.exhausted = "max_seconds"
+        return self.exhausted is None
+
+    def allows_grant(self, grant) -> bool:
+        if self.budget.min_grant_amount is None:
+            return True
+        return _grant_amount(grant) >= self.budget.min_grant_amount
+
+    def remaining_nodes(self) -> int | None:
+        if self.budget.max_nodes is None:
+            return None
+        return max(self.budget.max_nodes - self.nodes_added, 0)
+
 
 class GrantmakerNetworkBuilder(NetworkXNetworkBuilder):
     def __init__(
-        self, client: ProPublicaClient, existing_graph: nx.MultiDiGraph | None = None
+        self,
+        client: ProPublicaClient,
+        existing_graph: nx.MultiDiGraph | nx.DiGraph | None = None,
+        max_workers: int = 8,
+        filing_store: FilingStore | None = None,
+        checkpoint_path: str | None = None,
+        checkpoint_interval: float = 60.0,
+        track_index_changes: bool = False,
+        grant_index: GrantIndex | None = None,
+        aggregate: bool = False,
+        max_purposes: int = 5,
+        on_event: Callable[[Event], None] | None = None,
+        retain_graph: bool = True,
     ):
+        """
+        Build a network of grantmakers and their grant recipients.
+
+        Organization nodes carry a `filing` handle (see FilingStore) and the
+        scalar attributes `name`, `net_assets`, `revenue` and `expenses`.
+
+        By default the network is an `nx.MultiDiGraph` with one edge per
+        Schedule I row, carrying the row as `grant`. With `aggregate=True` it
+        is an `nx.DiGraph` with one edge per grantor and recipient, whose
+        `amount` is the sum of the rows, along with their `count`, the
+        largest single `max_amount`, the `year`, and up to `max_purposes`
+        distinct `purposes` (the first of which is also the `memo`).
+
+        Arguments:
+            client (ProPublicaClient): The client used to fetch filings.
+            existing_graph (nx.MultiDiGraph | nx.DiGraph): An optional graph
+                to add to; an nx.DiGraph when `aggregate` is set.
+            max_workers (int): The number of filings to fetch concurrently
+                while expanding each level of the crawl.
+            filing_store (FilingStore): An optional store to share filings
+                with other builders. Defaults to a new store for the client.
+            checkpoint_path (str): If set, the graph and the pending frontier
+                are saved to this file during the crawl, so that an
+                interrupted crawl can be continued with `resume()`.
+            checkpoint_interval (float): Minimum number of seconds between
+                two checkpoints.
+            track_index_changes (bool): Record the IRS index OBJECT_ID of
+                every organization's filing after each build, so that
+                `refresh()` only re-fetches filings that have changed.
+            grant_index (GrantIndex): An optional index of Schedule I grants,
+                used by `build_upstream_network()` to find funders.
+            aggregate (bool): Fold repeated grants between the same two
+                organizations into a single weighted edge as they are found.
+            max_purposes (int): The number of distinct grant purposes to
+                keep on each aggregated edge.
+            on_event (Callable): Called with a node or edge event (a dict in
+                the format of `export.write_ndjson`, with a `type` of "node"
+                or "edge") the moment each organization or grant is added,
+                e.g. an `export.NDJSONSink`. See also `stream_network()`.
+            retain_graph (bool): Keep the network in memory. If False, only
+                the EINs seen so far are kept, so a crawl streaming to
+                `on_event` runs in memory that does not grow with the number
+                of grants.
+        """
+        if aggregate and (on_event is not None or not retain_graph):
+            raise ValueError("Aggregated edges are only final once the crawl ends")
+        if not retain_graph and track_index_changes:
+            raise ValueError("track_index_changes needs retain_graph=True")
         self.client = client
-        self.graph = existing_graph or nx.MultiDiGraph()
+        self.aggregate = aggregate
+        self.max_purposes = max_purposes
+        self.on_event = on_event
+        if not retain_graph:
+            existing_graph = NodeSetGraph()
+        elif existing_graph is None:
+            existing_graph = nx.DiGraph() if aggregate else nx.MultiDiGraph()
+        elif aggregate and existing_graph.is_multigraph():
+            raise ValueError("An aggregated network needs an nx.DiGraph")
+        self.graph = existing_graph
+        self.max_workers = max_workers
+        self.filing_store = filing_store or FilingStore(client)
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.track_index_changes = track_index_changes
+        self.grant_index = grant_index
+        # The budget limit that stopped the last crawl early, if any
+        self.budget_exhausted: str | None = None
+        self._last_checkpoint = time.monotonic()
+        self._queue_order = 0
 
-    def build_network(self, ein: Ein, depth: int, year: int = THIS_YEAR - 1):
-        self._build_network(ein, depth, year)
+    def build_network(
+        self,
+        ein: Ein,
+        depth: int,
+        year: int = THIS_YEAR - 1,
+        budget: CrawlBudget | None = None,
+        best_first: bool = False,
+    ):
+        """
+        Crawl the grant network outwards from an organization.
 
-    def _build_network(self, ein: Ein, depth: int, year: int = THIS_YEAR - 1):
-        if depth == 0:
+        Arguments:
+            ein (str): The EIN of the organization to start from.
+            depth (int): How many grants away from `ein` to crawl.
+            year (int): The filing year to use for every organization.
+            budget (CrawlBudget): Optional limits on the crawl. If the crawl
+                stops early, `budget_exhausted` names the limit it hit.
+            best_first (bool): Expand grants in descending order of amount
+                instead of level by level, so that a limited budget is spent
+                on the largest flows of money first.
+        """
+        tracker = _BudgetTracker(budget, self.client)
+        self._last_checkpoint = time.monotonic()
+        if best_first:
+            self._build_network_best_first(ein, depth, year, tracker)
+        else:
+            self._build_network(ein, depth, year, tracker)
+        self._finish(year, tracker)
+
+    def add_organizations(self, eins: Iterable[Ein], year: int = THIS_YEAR - 1):
+        """
+        Add organizations without crawling their grants, e.g. to give a
+        StaffNetworkBuilder something to start from. Filings are fetched
+        concurrently.
+
+        Returns:
+            list[str]: The EINs whose filings could be fetched and were added.
+        """
+        filings = self._fetch_filings(list(dict.fromkeys(eins)), year)
+        for ein in filings:
+            self._start(ein, year)
+        return list(filings)
+
+    def stream_network(
+        self,
+        ein: Ein,
+        depth: int,
+        year: int = THIS_YEAR - 1,
+        budget: CrawlBudget | None = None,
+        best_first: bool = False,
+        max_pending: int = 1024,
+    ) -> Iterator[Event]:
+        """
+        Crawl the grant network like `build_network`, in a background thread,
+        yielding node and edge events as they are discovered.
+
+        Arguments:
+            max_pending (int): The number of events that may be waiting to
+                be consumed before the crawl pauses.
+            Every other argument is as for `build_network`.
+
+        Returns:
+            Iterator[dict]: The events. Closing the iterator stops the crawl.
+        """
+
+        def crawl(emit: Callable[[Event], None]):
+            listener = self.on_event
+            if listener is None:
+                self.on_event = emit
+            else:
+                self.on_event = lambda event: (listener(event), emit(event))
+            try:
+                self.build_network(ein, depth, year, budget, best_first)
+            finally:
+                self.on_event = listener
+
+        return iter_events(crawl, max_pending=max_pending)
+
+    def _put_node(self, ein: Ein, **attributes):
+        self.graph.add_node(ein, **attributes)
+        if self.on_event is not None:
+            self.on_event({"type": "node", **export.node_record(ein, attributes)})
+
+    def _put_edge(self, grantor: Ein, recipient: Ein, year: int | None, **attributes):
+        self.graph.add_edge(grantor, recipient, **attributes)
+        if self.on_event is not None:
+            record = export.edge_record(
+                grantor, recipient, {"year": year, **attributes}
+            )
+            self.on_event({"type": "edge", **record})
+
+    def build_upstream_network(
+        self, ein: Ein, depth: int, year: int | None = THIS_YEAR - 1
+    ):
+        """
+        Add the funders of an organization, their funders, and so on, from
+        the builder's `grant_index`. This needs no requests at all, and can be
+        combined with `build_network` for a bidirectional network.
+
+        Funders that are not in the graph yet are added with the name from
+        the index, but without a filing.
+
+        Arguments:
+            ein (str): The EIN of the organization to start from.
+            depth (int): How many grants upstream of `ein` to follow.
+            year (int): Only follow grants reported for this year. If None,
+                grants of every indexed year are followed.
+        """
+        if self.grant_index is None:
+            raise ValueError("build_upstream_network needs a grant_index")
+        if ein not in self.graph:
+            self._put_node(
+                ein, name=self.grant_index.name(ein), __labels__=set(["Organization"])
+            )
+        expanded: set[Ein] = set()
+        frontier = [ein]
+        for _ in range(depth):
+            next_frontier: dict[Ein, None] = {}
+            for recipient in frontier:
+                expanded.add(recipient)
+                records = self.grant_index.funders(recipient, year)
+                # Aggregated edges that already exist hold all of their rows
+                folded = {
+                    r.grantor_ein
+                    for r in records
+                    if self.aggregate and self.graph.has_edge(r.grantor_ein, recipient)
+                }
+                for record in records:
+                    grantor = record.grantor_ein
+                    if grantor not in self.graph:
+                        self._put_node(
+                            grantor,
+                            name=record.grantor_name,
+                            __labels__=set(["Organization"]),
+                        )
+                    if self.aggregate:
+                        if grantor not in folded:
+                            self._fold_grant(
+                                grantor,
+                                recipient,
+                                record.amount,
+                                record.purpose,
+                                record.year,
+                            )
+                    elif not self._has_grant(grantor, recipient, record):
+                        self._put_edge(
+                            grantor,
+                            recipient,
+                            record.year,
+                            grant=record,
+                            amount=record.amount,
+                            memo=record.purpose,
+                            __labels__=set(["GrantFunded"]),
+                        )
+                    if grantor not in expanded:
+                        next_frontier[grantor] = None
+            frontier = list(next_frontier)
+
+    def _has_grant(self, grantor: Ein, recipient: Ein, record) -> bool:
+        """
+        Whether the graph already has this grant, e.g. from a downstream crawl.
+        """
+        if not self.graph.has_edge(grantor, recipient):
+            return False
+        return any(
+            as_amount(data.get("amount"), default=0.0) == record.amount
+            and data.get("memo") == record.purpose
+            for data in self.graph[grantor][recipient].values()
+        )
+
+    def resume(
+        self, checkpoint_path: str | None = None, budget: CrawlBudget | None = None
+    ):
+        """
+        Restore the graph from a checkpoint and continue the crawl it recorded.
+
+        Arguments:
+            checkpoint_path (str): The checkpoint to resume from. Defaults to
+                the builder's `checkpoint_path`.
+            budget (CrawlBudget): Optional limits for the rest of the crawl.
+        """
+        checkpoint_path = checkpoint_path or self.checkpoint_path
+        if not checkpoint_path:
+            raise ValueError("No checkpoint_path to resume from")
+        self.checkpoint_path = checkpoint_path
+        with open(checkpoint_path, "rb") as f:
+            checkpoint = pickle.load(f)
+        if checkpoint.get("version") != _CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version in {checkpoint_path}")
+
+        self.graph = checkpoint["graph"]
+        self.filing_store.attach(self.graph)
+        state = checkpoint["state"]
+        if state is None:
+            # The checkpointed crawl had already finished
             return
-        filing = self.client.get_full_filing(ein, year)
-        self.graph.add_node(
-            ein, filing=filing, name=filing.get_name(), __labels__=set(["Organization"])
+
+        tracker = _BudgetTracker(budget, self.client)
+        self._last_checkpoint = time.monotonic()
+        if state["mode"] == "best_first":
+            self._queue_order = state["order"]
+            self._crawl_best_first(
+                state["queue"],
+                state["expanded"],
+                state["depth"],
+                state["year"],
+                tracker,
+            )
+        else:
+            self._crawl_levels(
+                state["frontier"],
+                state["expanded"],
+                state["levels_left"],
+                state["year"],
+                tracker,
+                state["pending"],
+            )
+        self._finish(state["year"], tracker)
+
+    def refresh(self, year: int = THIS_YEAR - 1):
+        """
+        Bring the graph up to date with the IRS index.
+
+        The index for `year` is revalidated (and updated if it changed), and
+        only the organizations whose filing has changed since it was recorded
+        (or that have no recorded filing yet) are re-fetched, along with the
+        grants they made.
+        Recipients that could not be fetched during the crawl are added if
+        their filing has since appeared in the index.
+
+        Arguments:
+            year (int): The filing year the graph was built for.
+        """
+        if isinstance(self.graph, NodeSetGraph):
+            raise ValueError("refresh needs retain_graph=True")
+        self.client.download_irs_indices([year + 1])
+        organizations = [
+            ein
+            for ein, data in self.graph.nodes(data=True)
+            if "Organization" in data.get("__labels__", set())
+            and isinstance(data.get("filing"), FilingHandle)
+            and data["filing"].year == year
+        ]
+        missing = self.graph.graph.get("missing_recipients", {})
+        object_ids = self.client.get_index_object_ids(
+            organizations + list(missing), year
+        )
+
+        changed = [
+            ein
+            for ein in organizations
+            if ein in object_ids
+            and self.graph.nodes[ein].get("object_id") != object_ids[ein]
+        ]
+        appeared = [ein for ein in missing if ein in object_ids]
+        for ein in changed + appeared:
+            self.filing_store.invalidate(ein, year)
+        self._fetch_filings(changed, year)
+        for ein in changed:
+            filing = self._fetch_filing(ein, year)
+            if filing is None:
+                continue
+            self._put_node(ein, **self.filing_store.node_attributes(ein, year))
+            self.graph.nodes[ein]["object_id"] = object_ids[ein]
+            # Replace the grants this organization made with the current ones
+            self.graph.remove_edges_from(self._grant_edges_from(ein))
+            self._add_grants_from(ein, filing, year)
+
+        appeared = [ein for ein in appeared if ein in missing]
+        fetched = self._fetch_filings(appeared, year)
+        for recipient in appeared:
+            grantors = missing.pop(recipient)
+            if recipient not in fetched:
+                continue
+            if recipient not in self.graph:
+                self._add_organization(recipient, year)
+            self.graph.nodes[recipient]["object_id"] = object_ids[recipient]
+            for grantor in grantors:
+                if self.graph.has_edge(grantor, recipient):
+                    # Already re-added with the grantor's changed filing above
+                    continue
+                grantor_filing = self._fetch_filing(grantor, year)
+                if grantor_filing is None:
+                    continue
+                for grant in self._followable_grants(grantor_filing):
+                    if grant.RecipientEIN == recipient:
+                        self._add_grant(grantor, grant, year)
+        self._maybe_checkpoint(None, force=True)
+
+    def _finish(self, year: int, tracker: _BudgetTracker):
+        self.budget_exhausted = tracker.exhausted
+        if self.track_index_changes:
+            self._record_object_ids(year)
+        if tracker.exhausted is None:
+            self._maybe_checkpoint(None, force=True)
+
+    def _record_object_ids(self, year: int):
+        """
+        Record the IRS index OBJECT_ID of each organization's filing.
+        """
+        eins = [
+            ein
+            for ein, data in self.graph.nodes(data=True)
+            if isinstance(data.get("filing"), FilingHandle)
+            and data["filing"].year == year
+            and "object_id" not in data
+        ]
+        for ein, object_id in self.client.get_index_object_ids(eins, year).items():
+            self.graph.nodes[ein]["object_id"] = object_id
+
+    def _maybe_checkpoint(self, state: dict | None, force: bool = False):
+        """
+        Save the graph and the pending crawl state, if a checkpoint is due.
+
+        A state of None marks the crawl as complete.
+        """
+        if not self.checkpoint_path:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_checkpoint < self.checkpoint_interval:
+            return
+        checkpoint = {
+            "version": _CHECKPOINT_VERSION,
+            "graph": self.graph,
+            "state": state,
+        }
+        # Write to a temporary file first so a crash never leaves a torn checkpoint
+        directory = os.path.dirname(os.path.abspath(self.checkpoint_path))
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile("wb", dir=directory, delete=False) as f:
+            pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f.name, self.checkpoint_path)
+        self._last_checkpoint = now
+
+    def _fetch_filing(self, ein: Ein, year: int):
+        """
+        Fetch a filing, returning None if it cannot be retrieved.
+        """
+        return self.filing_store.try_get(ein, year)
+
+    def _fetch_filings(
+        self, eins: list[Ein], year: int, tracker: _BudgetTracker | None = None
+    ) -> dict:
+        """
+        Fetch the filings for a whole frontier level concurrently.
+
+        Returns:
+            dict: A mapping from EIN to filing, for the filings that succeeded.
+        """
+
+        def fetch(ein: Ein):
+            if tracker is not None and not tracker.check():
+                return None
+            return self._fetch_filing(ein, year)
+
+        if not eins:
+            return {}
+        if self.max_workers <= 1 or len(eins) == 1:
+            filings = [fetch(ein) for ein in eins]
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                filings = list(pool.map(fetch, eins))
+        return {ein: f for ein, f in zip(eins, filings) if f is not None}
+
+    def _add_organization(
+        self, ein: Ein, year: int, tracker: _BudgetTracker | None = None
+    ):
+        self._put_node(
+            ein,
+            **self.filing_store.node_attributes(ein, year),
+            __labels__=set(["Organization"]),
+        )
+        if tracker is not None:
+            tracker.nodes_added += 1
+
+    def _add_grant(self, grantor: Ein, grant, year: int):
+        if self.aggregate:
+            self._fold_grant(
+                grantor,
+                grant.RecipientEIN,
+                _grant_amount(grant),
+                grant.PurposeOfGrantTxt,
+                year,
+            )
+            return
+        self._put_edge(
+            grantor,
+            grant.RecipientEIN,
+            year,
+            grant=grant,
+            amount=grant.CashGrantAmt,
+            memo=grant.PurposeOfGrantTxt,
+            __labels__=set(["GrantFunded"]),
+        )
+
+    def _fold_grant(
+        self, grantor: Ein, recipient: Ein, amount: float, purpose, year: int | None
+    ):
+        """
+        Fold one Schedule I row into the single aggregated edge between a
+        grantor and a recipient.
+        """
+        if not isinstance(purpose, str):
+            purpose = None
+        if not self.graph.has_edge(grantor, recipient):
+            self.graph.add_edge(
+                grantor,
+                recipient,
+                amount=amount,
+                count=1,
+                max_amount=amount,
+                memo=purpose,
+                purposes=[purpose] if purpose else [],
+                year=year,
+                __labels__=set(["GrantFunded"]),
+            )
+            return
+        edge = self.graph[grantor][recipient]
+        edge["amount"] += amount
+        edge["count"] += 1
+        edge["max_amount"] = max(edge["max_amount"], amount)
+        purposes = edge["purposes"]
+        if purpose and purpose not in purposes and len(purposes) < self.max_purposes:
+            purposes.append(purpose)
+
+    def _grant_edges_from(self, grantor: Ein) -> list[tuple]:
+        """
+        The grant edges out of an organization, in the form that
+        `remove_edges_from` takes for the graph.
+        """
+        if not self.graph.is_multigraph():
+            return [
+                (u, v)
+                for u, v, labels in self.graph.out_edges(grantor, data="__labels__")
+                if labels and "GrantFunded" in labels
+            ]
+        return [
+            (u, v, k)
+            for u, v, k, labels in self.graph.out_edges(
+                grantor, keys=True, data="__labels__"
+            )
+            if labels and "GrantFunded" in labels
+        ]
+
+    def _add_grants_from(self, grantor: Ein, filing, year: int):
+        """
+        Add all of an organization's grants, fetching recipients not yet in
+        the graph but without expanding them further.
+        """
+        grants = list(self._followable_grants(filing))
+        new = list(
+            {g.RecipientEIN: None for g in grants if g.RecipientEIN not in self.graph}
+        )
+        fetched = self._fetch_filings(new, year)
+        for grant in grants:
+            recipient = grant.RecipientEIN
+            if recipient not in self.graph:
+                if recipient not in fetched:
+                    self._record_missing(grantor, recipient)
+                    continue
+                self._add_organization(recipient, year)
+            self._add_grant(grantor, grant, year)
+
+    def _record_missing(self, grantor: Ein, recipient: Ein):
+        """
+        Remember a recipient whose filing could not be fetched, so that
+        `refresh()` can add it once it appears in the IRS index.
+        """
+        grantors = self.graph.graph.setdefault("missing_recipients", {}).setdefault(
+            recipient, []
         )
+        if grantor not in grantors:
+            grantors.append(grantor)
+
+    def _followable_grants(self, filing, tracker: _BudgetTracker | None = None):
         for grant in filing.get_grant_recipients():
             if not grant.RecipientEIN or not isinstance(grant.RecipientEIN, str):
                 continue
+            if tracker is not None and not tracker.allows_grant(grant):
+                continue
+            yield grant
+
+    def _start(self, ein: Ein, year: int, tracker: _BudgetTracker | None = None):
+        filing = self.filing_store.get(ein, year)
+        if ein not in self.graph:
+            self._add_organization(ein, year, tracker)
+        else:
+            self.graph.add_node(ein, **self.filing_store.node_attributes(ein, year))
+        return filing
+
+    def _build_network(
+        self,
+        ein: Ein,
+        depth: int,
+        year: int = THIS_YEAR - 1,
+        tracker: _BudgetTracker | None = None,
+    ):
+        """
+        Crawl the grant network breadth-first, one level at a time.
+
+        Every organization is fetched at most once and expanded at most once,
+        and each level's filings are fetched concurrently.
+        """
+        if depth == 0:
+            return
+        self._start(ein, year, tracker)
+        self._crawl_levels([ein], set(), depth, year, tracker)
+
+    def _crawl_levels(
+        self,
+        frontier: list[Ein],
+        expanded: set[Ein],
+        levels_left: int,
+        year: int,
+        tracker: _BudgetTracker | None = None,
+        pending: list | None = None,
+    ):
+        # Grants whose recipients were skipped because the budget ran out:
+        pending = pending or []
+        filings: dict = {}
+        while True:
+            state = {
+                "mode": "bfs",
+                "year": year,
+                "frontier": frontier,
+                "expanded": expanded,
+                "levels_left": levels_left,
+                "pending": pending,
+            }
+            if tracker is not None and not tracker.check():
+                self._maybe_checkpoint(state, force=True)
+                return
+            self._maybe_checkpoint(state)
+
+            if pending:
+                added, pending, fetched = self._resolve_grants(
+                    pending, year, expanded, tracker
+                )
+                filings.update(fetched)
+                frontier = list(dict.fromkeys(frontier + added))
+                continue
+            if levels_left <= 0 or not frontier:
+                return
+
+            # Collect the grants of this level in discovery order:
+            level_grants = []
+            for grantor in frontier:
+                expanded.add(grantor)
+                grantor_filing = filings.get(grantor)
+                if grantor_filing is None:
+                    grantor_filing = self._fetch_filing(grantor, year)
+                if grantor_filing is None:
+                    continue
+                for grant in self._followable_grants(grantor_filing, tracker):
+                    level_grants.append((grantor, grant))
+
+            frontier, pending, filings = self._resolve_grants(
+                level_grants, year, expanded, tracker
+            )
+            levels_left -= 1
+
+    def _resolve_grants(
+        self,
+        grants: list,
+        year: int,
+        expanded: set[Ein],
+        tracker: _BudgetTracker | None = None,
+    ):
+        """
+        Fetch the recipients of a list of (grantor, grant) pairs concurrently,
+        and add them and the grants to the graph.
+
+        Returns:
+            tuple: The recipients that have not been expanded yet, the pairs
+                whose recipients were skipped because of the budget, and the
+                filings that were fetched.
+        """
+        to_fetch: dict[Ein, None] = {}
+        for _, grant in grants:
             if grant.RecipientEIN not in self.graph:
-                try:
-                    filing = self.client.get_full_filing(grant.RecipientEIN, year)
-                    self.graph.add_node(
-                        grant.RecipientEIN,
-                        filing=filing,
-                        name=filing.get_name(),
-                        __labels__=set(["Organization"]),
-                    )
-                except Exception:
+                to_fetch[grant.RecipientEIN] = None
+        eins = list(to_fetch)
+        if tracker is not None and tracker.remaining_nodes() is not None:
+            eins = eins[: tracker.remaining_nodes()]
+        fetched = self._fetch_filings(eins, year, tracker)
+
+        next_frontier: dict[Ein, None] = {}
+        skipped = []
+        for grantor, grant in grants:
+            recipient = grant.RecipientEIN
+            if recipient not in self.graph:
+                if recipient not in fetched:
+                    if self.filing_store.failed(recipient, year):
+                        self._record_missing(grantor, recipient)
+                    else:
+                        skipped.append((grantor, grant))
                     continue
-            self.graph.add_edge(
-                ein,
-                grant.RecipientEIN,
-                grant=grant,
-                amount=grant.CashGrantAmt,
-                memo=grant.PurposeOfGrantTxt,
-                __labels__=set(["GrantFunded"]),
+                self._add_organization(recipient, year, tracker)
+            self._add_grant(grantor, grant, year)
+            if recipient not in expanded:
+                next_frontier[recipient] = None
+        return list(next_frontier), skipped, fetched
+
+    def _build_network_best_first(
+        self,
+        ein: Ein,
+        depth: int,
+        year: int = THIS_YEAR - 1,
+        tracker: _BudgetTracker | None = None,
+    ):
+        """
+        Crawl the grant network largest-grant-first from a priority queue.
+
+        Grants are popped in batches of `max_workers`, whose recipients are
+        fetched concurrently.
+        """
+        if depth == 0:
+            return
+        filing = self._start(ein, year, tracker)
+        queue: list = []
+        expanded: set[Ein] = set()
+        self._queue_order = 0
+        self._expand_best_first(queue, expanded, ein, filing, 0, tracker)
+        self._crawl_best_first(queue, expanded, depth, year, tracker)
+
+    def _expand_best_first(
+        self,
+        queue: list,
+        expanded: set[Ein],
+        grantor: Ein,
+        filing,
+        level: int,
+        tracker: _BudgetTracker | None = None,
+    ):
+        expanded.add(grantor)
+        for grant in self._followable_grants(filing, tracker):
+            self._queue_order += 1
+            heapq.heappush(
+                queue,
+                (-_grant_amount(grant), self._queue_order, grantor, level + 1, grant),
             )
-            self._build_network(grant.RecipientEIN, depth - 1, year)
+
+    def _crawl_best_first(
+        self,
+        queue: list,
+        expanded: set[Ein],
+        depth: int,
+        year: int,
+        tracker: _BudgetTracker | None = None,
+    ):
+        while queue:
+            state = {
+                "mode": "best_first",
+                "year": year,
+                "depth": depth,
+                "queue": queue,
+                "expanded": expanded,
+                "order": self._queue_order,
+            }
+            if tracker is not None and not tracker.check():
+                self._maybe_checkpoint(state, force=True)
+                return
+            self._maybe_checkpoint(state)
+
+            batch = [
+                heapq.heappop(queue) for _ in range(min(self.max_workers, len(queue)))
+            ]
+            to_fetch: dict[Ein, None] = {}
+            for *_, grant in batch:
+                if grant.RecipientEIN not in self.graph:
+                    to_fetch[grant.RecipientEIN] = None
+            eins = list(to_fetch)
+            if tracker is not None and tracker.remaining_nodes() is not None:
+                eins = eins[: tracker.remaining_nodes()]
+            fetched = self._fetch_filings(eins, year, tracker)
+
+            for item in batch:
+                _, _, grantor, level, grant = item
+                recipient = grant.RecipientEIN
+                if recipient not in self.graph:
+                    if recipient not in fetched:
+                        if self.filing_store.failed(recipient, year):
+                            self._record_missing(grantor, recipient)
+                        else:
+                            # Skipped because of the budget; keep it for resume()
+                            heapq.heappush(queue, item)
+                        continue
+                    self._add_organization(recipient, year, tracker)
+                self._add_grant(grantor, grant, year)
+                if level < depth and recipient not in expanded:
+                    recipient_filing = fetched.get(recipient) or self._fetch_filing(
+                        recipient, year
+                    )
+                    if recipient_filing is not None:
+                        self._expand_best_first(
+                            queue, expanded, recipient, recipient_filing, level, tracker
+                        )
+
+
+class ArrayGrantmakerNetworkBuilder(GrantmakerNetworkBuilder):
+    """
+    A GrantmakerNetworkBuilder that stores its network in an ArrayGraph
+    rather than an `nx.MultiDiGraph`, for crawls with millions of grants.
+
+    Edges keep only their `amount`, `memo`, `year` and labels (not the
+    Schedule I `grant` row). `get_graph()` converts the network to networkx
+    on demand; the exporters and `analytics` work on `graph` directly.
+    """
+
+    graph: "ArrayGraph"
+
+    def __init__(
+        self,
+        client: ProPublicaClient,
+        existing_graph: "ArrayGraph | nx.MultiDiGraph | None" = None,
+        **kwargs,
+    ):
+        """
+        Build a network of grantmakers and their grant recipients.
+
+        Arguments:
+            client (ProPublicaClient): The client used to fetch filings.
+            existing_graph (ArrayGraph | nx.MultiDiGraph): An optional graph
+                to add to. A networkx graph is copied into an ArrayGraph.
+            **kwargs: Any other GrantmakerNetworkBuilder argument.
+        """
+        if kwargs.get("aggregate") or not kwargs.get("retain_graph", True):
+            raise ValueError(
+                "ArrayGrantmakerNetworkBuilder always keeps every grant edge"
+            )
+        from .array_graph import ArrayGraph
+
+        super().__init__(client, **kwargs)
+        if existing_graph is None:
+            self.graph = ArrayGraph()
+        elif isinstance(existing_graph, ArrayGraph):
+            self.graph = existing_graph
+        else:
+            self.graph = ArrayGraph.from_networkx(existing_graph)
+
+    def get_graph(self) -> nx.MultiDiGraph:
+        return self.graph.to_networkx()
+
+
+class TemporalGrantNetworkBuilder(NetworkXNetworkBuilder):
+    def __init__(
+        self,
+        client: ProPublicaClient,
+        max_workers: int = 8,
+        filing_store: FilingStore | None = None,
+        aggregate: bool = False,
+    ):
+        """
+        Build a single grant network spanning several filing years.
+
+        Every edge carries the `year` of the filing that reported the grant.
+        Organization nodes carry `name` (from their latest filing), `filings`
+        (a mapping from year to FilingHandle) and `financials` (a mapping from
+        year to net assets, revenue and expenses).
+
+        The graph's `unfiled_years` lists the years in which the starting
+        organization has no filing, and `failed_years` maps the years whose
+        crawl failed for any other reason (a request or parsing error) to the
+        error, so that a partial network is never mistaken for a full one.
+
+        Arguments:
+            client (ProPublicaClient): The client used to fetch filings.
+            max_workers (int): The number of filings to fetch concurrently
+                for each year.
+            filing_store (FilingStore): An optional store to share filings
+                with other builders. Defaults to a new store for the client.
+            aggregate (bool): Fold repeated grants into a single weighted
+                edge per grantor, recipient and year (see
+                GrantmakerNetworkBuilder).
+        """
+        self.client = client
+        self.graph = nx.MultiDiGraph()
+        self.max_workers = max_workers
+        self.filing_store = filing_store or FilingStore(client)
+        self.aggregate = aggregate
+
+    def build_network(
+        self,
+        ein: Ein,
+        depth: int,
+        years: Iterable[int],
+        budget: CrawlBudget | None = None,
+        best_first: bool = False,
+    ):
+        """
+        Crawl the grant network of every year in `years` concurrently.
+
+        All years share one FilingStore and client, so index loads and
+        filings needed by several years are only fetched once.
+
+        Arguments:
+            ein (str): The EIN of the organization to start from.
+            depth (int): How many grants away from `ein` to crawl.
+            years (Iterable[int]): The filing years to crawl.
+            budget (CrawlBudget): Optional limits, applied to each year.
+            best_first (bool): Expand the largest grants first.
+        """
+        years = sorted(set(years))
+        builders = {
+            year: GrantmakerNetworkBuilder(
+                self.client,
+                max_workers=self.max_workers,
+                filing_store=self.filing_store,
+                aggregate=self.aggregate,
+            )
+            for year in years
+        }
+
+        def crawl(year: int) -> Exception | None:
+            try:
+                builders[year].build_network(
+                    ein, depth, year, budget=budget, best_first=best_first
+                )
+            except FilingNotFoundError:
+                # The organization did not file that year
+                unfiled.append(year)
+            except Exception as e:
+                return e
+            return None
+
+        unfiled: list[int] = []
+        with ThreadPoolExecutor(max_workers=max(len(years), 1)) as pool:
+            errors = dict(zip(years, pool.map(crawl, years)))
+
+        for year in years:
+            self._merge(builders[year].get_graph(), year)
+        self._record_failures(sorted(unfiled), errors)
+
+    def _record_failures(self, unfiled: list[int], errors: dict):
+        """
+        Record the years in which the organization has no filing, and the
+        years whose crawl failed (and may be partial) with the reason.
+        """
+        unfiled_years = self.graph.graph.setdefault("unfiled_years", [])
+        unfiled_years.extend(y for y in unfiled if y not in unfiled_years)
+        failed_years = self.graph.graph.setdefault("failed_years", {})
+        for year, error in errors.items():
+            if error is not None:
+                failed_years[year] = f"{type(error).__name__}: {error}"
+
+    def _merge(self, year_graph: nx.MultiDiGraph | nx.DiGraph, year: int):
+        for ein, data in year_graph.nodes(data=True):
+            if ein not in self.graph:
+                self.graph.add_node(
+                    ein,
+                    filings={},
+                    financials={},
+                    __labels__=set(["Organization"]),
+                )
+            node = self.graph.nodes[ein]
+            node["name"] = data.get("name") or node.get("name")
+            if isinstance(data.get("filing"), FilingHandle):
+                node["filings"][year] = data["filing"]
+                node["financials"][year] = {
+                    "net_assets": data.get("net_assets"),
+                    "revenue": data.get("revenue"),
+                    "expenses": data.get("expenses"),
+                }
+        for grantor, recipient, data in year_graph.edges(data=True):
+            self.graph.add_edge(grantor, recipient, **{**data, "year": year})
+
+    def snapshot(self, year: int) -> nx.MultiDiGraph:
+        """
+        Get a read-only view of the network as reported in one year's filings.
+
+        Arguments:
+            year (int): The filing year.
+
+        Returns:
+            nx.MultiDiGraph: A view with only that year's grants, and the
+                organizations that filed that year or took part in them.
+        """
+        graph = self.graph
+
+        def filter_edge(u, v, k):
+            return graph[u][v][k].get("year") == year
+
+        active = {n for n, filings in graph.nodes(data="filings") if year in filings}
+        for u, v, y in graph.edges(data="year"):
+            if y == year:
+                active.update((u, v))
+        return nx.subgraph_view(
+            graph, filter_node=lambda n: n in active, filter_edge=filter_edge
+        )
 
 
 class StaffNetworkBuilder(NetworkXNetworkBuilder):
@@ -69,10 +1135,64 @@ class StaffNetworkBuilder(NetworkXNetworkBuilder):
         client: ProPublicaClient,
         existing_graph: nx.MultiDiGraph | None = None,
         organization_subset: list[Ein] | None = None,
+        filing_store: FilingStore | None = None,
+        max_workers: int = 8,
+        officer_index: OfficerIndex | None = None,
     ):
+        """
+        Add the staff of organizations to a network, and link them to the
+        other organizations they work for.
+
+        By default other organizations are found by searching ProPublica for
+        each person. If an `officer_index` is given, they are resolved from
+        it instead, without any requests.
+
+        Arguments:
+            client (ProPublicaClient): The client used to search for people.
+            existing_graph (nx.MultiDiGraph): An optional graph to add to.
+            organization_subset (list[str]): The EINs of the organizations to
+                add staff for. Defaults to every organization in the graph.
+            filing_store (FilingStore): An optional store to share filings
+                with other builders. Defaults to a new store for the client.
+            max_workers (int): The number of people searches to run
+                concurrently.
+            officer_index (OfficerIndex): An optional local index of officers
+                to link people across organizations offline.
+        """
         self.client = client
         self.graph = existing_graph or nx.MultiDiGraph()
         self.organization_subset = organization_subset or []
+        self.filing_store = filing_store or FilingStore(client)
+        self.max_workers = max_workers
+        self.officer_index = officer_index
+
+    def _organization_filing(self, ein: Ein):
+        """
+        Load the filing of an organization node, or None if it has none.
+        """
+        filing = self.graph.nodes[ein].get("filing")
+        if isinstance(filing, FilingHandle):
+            return filing.load(self.filing_store)
+        return filing
+
+    def _search_people(self, names: list[str]) -> dict[str, list]:
+        """
+        Search every distinct name once, concurrently.
+
+        Returns:
+            dict: A mapping from normalized name to search results.
+        """
+        unique = {normalize_name(name): name for name in names}
+
+        def search(name: str):
+            try:
+                return self.client.search_people(name)
+            except Exception:
+                return []
+
+        with ThreadPoolExecutor(max_workers=max(self.max_workers, 1)) as pool:
+            results = pool.map(search, unique.values())
+            return dict(zip(unique.keys(), results))
 
     def build_network(self):
         # For every org in the network (or the subset if provided),
@@ -81,25 +1201,33 @@ class StaffNetworkBuilder(NetworkXNetworkBuilder):
             self.organization_subset = [
                 ein
                 for ein in self.graph.nodes()
-                if "Organization" in self.graph.nodes[ein].get("__labels__")
+                if "Organization" in self.graph.nodes[ein].get("__labels__", set())
             ]
 
-        # The vertices will have a `filing` attribute that contains the full filing
+        # The vertices will have a `filing` attribute that refers to the filing
+        staff_by_org: list[tuple[Ein, list[Form990PartVIISectionAGrp_]]] = []
         for ein_node_id in self.organization_subset:
-            filing = self.graph.nodes[ein_node_id]["filing"]
-            staff: list[Form990PartVIISectionAGrp_] = filing.get_staff()
+            filing = self._organization_filing(ein_node_id)
+            if filing is None:
+                continue
+            handle = self.graph.nodes[ein_node_id]["filing"]
+            staff: list[Form990PartVIISectionAGrp_] = [
+                staff_member
+                for staff_member in filing.get_compensations()
+                if staff_member.PersonNm
+            ]
+            staff_by_org.append((ein_node_id, staff))
             for staff_member in staff:
-                name = staff_member.PersonNm
-                if not name:
-                    continue
-
-                # Add the staff member to the graph
-                self.graph.add_node(
-                    staff_member.PersonNm,
-                    filing=filing,
-                    name=filing.get_name(),
-                    __labels__=set(["Person"]),
-                )
+                # Add the staff member to the graph. Only keep a handle to the
+                # filing, never the filing itself:
+                person_attributes = {
+                    "name": self.graph.nodes[ein_node_id].get("name")
+                    or filing.get_name(),
+                    "__labels__": set(["Person"]),
+                }
+                if isinstance(handle, FilingHandle):
+                    person_attributes["filing"] = handle
+                self.graph.add_node(staff_member.PersonNm, **person_attributes)
                 # Add an edge from the organization to the staff member
                 self.graph.add_edge(
                     ein_node_id,
@@ -107,31 +1235,355 @@ class StaffNetworkBuilder(NetworkXNetworkBuilder):
                     __labels__=set(["StaffMember"]),
                 )
 
-                # Search the staff member and see if they have other organizations
-                # self.client.search_people(name, nonprofit_ein=ein_node_id)
-                search_results = self.client.search_people(name)
+        if self.officer_index is not None:
+            self._link_from_officer_index(staff_by_org)
+            return
+
+        # Search each distinct staff member name once, to see if they have
+        # other organizations:
+        search_results_by_name = self._search_people(
+            [
+                staff_member.PersonNm
+                for _, staff in staff_by_org
+                for staff_member in staff
+            ]
+        )
+
+        for ein_node_id, staff in staff_by_org:
+            for staff_member in staff:
+                name = staff_member.PersonNm
+                search_names = normalize_name(name).split()
+                search_results = search_results_by_name.get(normalize_name(name), [])
                 for result in search_results:
-                    # Check if the result is legit. state is the same prob
-                    # and also each word in the name.lower() is also in the
-                    # result name
-                    search_names = result.name.lower().split()
+                    # Check if the result is legit: each word of the staff
+                    # member's name must also be in the result name
+                    result_names = normalize_name(result.name).split()
                     # if result.state != filing.get_state():
                     #     continue
-                    if not all(word in result.name.lower() for word in search_names):
-                        print(f"FAIL {result.name} --- {name}")
+                    if not all(word in result_names for word in search_names):
                         continue
-                    # Add the result to the graph
-                    # Check if the result is already in the graph
-                    if result.nonprofit_ein in self.graph:
+                    if not result.nonprofit_ein or result.nonprofit_ein == ein_node_id:
                         continue
-                    self.graph.add_node(
-                        result.nonprofit_ein,
-                        name=result.nonprofit,
-                        __labels__=set(["Organization"]),
+                    self._link_person(
+                        staff_member.PersonNm, result.nonprofit_ein, result.nonprofit
                     )
-                    # Add an edge from the staff member to the result
-                    self.graph.add_edge(
+
+    def _link_from_officer_index(self, staff_by_org):
+        """
+        Link staff members to the other organizations where the officer index
+        has someone with a similar name.
+        """
+        for ein_node_id, staff in staff_by_org:
+            for staff_member in staff:
+                matches = self.officer_index.lookup(
+                    staff_member.PersonNm, exclude_ein=ein_node_id
+                )
+                for record, score in matches:
+                    self._link_person(
                         staff_member.PersonNm,
-                        result.nonprofit_ein,
-                        __labels__=set(["StaffMember"]),
+                        record.ein,
+                        record.organization,
+                        similarity=score,
+                        title=record.title,
+                    )
+
+    def _link_person(self, person: str, ein: Ein, organization: str | None, **attrs):
+        """
+        Add an edge from a staff member to another organization they work
+        for, adding the organization if it is not in the graph yet.
+        """
+        if ein not in self.graph:
+            self.graph.add_node(
+                ein,
+                name=organization,
+                __labels__=set(["Organization"]),
+            )
+        if not self.graph.has_edge(person, ein):
+            self.graph.add_edge(person, ein, __labels__=set(["StaffMember"]), **attrs)
+
+
+class VendorNetworkBuilder(NetworkXNetworkBuilder):
+    def __init__(
+        self,
+        client: ProPublicaClient | None = None,
+        existing_graph: nx.MultiDiGraph | None = None,
+        vendor_index: VendorIndex | None = None,
+    ):
+        """
+        Build a bipartite network of organizations and the independent
+        contractors they pay (Part VII Section B of the 990), entirely from
+        local filings, without any requests.
+
+        Contractors are resolved to vendors with a VendorIndex, so the same
+        law firm or consultancy is one node even when filers spell it
+        differently. Vendor nodes are keyed by the vendor's hashed key and
+        labeled `Vendor`, with the `name`, `aliases` and address of the
+        vendor. Each contractor row is a `ContractorPaid` edge from the
+        organization to the vendor, with the `amount`, the services as the
+        `memo`, and the `year`.
+
+        Arguments:
+            client (ProPublicaClient): The client whose on-disk cache is read
+                when `build_network` is given no filings.
+            existing_graph (nx.MultiDiGraph): An optional graph to add to.
+            vendor_index (VendorIndex): An optional index to add the filings
+                to, e.g. one with a different threshold. Defaults to a new
+                index.
+        """
+        self.client = client
+        self.graph = existing_graph if existing_graph is not None else nx.MultiDiGraph()
+        self.vendor_index = vendor_index or VendorIndex()
+
+    def build_network(self, filings: Iterable | None = None):
+        """
+        Add the organizations and vendors of many filings to the network.
+
+        The filings are read once, into the vendor index; the graph is then
+        built from the index, so that every row is attached to its vendor
+        after all near-duplicates have been merged.
+
+        Arguments:
+            filings (Iterable): FullFilings or parsed filing XML. Defaults to
+                every filing in the client's on-disk cache.
+        """
+        if filings is None:
+            if self.client is None:
+                raise ValueError("Pass filings, or a client to read them from")
+            filings = self.client.iter_cached_filings()
+        self.vendor_index.add_filings(filings)
+
+        for vendor, records in self.vendor_index.vendors():
+            self.graph.add_node(
+                vendor, **vendor_attributes(records), __labels__=set(["Vendor"])
+            )
+            for record in records:
+                if record.ein not in self.graph:
+                    self.graph.add_node(
+                        record.ein,
+                        name=record.organization,
+                        __labels__=set(["Organization"]),
                     )
+                if self.graph.has_edge(record.ein, vendor) and any(
+                    data.get("record") == record
+                    for data in self.graph[record.ein][vendor].values()
+                ):
+                    continue
+                self.graph.add_edge(
+                    record.ein,
+                    vendor,
+                    record=record,
+                    amount=record.compensation,
+                    memo=record.services,
+                    year=record.year,
+                    __labels__=set(["ContractorPaid"]),
+                )
+
+
+def _is_checked(value) -> bool:
+    # Schedule R checkboxes are "X" when checked; some filers write "true" or "1"
+    return isinstance(value, str) and value.strip().lower() in {"x", "true", "1"}
+
+
+def _normalized_ein(ein) -> Ein | None:
+    if not isinstance(ein, str):
+        return None
+    ein = ein.replace("-", "").strip()
+    return ein or None
+
+
+def _business_name(name) -> str | None:
+    return getattr(name, "BusinessNameLine1Txt", None) if name else None
+
+
+class RelatedOrgNetworkBuilder(NetworkXNetworkBuilder):
+    def __init__(
+        self,
+        client: ProPublicaClient,
+        existing_graph: nx.MultiDiGraph | None = None,
+        max_workers: int = 8,
+        filing_store: FilingStore | None = None,
+    ):
+        """
+        Build a network of organizations and the related organizations they
+        report on Schedule R, e.g. the parents and subsidiaries of a health
+        system or university.
+
+        Each level of the crawl is fetched in bulk: the related EINs are all
+        looked up in the IRS index at once, and their filings are read
+        grouped by batch zip (see `ProPublicaClient.get_indexed_filings`).
+        Organizations that are not in the index are fetched one by one.
+
+        Edges point from the filing organization and are labeled:
+
+        - `RelatedOrganization` (Part II): a related tax-exempt organization,
+          with `controlled` (whether the filer controls it), the
+          `controlling_entity` named by the filer, `exempt_code` and
+          `public_charity_status`. Related organizations are crawled.
+        - `DisregardedEntity` (Part I): a disregarded entity, with its
+          `controlling_entity` and `activity`. These do not file a 990 of
+          their own, so they are not fetched or crawled.
+        - `RelatedTransaction` (Part V): a transaction with a related
+          organization, with its `transaction_type` (also the `memo`), the
+          `amount` involved and the `method` used to determine it.
+
+        Related organizations are keyed by EIN. Transactions name the other
+        organization but give no EIN, so they are matched by name to the
+        organizations of Parts I and II; the others are keyed by name.
+
+        Arguments:
+            client (ProPublicaClient): The client used to fetch filings.
+            existing_graph (nx.MultiDiGraph): An optional graph to add to.
+            max_workers (int): The number of batch zips (or filings, for
+                organizations that are not indexed) to read concurrently.
+            filing_store (FilingStore): An optional store to share filings
+                with other builders. Defaults to a new store for the client.
+        """
+        self.client = client
+        self.graph = existing_graph if existing_graph is not None else nx.MultiDiGraph()
+        self.max_workers = max_workers
+        self.filing_store = filing_store or FilingStore(client)
+
+    def build_network(self, ein: Ein, depth: int, year: int = THIS_YEAR - 1):
+        """
+        Crawl the related organizations of an organization.
+
+        Arguments:
+            ein (str): The EIN of the organization to start from.
+            depth (int): How many Schedule R links away from `ein` to crawl.
+            year (int): The filing year to use for every organization.
+        """
+        if depth == 0:
+            return
+        filings = self._fetch_filings([ein], year)
+        if ein not in filings:
+            # Raise whatever kept the filing from being fetched
+            self.filing_store.get(ein, year)
+        self._add_organization(ein, year)
+
+        frontier = [ein]
+        expanded: set[Ein] = set()
+        for _ in range(depth):
+            links = []
+            for organization in frontier:
+                expanded.add(organization)
+                links.extend(self._related_links(organization, filings[organization]))
+            related = [
+                target
+                for _, target, label, _ in links
+                if label == "RelatedOrganization" and target not in expanded
+            ]
+            filings = self._fetch_filings(list(dict.fromkeys(related)), year)
+            for source, target, label, attributes in links:
+                name = attributes.pop("name")
+                if target in filings:
+                    self._add_organization(target, year)
+                elif target not in self.graph:
+                    labels = {
+                        "DisregardedEntity"
+                        if label == "DisregardedEntity"
+                        else "Organization"
+                    }
+                    self.graph.add_node(target, name=name, __labels__=labels)
+                self.graph.add_edge(
+                    source, target, year=year, __labels__={label}, **attributes
+                )
+            frontier = [e for e in dict.fromkeys(related) if e in filings]
+            if not frontier:
+                return
+
+    def _fetch_filings(self, eins: list[Ein], year: int) -> dict:
+        """
+        Fetch the filings of a level: in bulk from the IRS index, then one by
+        one (concurrently) for the organizations the index does not have.
+
+        Returns:
+            dict: A mapping from EIN to filing, for the filings that succeeded.
+        """
+        filings = self.filing_store.prefetch(eins, year, max_workers=self.max_workers)
+        remaining = [ein for ein in eins if ein not in filings]
+        if remaining:
+            with ThreadPoolExecutor(max_workers=max(self.max_workers, 1)) as pool:
+                fetched = pool.map(
+                    lambda ein: self.filing_store.try_get(ein, year), remaining
+                )
+                filings.update(
+                    (ein, f) for ein, f in zip(remaining, fetched) if f is not None
+                )
+        return filings
+
+    def _add_organization(self, ein: Ein, year: int):
+        self.graph.add_node(
+            ein,
+            **self.filing_store.node_attributes(ein, year),
+            __labels__=set(["Organization"]),
+        )
+
+    def _related_links(self, ein: Ein, filing) -> list[tuple]:
+        """
+        The Schedule R links of a filing, as (source, target, label,
+        attributes) tuples, where the attributes include the target's `name`.
+        """
+        links = []
+        by_name: dict[str, Ein] = {}
+        for entity in filing.get_disregarded_entities():
+            name = _business_name(entity.DisregardedEntityName)
+            target = _normalized_ein(entity.EIN) or name
+            if not target or target == ein:
+                continue
+            by_name[normalize_name(name or "")] = target
+            links.append(
+                (
+                    ein,
+                    target,
+                    "DisregardedEntity",
+                    {
+                        "name": name,
+                        "controlling_entity": _business_name(
+                            entity.DirectControllingEntityName
+                        ),
+                        "activity": entity.PrimaryActivitiesTxt,
+                    },
+                )
+            )
+        for org in filing.get_related_tax_exempt_orgs():
+            name = _business_name(org.DisregardedEntityName)
+            target = _normalized_ein(org.EIN)
+            if not target or target == ein:
+                continue
+            by_name[normalize_name(name or "")] = target
+            links.append(
+                (
+                    ein,
+                    target,
+                    "RelatedOrganization",
+                    {
+                        "name": name,
+                        "controlled": _is_checked(org.ControlledOrganizationInd),
+                        "controlling_entity": _business_name(
+                            org.DirectControllingEntityName
+                        ),
+                        "exempt_code": org.ExemptCodeSectionTxt,
+                        "public_charity_status": org.PublicCharityStatusTxt,
+                    },
+                )
+            )
+        for transaction in filing.get_transactions_related_orgs():
+            name = _business_name(transaction.OtherOrganizationName)
+            if not name:
+                continue
+            target = by_name.get(normalize_name(name), name)
+            links.append(
+                (
+                    ein,
+                    target,
+                    "RelatedTransaction",
+                    {
+                        "name": name,
+                        "transaction_type": transaction.TransactionTypeTxt,
+                        "memo": transaction.TransactionTypeTxt,
+                        "amount": as_amount(transaction.InvolvedAmt, default=0.0),
+                        "method": transaction.MethodOfAmountDeterminationTxt,
+                    },
+                )
+            )
+        return links
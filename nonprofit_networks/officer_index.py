@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from difflib import SequenceMatcher
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+from pydantic import BaseModel
+
+from .utils import FilingIndex, as_amount, filing_rows, normalize_name
+
+if TYPE_CHECKING:
+    from .response_types import FullFiling
+
+# Tokens that don't help to tell people apart
+_NAME_SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "dr", "mr", "mrs", "ms", "phd", "md"}
+
+
+class OfficerRecord(BaseModel):
+    name: str
+    ein: str
+    organization: Optional[str] = None
+    year: Optional[int] = None
+    title: Optional[str] = None
+    compensation: Optional[float] = None
+
+
+def _name_tokens(name: str) -> list[str]:
+    return [t for t in normalize_name(name).split() if t not in _NAME_SUFFIXES]
+
+
+def _comparison_key(name: str) -> str:
+    """
+    The form of a name that is compared for similarity: its tokens without
+    initials or suffixes, sorted so that "Doe, Jane" matches "Jane Doe".
+    """
+    return " ".join(sorted(t for t in _name_tokens(name) if len(t) > 1))
+
+
+def _officer_records(filing: Union[FullFiling, dict[str, Any]]) -> list[OfficerRecord]:
+    """
+    Extract the Part VII Section A rows of a filing, either a FullFiling or
+    the parsed XML dictionary of one.
+    """
+    ein, organization, year, rows = filing_rows(
+        filing,
+        "get_compensations",
+        "Return.ReturnData.IRS990.Form990PartVIISectionAGrp",
+    )
+    if not ein:
+        return []
+    return [
+        OfficerRecord(
+            name=row["PersonNm"],
+            ein=ein,
+            organization=organization,
+            year=year,
+            title=row.get("TitleTxt"),
+            compensation=as_amount(row.get("ReportableCompFromOrgAmt")),
+        )
+        for row in rows
+        if isinstance(row.get("PersonNm"), str) and row["PersonNm"].strip()
+    ]
+
+
+class OfficerIndex(FilingIndex):
+    """
+    A local inverted index over the officers, directors and key employees
+    reported in Part VII Section A of 990 filings.
+
+    Names are normalized and blocked by token, so a lookup only compares a
+    name against the names that share a token with it, rather than every
+    name in the index.
+    """
+
+    def __init__(self, threshold: float = 0.9, max_block_size: int = 5000):
+        """
+        Create an empty OfficerIndex.
+
+        Arguments:
+            threshold (float): The default similarity (0 to 1) above which
+                two names are considered the same person.
+            max_block_size (int): Tokens shared by more names than this (very
+                common first names, for example) are not used for blocking
+                when a name has rarer tokens.
+        """
+        self.threshold = threshold
+        self.max_block_size = max_block_size
+        self._keys: list[str] = []
+        self._key_ids: dict[str, int] = {}
+        self._records: dict[int, list[OfficerRecord]] = {}
+        self._seen: set[tuple[str, Optional[int], str]] = set()
+        self._postings: dict[str, set[int]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(records) for records in self._records.values())
+
+    def add_filing(self, filing: Union[FullFiling, dict[str, Any]]):
+        """
+        Add the officers of a filing (a FullFiling or its parsed XML) to the
+        index. Adding the same filing twice has no effect.
+        """
+        for record in _officer_records(filing):
+            self.add_record(record)
+
+    def add_record(self, record: OfficerRecord):
+        key = _comparison_key(record.name)
+        if not key:
+            return
+        seen = (record.ein, record.year, key)
+        if seen in self._seen:
+            return
+        self._seen.add(seen)
+
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            key_id = len(self._keys)
+            self._keys.append(key)
+            self._key_ids[key] = key_id
+            self._records[key_id] = []
+            for token in key.split():
+                self._postings.setdefault(token, set()).add(key_id)
+        self._records[key_id].append(record)
+
+    def _candidates(self, key: str) -> set[int]:
+        blocks = sorted(
+            (self._postings.get(token, set()) for token in set(key.split())),
+            key=len,
+        )
+        blocks = [block for block in blocks if block]
+        if not blocks:
+            return set()
+        usable = [block for block in blocks if len(block) <= self.max_block_size]
+        return set().union(*(usable or blocks[:1]))
+
+    def lookup(
+        self,
+        name: str,
+        threshold: Optional[float] = None,
+        exclude_ein: Optional[str] = None,
+    ) -> list[tuple[OfficerRecord, float]]:
+        """
+        Find the officers whose name is similar to `name`.
+
+        Arguments:
+            name (str): The name to look up.
+            threshold (float): The minimum similarity. Defaults to the
+                index's threshold.
+            exclude_ein (str): Leave out records of this organization.
+
+        Returns:
+            list[tuple[OfficerRecord, float]]: Matching records and their
+                similarity, best matches first.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        key = _comparison_key(name)
+        if not key:
+            return []
+        matches = []
+        for key_id in self._candidates(key):
+            score = SequenceMatcher(None, key, self._keys[key_id]).ratio()
+            if score < threshold:
+                continue
+            for record in self._records[key_id]:
+                if exclude_ein is not None and record.ein == exclude_ein:
+                    continue
+                matches.append((record, score))
+        matches.sort(key=lambda match: -match[1])
+        return matches
+
+
+__all__ = ["OfficerIndex", "OfficerRecord"]
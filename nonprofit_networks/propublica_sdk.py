@@ -1,26 +1,93 @@
 # propublica_sdk.py
 
+from __future__ import annotations
+
+import contextlib
+import itertools
 import os
 import json
+import hashlib
 import time
 import httpx
 import re
+import threading
+import tempfile
 import zipfile
-import pandas as pd
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import Counter, OrderedDict, deque
 from io import BytesIO
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from html.parser import HTMLParser
 import xml.etree.ElementTree
-from typing import Optional, Dict, Any, List, Union
+from typing import TYPE_CHECKING, Optional, Dict, Any, Iterator, List, Union
 from pydantic import BaseModel
 import xmltodict
-from bs4 import BeautifulSoup  # Import BeautifulSoup
-from .response_types import FullFiling
+from .cache_files import (
+    base_path,
+    check_compression,
+    find_cached,
+    migrate_cache,
+    open_cached,
+    write_cached,
+)
+from .http_policy import RequestPolicy, RequestRunner
+from .name_index import OrganizationNameIndex
+from .remote_zip import (
+    MAX_COALESCED_FETCH,
+    TAIL_SIZE,
+    HttpRangeFile,
+    RangeNotSupported,
+    parse_content_range,
+)
+from .utils import normalize_name
+
+# pandas and the filing models are slow to import, so they are imported by
+# the methods that use them rather than when the client loads
+if TYPE_CHECKING:
+    import pandas as pd
+    from .response_types import FullFiling
+
+
+def __getattr__(name: str):
+    # Keeps `from nonprofit_networks.propublica_sdk import FullFiling`
+    # working, without importing the filing models with the client
+    if name == "FullFiling":
+        from .response_types import FullFiling
+
+        return FullFiling
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 _DEFAULT_CONFIG_PATH = os.path.expanduser(
     "~/.propublica_sdk_files/nonprofit-explorer/cache"
 )
 
 
+def _normalize_index_frame(df: pd.DataFrame) -> pd.DataFrame:
+    # Ensure consistent string types for matching
+    df["EIN"] = df["EIN"].astype(str)
+    df["OBJECT_ID"] = df["OBJECT_ID"].astype(str)
+    df["TAX_PERIOD"] = df["TAX_PERIOD"].astype(int)
+    return df
+
+
+def _starts_with_file(path: str, prefix_path: str, chunk_size: int = 1 << 20) -> bool:
+    """
+    Whether the file at `path` begins with the whole contents of the file at
+    `prefix_path`, i.e. it has only been appended to.
+    """
+    if os.path.getsize(path) < os.path.getsize(prefix_path):
+        return False
+    with open(path, "rb") as f, open(prefix_path, "rb") as prefix:
+        while True:
+            expected = prefix.read(chunk_size)
+            if not expected:
+                return True
+            if f.read(len(expected)) != expected:
+                return False
+
+
 class Organization(BaseModel):
     ein: int
     name: str
@@ -58,6 +125,186 @@ class Person(BaseModel):
     nonprofit_ein: Optional[str] = None
 
 
+# Elements that never have children, as in BeautifulSoup's html.parser builder
+_VOID_ELEMENTS = frozenset(
+    "area base br col embed hr img input keygen link menuitem meta param source "
+    "track wbr basefont bgsound command frame image isindex nextid spacer".split()
+)
+
+
+class _Element:
+    """
+    A minimal HTML element, with just enough of the BeautifulSoup Tag API to
+    read a people search result.
+    """
+
+    __slots__ = ("name", "attrs", "classes", "children")
+
+    def __init__(self, name: str, attrs: Dict[str, str]):
+        self.name = name
+        self.attrs = attrs
+        self.classes = frozenset((attrs.get("class") or "").split())
+        self.children: list = []
+
+    @property
+    def text(self) -> str:
+        return "".join(
+            child if isinstance(child, str) else child.text for child in self.children
+        )
+
+    def find(self, name: Optional[str] = None, *classes: str) -> Optional["_Element"]:
+        """
+        The first descendant, in document order, with a tag name and/or all
+        of the given classes.
+        """
+        for child in self.children:
+            if isinstance(child, str):
+                continue
+            if (name is None or child.name == name) and child.classes.issuperset(
+                classes
+            ):
+                return child
+            found = child.find(name, *classes)
+            if found is not None:
+                return found
+        return None
+
+    def __getitem__(self, attribute: str) -> str:
+        return self.attrs[attribute]
+
+
+class _PeoplePageParser(HTMLParser):
+    """
+    Event-driven parser for people search result pages. Only the
+    `.result-row` elements are built into trees; the rest of the page (most
+    of it navigation, scripts and footer) is tokenized and dropped.
+
+    Tags are opened and closed the way BeautifulSoup's html.parser builder
+    does it, so the rows have the same structure as `soup.select(".result-row")`.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows: List[_Element] = []
+        # Every open tag, with its element if it is part of a result row
+        self._stack: List[tuple[str, Optional[_Element]]] = []
+        self._open: Dict[str, int] = {}
+
+    def _current(self) -> Optional[_Element]:
+        return self._stack[-1][1] if self._stack else None
+
+    def handle_starttag(self, tag, attrs):
+        parent = self._current()
+        element = None
+        if parent is not None or any(
+            name == "class" and value and "result-row" in value.split()
+            for name, value in attrs
+        ):
+            element = _Element(tag, {name: value or "" for name, value in attrs})
+            if parent is not None:
+                parent.children.append(element)
+            if "result-row" in element.classes:
+                self.rows.append(element)
+        if tag in _VOID_ELEMENTS:
+            return
+        self._stack.append((tag, element))
+        self._open[tag] = self._open.get(tag, 0) + 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if not self._open.get(tag):
+            return
+        while self._stack:
+            name, _ = self._stack.pop()
+            self._open[name] -= 1
+            if name == tag:
+                break
+
+    def handle_data(self, data):
+        element = self._current()
+        if element is not None:
+            element.children.append(data)
+
+
+def _parse_person_row(person: _Element) -> Person:
+    name = person.find(None, "result-item__hed").text.strip()
+    location = person.find(None, "nowrap", "text-sub")
+    city = location.text.strip() if location else None
+    city_year = str(city).split("•")
+    city = city_year[0] if len(city_year) > 0 else None
+    if len(city_year) > 1:
+        year = city_year[1].strip()
+        if year.isdigit():
+            city = city_year[0].strip()
+            year = int(year.strip())
+        else:
+            year = None
+    else:
+        year = None
+
+    city, state = city.split(",") if city else (None, None)
+    city = city.strip() if city else None
+    state = state.strip() if state else None
+
+    title = person.find(None, "margin-right")
+    if title:
+        at = title.find("a")
+        title = title.text.strip().split("at\n")[0].strip()
+        if at:
+            np = at.text.strip().split("\n")[0].strip()
+            np_url = at["href"]
+            np_url = (
+                str(np_url)
+                if str(np_url).startswith("http")
+                else ("https://projects.propublica.org" + str(np_url))
+            )
+            np_ein = np_url.split("organizations/")[-1]
+        else:
+            np = None
+            np_ein = None
+    else:
+        title = None
+        np = None
+        np_ein = None
+
+    return Person(
+        name=name,
+        year=year,
+        city=city,
+        state=state,
+        title=title,
+        nonprofit=np,
+        nonprofit_ein=np_ein,
+    )
+
+
+def _parse_people_page(html: str) -> List[Person]:
+    """
+    Parse the people on a ProPublica name search results page.
+    """
+    parser = _PeoplePageParser()
+    parser.feed(html)
+    parser.close()
+    return [_parse_person_row(person) for person in parser.rows]
+
+
+class FilingNotFoundError(ValueError):
+    """
+    Raised when an organization has no filing for the requested tax period.
+    """
+
+
+class IndexUnavailableError(ValueError):
+    """
+    Raised when the IRS index needed to locate a filing could not be loaded,
+    so it is unknown whether the organization filed.
+    """
+
+
 class ProPublicaClient:
     BASE_URL = "https://projects.propublica.org/nonprofits/api/v2"
     IRS_BASE_URL = "https://apps.irs.gov/pub/epostcard/990/xml"
@@ -67,6 +314,12 @@ class ProPublicaClient:
         cache_directory: Optional[str] = None,
         download_xml_indices: bool = False,
         debug: bool = False,
+        local_search: bool = False,
+        cache_compression: Optional[str] = None,
+        request_policies: Optional[Dict[str, RequestPolicy]] = None,
+        circuit_breaker_threshold: Optional[int] = 5,
+        circuit_breaker_reset: float = 30.0,
+        remote_zip: bool = False,
     ):
         """
         Initializes the ProPublica SDK instance.
@@ -78,75 +331,334 @@ class ProPublicaClient:
             download_xml_indices (bool): Whether to download IRS XML indices during initialization.
                                       If False, indices can be downloaded later using download_irs_indices().
             debug (bool): Whether to enable debug mode for the SDK.
+            local_search (bool): Whether search() should first look up names in the cached
+                                 IRS indices, and only use the remote API if nothing matches.
+            cache_compression (Optional[str]): Compress filing XML and JSON responses written to
+                                               the cache with "gzip" or "zstd" (which needs the
+                                               zstandard package). Cached files are read in any
+                                               format; see migrate_cache() to convert existing ones.
+            request_policies (Optional[Dict[str, RequestPolicy]]): Timeouts, deadline, retries and
+                                               hedging per endpoint ("api", "organization_page",
+                                               "download_xml", "people_search", "irs_index",
+                                               "irs_batch", "irs_range"), overriding
+                                               DEFAULT_REQUEST_POLICIES.
+            circuit_breaker_threshold (Optional[int]): Consecutive failures after which requests
+                                               to a host fail fast, or None to never stop.
+            circuit_breaker_reset (float): Seconds before a host whose circuit is open is retried.
+            remote_zip (bool): Read single filings out of IRS batch zips with HTTP Range requests
+                               (the zip's central directory, then only the filing's bytes)
+                               instead of downloading the whole batch. Batches are still
+                               downloaded whole from servers that don't support ranges.
         """
         self.cache_directory = cache_directory or _DEFAULT_CONFIG_PATH
+        self.cache_compression = check_compression(cache_compression)
         os.makedirs(self.cache_directory, exist_ok=True)
         self._index_cache = {}  # Cache for loaded indices
+        self._people_cache: Dict[str, List[Person]] = {}  # By normalized name
+        self.local_search = local_search
+        self._name_index: Optional[OrganizationNameIndex] = None
+        self._name_index_lock = threading.Lock()
+        # Locks so that concurrent fetches don't load the same index or
+        # download the same batch zip more than once:
+        self._index_lock = threading.RLock()
+        self._batch_locks: Dict[str, threading.Lock] = {}
+        self._batch_locks_lock = threading.Lock()
+        self.remote_zip = remote_zip
+        # The central directories of the batch zips read remotely, by URL,
+        # the ones being read, and the filings wanted from each batch by the
+        # callers waiting for it, so that they are fetched together
+        self._remote_zips: OrderedDict[str, zipfile.ZipFile] = OrderedDict()
+        self._remote_zips_inflight: Dict[str, Future] = {}
+        self._remote_wanted: Dict[str, Counter] = {}
+        self._remote_zips_lock = threading.Lock()
+        # Number of HTTP requests issued by this client, e.g. for crawl budgets
+        self.request_count = 0
+        # Number of filings parsed, and of lookups served from (or missing
+        # from) the on-disk cache, for throughput reporting
+        self.filing_count = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._stats_lock = threading.Lock()
+        self._requests = RequestRunner(
+            request_policies,
+            failure_threshold=circuit_breaker_threshold,
+            reset_timeout=circuit_breaker_reset,
+        )
         if download_xml_indices:
             self.download_irs_indices()
         self.debug = debug
 
+    def close(self):
+        """
+        Stop the threads that send hedged requests. The client can still be
+        used afterwards, and starts new threads if it needs them.
+        """
+        self._requests.close()
+
+    def __enter__(self) -> "ProPublicaClient":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
     def _debug(self, *args, **kwargs):
         if self.debug:
             print(*args, **kwargs)
 
+    def _count(self, name: str):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        The number of requests, parsed filings, and cache hits and misses of
+        this client so far.
+        """
+        with self._stats_lock:
+            return {
+                "requests": self.request_count,
+                "filings": self.filing_count,
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+            }
+
+    def _http_get(self, url: str, endpoint: str = "api", **kwargs) -> httpx.Response:
+        """
+        Issue a GET request with the RequestPolicy of `endpoint`, counting
+        every attempt (and hedged duplicate) towards `request_count`.
+        """
+
+        def send(timeout: httpx.Timeout) -> httpx.Response:
+            with self._stats_lock:
+                self.request_count += 1
+            return httpx.get(url, timeout=timeout, **kwargs)
+
+        return self._requests.get(endpoint, url, send)
+
+    def _http_stream(self, url: str, endpoint: str = "irs_index", **kwargs):
+        """
+        Issue a streaming GET request with the timeouts of `endpoint`,
+        counting it towards `request_count`. Use as a context manager, like
+        `httpx.stream`.
+        """
+
+        def open_stream(timeout: httpx.Timeout):
+            with self._stats_lock:
+                self.request_count += 1
+            return httpx.stream("GET", url, timeout=timeout, **kwargs)
+
+        return self._requests.stream(endpoint, url, open_stream)
+
     def sample_from_irs_indices(
-        self, count: int, years: Optional[List[int]] = None
+        self,
+        count: int,
+        years: Optional[List[int]] = None,
+        stratify_by: Union[str, List[str], None] = None,
+        seed: Optional[int] = None,
+        chunksize: int = 100_000,
     ) -> pd.DataFrame:
         """
         Sample a specified number of records from the IRS indices.
 
+        The index files are read in chunks and sampled with a reservoir, so
+        only about `count` rows per stratum are ever held in memory, however
+        many years are sampled from.
+
         Args:
-            count: The number of records to sample.
+            count: The number of records to sample (per stratum, if stratify_by is given).
+                   Fewer are returned if there are not enough records.
             years: Optional list of years to sample from. If None, samples from all available years.
+            stratify_by: Optional column (or columns) to sample `count` records from each value
+                         of, e.g. "INDEX_YEAR" (the year of the index file) or "RETURN_TYPE".
+            seed: Optional seed for a reproducible sample.
+            chunksize: The number of rows to read from an index file at a time.
 
         Returns:
-            A DataFrame containing the sampled records.
+            A DataFrame containing the sampled records, with an INDEX_YEAR column. It can be
+            passed to iter_sample_filings() to fetch the sampled filings.
         """
+        import numpy as np
+        import pandas as pd
+
         if years is None:
             current_year = datetime.now().year
             years = range(2019, current_year + 1)
+        strata = [stratify_by] if isinstance(stratify_by, str) else stratify_by
+        rng = np.random.default_rng(seed)
 
-        index_data = pd.concat(
-            [self._get_index_data(year) for year in years], ignore_index=True
-        )
-        return index_data.sample(n=count)
+        reservoir = None
+        for year in years:
+            index_file, _ = self._index_paths(year)
+            if not os.path.exists(index_file):
+                self.download_irs_indices([year])
+            if not os.path.exists(index_file):
+                continue
+            for chunk in pd.read_csv(index_file, dtype=str, chunksize=chunksize):
+                chunk = _normalize_index_frame(chunk)
+                chunk["INDEX_YEAR"] = year
+                missing = [c for c in strata or [] if c not in chunk.columns]
+                if missing:
+                    raise ValueError(
+                        f"The IRS indices have no {', '.join(missing)} column"
+                    )
+                # Keep the rows with the smallest random keys: a uniform
+                # sample without replacement of everything seen so far
+                chunk["_key"] = rng.random(len(chunk))
+                if reservoir is not None:
+                    chunk = pd.concat([reservoir, chunk], ignore_index=True)
+                if strata:
+                    reservoir = (
+                        chunk.sort_values("_key")
+                        .groupby(strata, sort=False, dropna=False)
+                        .head(count)
+                    )
+                else:
+                    reservoir = chunk.nsmallest(count, "_key")
+
+        if reservoir is None:
+            return pd.DataFrame()
+        return reservoir.sort_values("_key").drop(columns="_key").reset_index(drop=True)
 
-    def download_irs_indices(self, years: Optional[List[int]] = None) -> None:
+    def download_irs_indices(
+        self,
+        years: Optional[List[int]] = None,
+        force: bool = False,
+        max_workers: int = 4,
+    ) -> Dict[int, str]:
         """
-        Downloads IRS index files if they don't exist in the cache.
+        Downloads IRS index files, or brings cached ones up to date.
+
+        Years are downloaded concurrently, and each file is streamed to disk.
+        Cached files are revalidated with a conditional request (ETag or
+        Last-Modified), so unchanged files are not downloaded again. When a
+        file has only grown, which is how the IRS updates the current year's
+        index, just the new rows are added to the indices already loaded in
+        memory.
 
         Args:
             years: Optional list of years to download. If None, checks from current year back to 2019.
+            force: Download the files again even if they have not changed.
+            max_workers: The number of years to download at once.
+
+        Returns:
+            Dict[int, str]: For each year, "downloaded", "appended", "unchanged" or "failed".
         """
         if years is None:
             current_year = datetime.now().year
             years = range(2019, current_year + 1)
+        years = list(years)
+
+        os.makedirs(os.path.join(self.cache_directory, "irs_indices"), exist_ok=True)
+        if max_workers <= 1 or len(years) <= 1:
+            statuses = [self._download_irs_index(year, force) for year in years]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                statuses = list(
+                    pool.map(lambda year: self._download_irs_index(year, force), years)
+                )
+        return dict(zip(years, statuses))
 
-        index_dir = os.path.join(self.cache_directory, "irs_indices")
-        os.makedirs(index_dir, exist_ok=True)
+    def _index_paths(self, year: int) -> tuple[str, str]:
+        index_file = os.path.join(
+            self.cache_directory, "irs_indices", f"index_{year}.csv"
+        )
+        return index_file, f"{index_file}.meta.json"
+
+    def _download_irs_index(self, year: int, force: bool = False) -> str:
+        import pandas as pd
+
+        index_file, meta_file = self._index_paths(year)
+        headers = {}
+        if not force and os.path.exists(index_file):
+            meta = {}
+            if os.path.exists(meta_file):
+                with open(meta_file) as f:
+                    meta = json.load(f)
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            modified = meta.get("last_modified") or format_datetime(
+                datetime.fromtimestamp(os.path.getmtime(index_file), timezone.utc),
+                usegmt=True,
+            )
+            headers["If-Modified-Since"] = modified
+
+        url = f"{self.IRS_BASE_URL}/{year}/index_{year}.csv"
+        self._debug(f"Downloading IRS index for {year} at {url}")
+        download = None
+        try:
+            with self._http_stream(url, headers=headers) as response:
+                if response.status_code == 304:
+                    return "unchanged"
+                if response.status_code != 200:
+                    # e.g., a future year that has no index yet
+                    return "failed"
+                with tempfile.NamedTemporaryFile(
+                    "wb", dir=os.path.dirname(index_file), delete=False
+                ) as f:
+                    download = f.name
+                    for chunk in response.iter_bytes():
+                        f.write(chunk)
+                meta = {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }
+        except httpx.RequestError:
+            self._debug(f"Failed to download IRS index for {year}")
+            if download is not None and os.path.exists(download):
+                os.remove(download)
+            return "failed"
+
+        old_size = os.path.getsize(index_file) if os.path.exists(index_file) else 0
+        appended = old_size > 0 and _starts_with_file(download, index_file)
+        with self._index_lock:
+            os.replace(download, index_file)
+            with open(meta_file, "w") as meta_f:
+                json.dump(meta, meta_f)
+            if appended:
+                rows = self._read_index_rows(index_file, offset=old_size)
+                self._append_index_rows(year, rows)
+            else:
+                self._index_cache.pop(year, None)
+                if self._name_index is not None:
+                    for chunk in pd.read_csv(index_file, dtype=str, chunksize=100_000):
+                        self._name_index.add_rows(chunk)
+        if not appended:
+            return "downloaded"
+        return "appended" if len(rows) else "unchanged"
+
+    def _read_index_rows(self, index_file: str, offset: int) -> pd.DataFrame:
+        """
+        Read the rows of an index file that start at a byte offset, typed
+        like the rest of the loaded index.
+        """
+        import pandas as pd
 
-        for year in years:
-            index_file = os.path.join(index_dir, f"index_{year}.csv")
-            if not os.path.exists(index_file):
-                try:
-                    url = f"{self.IRS_BASE_URL}/{year}/index_{year}.csv"
-                    self._debug(f"Downloading IRS index for {year} at {url}")
-                    response = httpx.get(url)
-                    if response.status_code == 200:
-                        with open(index_file, "wb") as f:
-                            f.write(response.content)
-                except httpx.RequestError:
-                    self._debug(f"Failed to download IRS index for {year}")
-                    # Skip if the file doesn't exist (e.g., future year)
-                    continue
+        with open(index_file, "rb") as f:
+            header = f.readline()
+            f.seek(offset)
+            tail = f.read()
+        if not tail.strip():
+            return pd.DataFrame()
+        return _normalize_index_frame(pd.read_csv(BytesIO(header + tail), dtype=str))
 
-    def _scrape_people_page(self, query: str, page: int = 1) -> List[Person]:
+    def _append_index_rows(self, year: int, rows: pd.DataFrame) -> None:
+        """
+        Add new index rows to the loaded index and name index, if any.
         """
-        Scrape people from the ProPublica website using BeautifulSoup.
+        import pandas as pd
 
-        TODO: Horrible. Horrible horrible. BS4 BS. Terrible HTML parsing.
-        I would love if someone could figure out a better way to do this.
+        if rows.empty:
+            return
+        if year in self._index_cache:
+            self._index_cache[year] = pd.concat(
+                [self._index_cache[year], rows], ignore_index=True
+            )
+        if self._name_index is not None:
+            self._name_index.add_rows(rows)
+
+    def _scrape_people_page(self, query: str, page: int = 1) -> List[Person]:
+        """
+        Scrape people from the ProPublica website.
 
         Args:
             query (str): The search query string.
@@ -156,69 +668,49 @@ class ProPublicaClient:
         """
         url = f"https://projects.propublica.org/nonprofits/name_search/index?q={query}&page={page}"
         self._debug(f"Scraping people from {url}")
-        response = httpx.get(url)
+        response = self._http_get(url, endpoint="people_search")
         response.raise_for_status()
+        return _parse_people_page(response.text)
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        people = []
+    def _search_people_cached(self, query: str) -> List[Person]:
+        """
+        Get all (depaginated) people search results for a query, cached in
+        memory and on disk by normalized name so each name is scraped once.
+        """
+        key = normalize_name(query)
+        if key in self._people_cache:
+            return self._people_cache[key]
+
+        cache_path = os.path.join(
+            self.cache_directory,
+            "people_search",
+            f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json",
+        )
+        cached = find_cached(cache_path)
+        if cached:
+            self._count("cache_hits")
+            with open_cached(cached) as f:
+                people = [Person(**person) for person in json.load(f)]
+            self._people_cache[key] = people
+            return people
+        self._count("cache_misses")
 
-        # Example parsing logic (adjust based on actual HTML structure)
-        for person in soup.select(".result-row"):
-            name = person.select_one(".result-item__hed").text.strip()
-            city = (
-                person.select_one(".nowrap.text-sub").text.strip()
-                if person.select_one(".nowrap.text-sub")
-                else None
-            )
-            city_year = str(city).split("•")
-            city = city_year[0] if len(city_year) > 0 else None
-            if len(city_year) > 1:
-                year = city_year[1].strip()
-                if year.isdigit():
-                    city = city_year[0].strip()
-                    year = int(year.strip())
-                else:
-                    year = None
-            else:
-                year = None
-
-            city, state = city.split(",") if city else (None, None)
-            city = city.strip() if city else None
-            state = state.strip() if state else None
-
-            title = person.select_one(".margin-right")
-            if title:
-                at = title.select_one("a")
-                title = title.text.strip().split("at\n")[0].strip()
-                if at:
-                    np = at.text.strip().split("\n")[0].strip()
-                    np_url = at["href"]
-                    np_url = (
-                        str(np_url)
-                        if str(np_url).startswith("http")
-                        else ("https://projects.propublica.org" + str(np_url))
-                    )
-                    np_ein = np_url.split("organizations/")[-1]
-                else:
-                    np = None
-                    np_ein = None
-            else:
-                title = None
-                np = None
-                np_ein = None
-
-            people.append(
-                Person(
-                    name=name,
-                    year=year,
-                    city=city,
-                    state=state,
-                    title=title,
-                    nonprofit=np,
-                    nonprofit_ein=np_ein,
-                )
-            )
+        # Depagination:
+        page = 1
+        people = []
+        while True:
+            results = self._scrape_people_page(query, page)
+            if not results:
+                break
+            people.extend(results)
+            page += 1
 
+        write_cached(
+            cache_path,
+            json.dumps([person.model_dump() for person in people]),
+            self.cache_compression,
+        )
+        self._people_cache[key] = people
         return people
 
     def search_people(
@@ -241,15 +733,7 @@ class ProPublicaClient:
         Returns:
             List[Person]: A list of Person objects containing the search results.
         """
-        # Depagination:
-        page = 1
-        people = []
-        while True:
-            results = self._scrape_people_page(query, page)
-            if not results:
-                break
-            people.extend(results)
-            page += 1
+        people = list(self._search_people_cached(query))
 
         # Filter by state, city, and nonprofit EIN if provided
         if state:
@@ -272,6 +756,14 @@ class ProPublicaClient:
         if year in self._index_cache:
             return self._index_cache[year]
 
+        with self._index_lock:
+            if year in self._index_cache:
+                return self._index_cache[year]
+            return self._load_index_data(year)
+
+    def _load_index_data(self, year: int) -> pd.DataFrame:
+        import pandas as pd
+
         index_file = os.path.join(
             self.cache_directory, "irs_indices", f"index_{year}.csv"
         )
@@ -280,18 +772,91 @@ class ProPublicaClient:
             self.download_irs_indices([year])
 
         if os.path.exists(index_file):
-            df = pd.read_csv(index_file)
-            # Ensure consistent string types for matching
-            df["EIN"] = df["EIN"].astype(str)
-            df["OBJECT_ID"] = df["OBJECT_ID"].astype(str)
-            df["TAX_PERIOD"] = df["TAX_PERIOD"].astype(int)
+            df = _normalize_index_frame(pd.read_csv(index_file, dtype=str))
             self._index_cache[year] = df
             return df
         return pd.DataFrame()  # Return empty DataFrame if file doesn't exist
 
+    def get_index_object_ids(self, eins: List[str], year: int) -> Dict[str, str]:
+        """
+        Look up the OBJECT_ID of the latest filing of each EIN for a year in
+        the IRS index. A new OBJECT_ID means a new or amended filing.
+
+        Args:
+            eins: The EINs to look up.
+            year: The filing year (the index of the following year is used).
+
+        Returns:
+            Dict[str, str]: A mapping from EIN to OBJECT_ID, for the EINs
+                that have a filing in the index.
+        """
+        latest = self._latest_index_rows(eins, year)
+        return {ein: row["OBJECT_ID"] for ein, row in latest.items()}
+
+    def _latest_index_rows(self, eins: List[str], year: int) -> Dict[str, pd.Series]:
+        """
+        The IRS index row of the latest filing of each organization for a
+        year, by EIN as given.
+        """
+        index_data = self._get_index_data(year + 1)
+        if index_data.empty or not eins:
+            return {}
+        wanted = {self._normalized_ein_pattern(ein): ein for ein in eins}
+        filings = index_data[
+            (index_data.TAX_PERIOD // 100 == year) & index_data.EIN.isin(wanted)
+        ]
+        latest = filings.sort_values("OBJECT_ID").groupby("EIN").tail(1)
+        return {wanted[row["EIN"]]: row for _, row in latest.iterrows()}
+
+    def invalidate_filing(self, ein: str, year: Union[int, str]) -> None:
+        """
+        Remove the cached copies of an organization's filing for a year that
+        were downloaded through ProPublica, so that they are downloaded again.
+        """
+        cache_dir = os.path.join(
+            self.cache_directory, "nonprofits", "download-xml", str(year)
+        )
+        if not os.path.isdir(cache_dir):
+            return
+        for filename in os.listdir(cache_dir):
+            if filename.startswith(f"{ein}-{year}-"):
+                os.remove(os.path.join(cache_dir, filename))
+
+    def migrate_cache(self) -> Dict[str, int]:
+        """
+        Convert the filing XML and JSON responses already in the cache to this
+        client's cache_compression (or decompress them, if it is None).
+
+        Returns:
+            Dict[str, int]: The number of files `converted` and `unchanged`,
+                and the `bytes_before` and `bytes_after` of converted files.
+        """
+        return migrate_cache(self.cache_directory, self.cache_compression)
+
+    def iter_cached_filings(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over every filing XML in the on-disk cache, without making any
+        requests. Files that cannot be parsed are skipped.
+
+        Returns:
+            Iterator[Dict[str, Any]]: The parsed XML of each cached filing
+        """
+        for subdirectory in ("xml_files", os.path.join("nonprofits", "download-xml")):
+            root = os.path.join(self.cache_directory, subdirectory)
+            for dirpath, _, filenames in os.walk(root):
+                for filename in sorted(filenames):
+                    if not base_path(filename).endswith(".xml"):
+                        continue
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        with open_cached(path) as f:
+                            yield xmltodict.parse(f)
+                    except Exception as e:
+                        self._debug(f"Skipping unreadable cached filing {path}: {e}")
+
     def _normalized_ein_pattern(self, ein: str | int, hyphenate: bool = False) -> str:
         """Normalize EIN pattern to XXXXXXXXX or XX-XXXXXXX format."""
-        ein = str(ein).replace("-", "")
+        ein = str(ein).replace("-", "").zfill(9)
         if hyphenate:
             return f"{ein[:2]}-{ein[2:]}"
         return ein
@@ -315,19 +880,47 @@ class ProPublicaClient:
         if not batch_id:
             raise ValueError("batch_id is required to download XML files for now")
 
+        with self._batch_locks_lock:
+            lock = self._batch_locks.setdefault(f"{year}/{batch_id}", threading.Lock())
+        with self._wanting(year, batch_id, [object_id] if object_id else []):
+            with lock:
+                return self._download_xml_batch_locked(year, object_id, batch_id)
+
+    @contextlib.contextmanager
+    def _wanting(self, year: int, batch_id: str, object_ids: List[str]):
+        """
+        Mark filings as about to be read from a batch, so that if the batch
+        is read remotely, they are fetched with the first of them.
+        """
+        if not self.remote_zip:
+            yield
+            return
+        key = f"{year}/{batch_id.upper()}"
+        with self._remote_zips_lock:
+            self._remote_wanted.setdefault(key, Counter()).update(object_ids)
+        try:
+            yield
+        finally:
+            with self._remote_zips_lock:
+                self._remote_wanted[key].subtract(object_ids)
+                if not +self._remote_wanted[key]:
+                    del self._remote_wanted[key]
+
+    def _download_xml_batch_locked(
+        self, year: int, object_id: str, batch_id: str
+    ) -> Optional[str]:
         batch_dir = os.path.join(self.cache_directory, "xml_files", str(year), batch_id)
         # Check if the file already exists
         if object_id:
-            extracted_file = os.path.join(batch_dir, f"{object_id}.xml")
-            self._debug(f"Checking for existing XML file at {extracted_file}")
-            if os.path.exists(extracted_file):
-                return extracted_file
-            self._debug(f"XML file not found at {extracted_file}")
-            # Try also the version suffixed with _public.xml
-            extracted_file = os.path.join(batch_dir, f"{object_id}_public.xml")
-            if os.path.exists(extracted_file):
-                return extracted_file
-            self._debug(f"XML file not found at {extracted_file}")
+            # Also try the version suffixed with _public.xml
+            for filename in (f"{object_id}.xml", f"{object_id}_public.xml"):
+                extracted_file = os.path.join(batch_dir, filename)
+                self._debug(f"Checking for existing XML file at {extracted_file}")
+                cached = find_cached(extracted_file)
+                if cached:
+                    self._count("cache_hits")
+                    return cached
+                self._debug(f"XML file not found at {extracted_file}")
 
         # See if the zip file already exists
         zip_file = os.path.join(batch_dir, f"{batch_id}.zip")
@@ -337,18 +930,24 @@ class ProPublicaClient:
                 if object_id:
                     try:
                         xml_file = next(f for f in zf.namelist() if object_id in f)
-                        zf.extract(xml_file, batch_dir)
-                        extracted_file = os.path.join(batch_dir, xml_file)
-                        with open(extracted_file, "r", encoding="utf-8") as f:
-                            xmltodict.parse(f.read())
+                        extracted_file = self._extract_filing(zf, xml_file, batch_dir)
+                        self._count("cache_hits")
                         return extracted_file
                     except (StopIteration, xml.etree.ElementTree.ParseError):
                         pass
                 else:
+                    self._count("cache_hits")
                     return batch_dir
+        self._count("cache_misses")
 
-        # Use longer timeout for large zip files
-        timeout = httpx.Timeout(30.0, connect=30.0, read=None)
+        if self.remote_zip and object_id:
+            try:
+                return self._extract_remote_filing(year, object_id, batch_id, batch_dir)
+            except RangeNotSupported as e:
+                self._debug(f"Downloading the whole batch, as ranges failed: {e}")
+            except (httpx.HTTPError, zipfile.BadZipFile, OSError) as e:
+                self._debug(f"Failed to read {object_id} from remote batch: {e}")
+                return None
 
         # Try multiple times with exponential backoff
         max_retries = 5
@@ -360,9 +959,12 @@ class ProPublicaClient:
 
                 zip_url = f"{self.IRS_BASE_URL}/{year}/{batch_id}.zip"
                 self._debug(
-                    f"Downloading XML batch from {zip_url} with timeout {timeout}, attempt {attempt + 1}"
+                    f"Downloading XML batch from {zip_url}, attempt {attempt + 1}"
+                )
+                # No read timeout by default, since the zips are large
+                response = self._http_get(
+                    zip_url, endpoint="irs_batch", follow_redirects=True
                 )
-                response = httpx.get(zip_url, timeout=timeout, follow_redirects=True)
 
                 if response.status_code == 200:
                     os.makedirs(batch_dir, exist_ok=True)
@@ -375,11 +977,7 @@ class ProPublicaClient:
                                 xml_file = next(
                                     f for f in zf.namelist() if object_id in f
                                 )
-                                zf.extract(xml_file, batch_dir)
-                                extracted_file = os.path.join(batch_dir, xml_file)
-                                with open(extracted_file, "r", encoding="utf-8") as f:
-                                    xmltodict.parse(f.read())
-                                return extracted_file
+                                return self._extract_filing(zf, xml_file, batch_dir)
                             except (StopIteration, xml.etree.ElementTree.ParseError):
                                 continue
                         else:
@@ -411,6 +1009,197 @@ class ProPublicaClient:
 
         return None
 
+    def _extract_filing(
+        self, zf: zipfile.ZipFile, xml_file: str, batch_dir: str
+    ) -> str:
+        """
+        Store one filing of a batch zip in the cache, compressed if the client
+        is configured to. The zip's checksum is verified as it is copied, so
+        a damaged batch raises zipfile.BadZipFile rather than caching a
+        truncated filing.
+
+        Returns:
+            str: The path of the stored file.
+        """
+        with zf.open(xml_file) as member:
+            return write_cached(
+                os.path.join(batch_dir, xml_file), member, self.cache_compression
+            )
+
+    def _remote_batch(self, year: int, batch_id: str) -> zipfile.ZipFile:
+        """
+        Open a remote batch zip for reading over HTTP Range requests. Only
+        the end of the zip and its central directory are fetched, once for
+        all the threads opening the same batch; opened batches are kept, so
+        that later lookups in them fetch nothing more than their filing.
+
+        Raises:
+            RangeNotSupported: If the server does not return partial content.
+        """
+        zip_url = f"{self.IRS_BASE_URL}/{year}/{batch_id}.zip"
+        with self._remote_zips_lock:
+            if zip_url in self._remote_zips:
+                self._remote_zips.move_to_end(zip_url)
+                return self._remote_zips[zip_url]
+            opening = self._remote_zips_inflight.get(zip_url)
+            if opening is None:
+                opening = self._remote_zips_inflight[zip_url] = Future()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            # Another thread is reading the central directory
+            return opening.result()
+
+        try:
+            zf = self._open_remote_batch(zip_url)
+        except BaseException as e:
+            with self._remote_zips_lock:
+                del self._remote_zips_inflight[zip_url]
+            opening.set_exception(e)
+            raise
+        with self._remote_zips_lock:
+            del self._remote_zips_inflight[zip_url]
+            self._remote_zips[zip_url] = zf
+            # A central directory can take tens of MB in memory. Evicted
+            # batches are not closed, since other workers may still be
+            # reading from them; they hold no open files or connections.
+            while len(self._remote_zips) > 4:
+                self._remote_zips.popitem(last=False)
+        opening.set_result(zf)
+        return zf
+
+    def _open_remote_batch(self, zip_url: str) -> zipfile.ZipFile:
+        headers = {"Range": f"bytes=-{TAIL_SIZE}"}
+        self._debug(f"Reading the central directory of {zip_url}")
+        with self._http_stream(
+            zip_url, endpoint="irs_range", headers=headers, follow_redirects=True
+        ) as response:
+            if response.status_code != 206:
+                response.raise_for_status()
+                # Don't read the body: it is the whole zip
+                raise RangeNotSupported(f"{zip_url} returned {response.status_code}")
+            _, _, size = parse_content_range(response.headers.get("Content-Range"))
+            tail = response.read()
+
+        def fetch(start: int, end: int) -> bytes:
+            response = self._http_get(
+                zip_url,
+                endpoint="irs_range",
+                headers={"Range": f"bytes={start}-{end}"},
+                follow_redirects=True,
+            )
+            if response.status_code != 206:
+                response.raise_for_status()
+                raise RangeNotSupported(f"{zip_url} returned {response.status_code}")
+            return response.content
+
+        return zipfile.ZipFile(HttpRangeFile(fetch, size, tail))
+
+    def _extract_remote_filing(
+        self, year: int, object_id: str, batch_id: str, batch_dir: str
+    ) -> Optional[str]:
+        """
+        Fetch one filing out of a remote batch zip into the cache, together
+        with the other filings of the batch that are waiting to be read.
+
+        Returns:
+            The path of the cached filing, or None if it is not in the batch.
+        """
+        zf = self._remote_batch(year, batch_id)
+        names = zf.namelist()
+        xml_file = next((f for f in names if object_id in f), None)
+        if xml_file is None:
+            return None
+        with self._remote_zips_lock:
+            wanted = set(+self._remote_wanted.get(f"{year}/{batch_id}", Counter()))
+        members = [xml_file]
+        for other in wanted - {object_id}:
+            name = next((f for f in names if other in f), None)
+            if name is not None and not find_cached(os.path.join(batch_dir, name)):
+                members.append(name)
+        if len(members) > 1:
+            self._prefetch_members(zf, members)
+        os.makedirs(batch_dir, exist_ok=True)
+        return self._extract_filing(zf, xml_file, batch_dir)
+
+    @staticmethod
+    def _prefetch_members(zf: zipfile.ZipFile, members: List[str]):
+        """
+        Fetch the compressed data of several members of a remote zip with one
+        Range request, if they are close enough together.
+        """
+        infos = [zf.getinfo(name) for name in members]
+        start = min(info.header_offset for info in infos)
+        # The local header repeats the file name, and usually the extra field
+        end = max(
+            info.header_offset
+            + zipfile.sizeFileHeader
+            + len(info.orig_filename.encode())
+            + len(info.extra)
+            + info.compress_size
+            for info in infos
+        )
+        if end - start <= MAX_COALESCED_FETCH:
+            zf.fp.prefetch(start, end)
+
+    def _propublica_xml(self, ein: str, year: int) -> Optional[str]:
+        """
+        Get the path of the cached XML of an organization's filing for a year,
+        downloading it through the ProPublica website if it is not cached yet.
+
+        Returns:
+            The path of the cached file, or None if ProPublica lists no XML
+            filing for the year.
+        """
+        cache_dir = os.path.join(
+            self.cache_directory, "nonprofits", "download-xml", str(year)
+        )
+        cache_file = os.path.join(cache_dir, f"{ein}-{year}-None.xml")
+        cached = find_cached(cache_file)
+        if cached:
+            self._debug(f"Found cached XML file at {cached}")
+            self._count("cache_hits")
+            return cached
+        # If not in cache, try to get it from the propublica API
+        self._debug(f"Downloading XML file for EIN {ein} in {year}")
+        self._count("cache_misses")
+
+        url = "https://projects.propublica.org/nonprofits/organizations/{}".format(ein)
+        self._debug(f"Getting XML file from {url}")
+        response = self._http_get(url, endpoint="organization_page")
+        # If status is 301, follow the redirect
+        if response.status_code == 301:
+            url = response.headers["Location"]
+            self._debug(f"Following redirect to {url}")
+            response = self._http_get(url, endpoint="organization_page")
+        response.raise_for_status()
+
+        # Find all "a.btn" where href starts with /nonprofits/download-xml
+        xml_links = re.findall(
+            r'<a class="btn" href="(/nonprofits/download-xml[^"]*)"', response.text
+        )
+
+        # Find the link that matches the year
+        for xml_link in xml_links:
+            self._debug(
+                f"Checking if {xml_link} starts with /nonprofits/download-xml?object_id={year}"
+            )
+            if xml_link.startswith(f"/nonprofits/download-xml?object_id={year}"):
+                xml_url = f"https://projects.propublica.org{xml_link}"
+                self._debug(f"Downloading XML file from {xml_url}")
+
+                # This is a redirect, so we need to follow it
+                response = self._http_get(xml_url, endpoint="download_xml")
+                xml_url = response.headers["Location"]
+                self._debug(f"Following redirect to {xml_url}")
+
+                response = self._http_get(xml_url, endpoint="download_xml")
+                response.raise_for_status()
+                self._debug(f"Saving XML file to cache at {cache_file}")
+                return write_cached(cache_file, response.text, self.cache_compression)
+        return None
+
     def get_full_filing(
         self,
         ein: str,
@@ -426,11 +1215,19 @@ class ProPublicaClient:
             ein: The Employer Identification Number
             year: year (YYYY) to retrieve. Can be provided as string or integer.
             month: month (MM) to retrieve. Can be provided as string or integer.
+                If not given, the latest filing of the year is retrieved.
 
         Returns:
             Dict containing the parsed XML data
             FullFiling object if as_json is False
+
+        Raises:
+            FilingNotFoundError: The organization has no filing for the period.
+            IndexUnavailableError: The IRS index of the period could not be
+                loaded.
         """
+        from .response_types import FullFiling
+
         year = int(year) if isinstance(year, str) else year
         month = int(month) if isinstance(month, str) else month
 
@@ -445,83 +1242,39 @@ class ProPublicaClient:
             self._debug(
                 "Month not provided, trying to get XML file from ProPublica API"
             )
-            cache_dir = os.path.join(
-                self.cache_directory, "nonprofits", "download-xml", str(year)
-            )
-            cache_file = os.path.join(cache_dir, f"{ein}-{year}-{month}.xml")
-            if os.path.exists(cache_file):
-                self._debug(f"Found cached XML file at {cache_file}")
-                with open(cache_file, "r") as f:
-                    res = xmltodict.parse(f.read())
-                    if as_json:
-                        return res
-                    return FullFiling(**res)
-            # If not in cache, try to get it from the propublica API
-            self._debug(f"Downloading XML file for EIN {ein} in {year}")
-
-            url = "https://projects.propublica.org/nonprofits/organizations/{}".format(
-                ein
-            )
-            self._debug(f"Getting XML file from {url}")
-            response = httpx.get(url)
-            # If status is 301, follow the redirect
-            if response.status_code == 301:
-                url = response.headers["Location"]
-                self._debug(f"Following redirect to {url}")
-                response = httpx.get(url)
-            response.raise_for_status()
-
-            # Find all "a.btn" where href starts with /nonprofits/download-xml
-            xml_links = re.findall(
-                r'<a class="btn" href="(/nonprofits/download-xml[^"]*)"', response.text
-            )
-
-            # Find the link that matches the year and month
-            for xml_link in xml_links:
-                self._debug(
-                    f"Checking if {xml_link} starts with /nonprofits/download-xml?object_id={year}"
-                )
-                if xml_link.startswith(f"/nonprofits/download-xml?object_id={year}"):
-                    xml_url = f"https://projects.propublica.org{xml_link}"
-                    self._debug(f"Downloading XML file from {xml_url}")
-
-                    # This is a redirect, so we need to follow it
-                    response = httpx.get(xml_url)
-                    xml_url = response.headers["Location"]
-                    self._debug(f"Following redirect to {xml_url}")
-
-                    response = httpx.get(xml_url)
-                    res = xmltodict.parse(response.text)
-                    # Save to cache at {cache}/nonprofits/download-xml/{year}/{ein}-{year}-{month}.xml
-                    cache_dir = os.path.join(
-                        self.cache_directory, "nonprofits", "download-xml", str(year)
-                    )
-                    os.makedirs(cache_dir, exist_ok=True)
-                    cache_file = os.path.join(cache_dir, f"{ein}-{year}-{month}.xml")
-                    self._debug(f"Saving XML file to cache at {cache_file}")
-                    with open(cache_file, "w") as f:
-                        f.write(response.text)
-
-                    if as_json:
-                        return res
-                    return FullFiling(**res)
+            cache_file = self._propublica_xml(ein, year)
+            if cache_file is not None:
+                self._count("filing_count")
+                with open_cached(cache_file) as f:
+                    res = xmltodict.parse(f)
+                if as_json:
+                    return res
+                return FullFiling(**res)
 
         ein = self._normalized_ein_pattern(ein)
         # Get the index data for the year
         # IRS index data is listed the year after the filings
         index_data = self._get_index_data(year + 1)
         if index_data.empty:
-            raise ValueError(f"No index data found for {year}")
+            raise IndexUnavailableError(f"No index data found for {year}")
 
-        # Filter by EIN, year, and month:
-        filings = index_data[
-            (index_data.TAX_PERIOD == int(f"{year}{month:02d}"))
-            & (index_data.EIN == ein)
-        ]
+        # Filter by EIN, year, and month (or the latest filing of the year,
+        # if no month was given):
+        if month is None:
+            period = str(year)
+            filings = index_data[
+                (index_data.TAX_PERIOD // 100 == year) & (index_data.EIN == ein)
+            ].sort_values("OBJECT_ID", ascending=False)
+        else:
+            period = f"{year}-{month:02d}"
+            filings = index_data[
+                (index_data.TAX_PERIOD == int(f"{year}{month:02d}"))
+                & (index_data.EIN == ein)
+            ]
         if filings.empty:
             available_qtrs = index_data[(index_data.EIN == ein)]
-            raise ValueError(
-                f"No filings found for EIN {ein} in {year}-{month:02d}. Available quarters: {available_qtrs.TAX_PERIOD.unique()}"
+            raise FilingNotFoundError(
+                f"No filings found for EIN {ein} in {period}. Available quarters: {available_qtrs.TAX_PERIOD.unique()}"
             )
 
         # Get the first filing object ID
@@ -529,18 +1282,218 @@ class ProPublicaClient:
         # There may also be XML_BATCH_ID, if the column exists:
         batch_id = filings.iloc[0].get("XML_BATCH_ID")
 
-        # Download the XML file
-        extracted_file = self._download_xml_batch(year + 1, object_id, batch_id)
+        filing = self._read_indexed_filing(year + 1, object_id, batch_id, as_json)
+        if filing is not None:
+            return filing
+        raise KeyError(f"Failed to download XML file for EIN {ein} in {period}")
 
-        if extracted_file:
-            with open(extracted_file, "r", encoding="utf-8") as f:
-                results = xmltodict.parse(f.read())
-                if as_json:
-                    return results
-                return FullFiling(**results)
-        raise KeyError(
-            f"Failed to download XML file for EIN {ein} in {year}-{month:02d}"
+    def _read_indexed_filing(
+        self,
+        index_year: int,
+        object_id: str,
+        batch_id: Optional[str],
+        as_json: bool = False,
+    ) -> Union[FullFiling, Dict[str, Any], None]:
+        """
+        Download (if needed) and parse the XML of a filing listed in an IRS
+        index, or return None if it could not be found.
+        """
+        from .response_types import FullFiling
+
+        if not isinstance(batch_id, str):
+            batch_id = None
+        extracted_file = self._download_xml_batch(index_year, object_id, batch_id)
+        if not extracted_file:
+            return None
+        with open_cached(extracted_file) as f:
+            results = xmltodict.parse(f)
+        self._count("filing_count")
+        if as_json:
+            return results
+        return FullFiling(**results)
+
+    def get_indexed_filings(
+        self,
+        eins: List[str],
+        year: int,
+        max_workers: int = 8,
+        as_json: bool = False,
+    ) -> Dict[str, Union[FullFiling, Dict[str, Any]]]:
+        """
+        Fetch the latest filing of many organizations for a year at once.
+
+        All the EINs are resolved in a single pass over the IRS index, and the
+        filings are read grouped by batch zip, each batch on its own worker,
+        so that every zip is downloaded once and no two workers wait on the
+        same batch.
+
+        Args:
+            eins: The EINs of the organizations.
+            year: The tax period year, as for get_full_filing().
+            max_workers: The number of batches to read at once.
+            as_json: Return the parsed XML dictionaries instead of FullFilings.
+
+        Returns:
+            A mapping from EIN (as given) to filing, for the organizations
+            whose filing is in the index and could be read. Organizations in
+            indices without XML_BATCH_ID are left out.
+        """
+        batches: Dict[str, List[tuple[str, str]]] = {}
+        for ein, row in self._latest_index_rows(list(eins), year).items():
+            batch_id = row.get("XML_BATCH_ID")
+            if isinstance(batch_id, str):
+                batches.setdefault(batch_id, []).append((ein, row["OBJECT_ID"]))
+
+        def read_batch(batch: tuple[str, List[tuple[str, str]]]):
+            batch_id, members = batch
+            filings = {}
+            object_ids = [object_id for _, object_id in members]
+            with self._wanting(year + 1, batch_id, object_ids):
+                for ein, object_id in members:
+                    try:
+                        filing = self._read_indexed_filing(
+                            year + 1, object_id, batch_id, as_json
+                        )
+                    except Exception as e:
+                        self._debug(f"Failed to read filing {object_id}: {e}")
+                        continue
+                    if filing is not None:
+                        filings[ein] = filing
+            return filings
+
+        filings: Dict[str, Union[FullFiling, Dict[str, Any]]] = {}
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as pool:
+            for batch_filings in pool.map(read_batch, batches.items()):
+                filings.update(batch_filings)
+        return filings
+
+    def get_financial_history(
+        self,
+        eins: List[str],
+        years: List[int],
+        max_workers: int = 8,
+    ) -> pd.DataFrame:
+        """
+        Get the revenue, expenses, net assets, total assets and liabilities of
+        organizations over several years, e.g. to chart them.
+
+        Filings are located in the IRS indices (falling back to the ProPublica
+        website for filings that are not indexed), fetched concurrently, and
+        only their IRS990 summary fields are parsed.
+
+        Args:
+            eins: The EINs of the organizations.
+            years: The tax period years, as for get_full_filing().
+            max_workers: The number of filings to fetch at once.
+
+        Returns:
+            A DataFrame indexed by (ein, year), sorted, with one row per EIN
+            and year. Its columns are the name, tax_period (YYYYMM),
+            return_type, revenue, expenses, net_assets, total_assets and
+            total_liabilities of the filing, `missing` (True if no filing
+            could be read), and `error` (why not). The amounts of missing
+            filings, and of forms without an IRS990 part (such as 990-PF),
+            are NaN.
+        """
+        import pandas as pd
+        from .filing_summary import SUMMARY_COLUMNS, summarize_filing
+
+        eins = list(dict.fromkeys(str(ein) for ein in eins))
+        years = sorted(set(int(year) for year in years))
+
+        def index_rows(year: int) -> Dict[str, pd.Series]:
+            try:
+                return self._latest_index_rows(eins, year)
+            except Exception as e:
+                self._debug(f"Could not read the IRS index for {year}: {e}")
+                return {}
+
+        def summarize(task: tuple[str, int, Optional[pd.Series]]) -> Dict[str, Any]:
+            ein, year, row = task
+            record: Dict[str, Any] = {"ein": ein, "year": year}
+            try:
+                path = None
+                if row is not None and isinstance(row.get("XML_BATCH_ID"), str):
+                    path = self._download_xml_batch(
+                        year + 1, row["OBJECT_ID"], row["XML_BATCH_ID"]
+                    )
+                if path is None:
+                    path = self._propublica_xml(ein, year)
+                if path is None:
+                    return {**record, "missing": True, "error": "No filing found"}
+                with open_cached(path) as f:
+                    summary = summarize_filing(f)
+                self._count("filing_count")
+            except Exception as e:
+                self._debug(f"Failed to read the {year} filing of {ein}: {e}")
+                return {**record, "missing": True, "error": str(e)}
+            return {**record, **summary, "missing": False, "error": None}
+
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as pool:
+            rows_by_year = dict(zip(years, pool.map(index_rows, years)))
+            tasks = [
+                (ein, year, rows_by_year[year].get(ein))
+                for ein in eins
+                for year in years
+            ]
+            records = list(pool.map(summarize, tasks))
+
+        history = pd.DataFrame.from_records(
+            records, columns=["ein", "year", *SUMMARY_COLUMNS, "missing", "error"]
         )
+        history["tax_period"] = history["tax_period"].astype("Int64")
+        return history.set_index(["ein", "year"]).sort_index()
+
+    def iter_sample_filings(
+        self, sample: pd.DataFrame, max_workers: int = 8, as_json: bool = False
+    ) -> Iterator[tuple[pd.Series, Union[FullFiling, Dict[str, Any], None]]]:
+        """
+        Fetch the filings of sampled IRS index rows concurrently, e.g. the
+        result of sample_from_irs_indices().
+
+        Args:
+            sample: IRS index rows, with INDEX_YEAR, OBJECT_ID and (for newer
+                indices) XML_BATCH_ID columns.
+            max_workers: The number of filings to fetch at once.
+            as_json: Yield the parsed XML dictionaries instead of FullFilings.
+
+        Returns:
+            Iterator of (row, filing) pairs, in the order of the sample. The
+            filing is None if it could not be fetched. Filings are fetched up
+            to 2 * max_workers rows ahead of the one last yielded.
+        """
+
+        def fetch(row: pd.Series):
+            try:
+                return self._read_indexed_filing(
+                    int(row["INDEX_YEAR"]),
+                    str(row["OBJECT_ID"]),
+                    row.get("XML_BATCH_ID"),
+                    as_json,
+                )
+            except Exception as e:
+                self._debug(f"Failed to fetch filing {row['OBJECT_ID']}: {e}")
+                return None
+
+        # Only a window of fetches is in flight ahead of the consumer, so one
+        # that stops early doesn't wait for (or pay for) the whole sample
+        window = max(max_workers, 1) * 2
+        rows = (row for _, row in sample.iterrows())
+        pending: deque = deque()
+        pool = ThreadPoolExecutor(max_workers=max(max_workers, 1))
+        try:
+            for row in itertools.islice(rows, window):
+                pending.append((row, pool.submit(fetch, row)))
+            while pending:
+                row, future = pending.popleft()
+                filing = future.result()
+                for next_row in itertools.islice(rows, 1):
+                    pending.append((next_row, pool.submit(fetch, next_row)))
+                yield row, filing
+        finally:
+            for _, future in pending:
+                future.cancel()
+            pool.shutdown(wait=True)
 
     def _get_cache_path(self, endpoint: str, params: Dict[str, Any]) -> str:
         filename = f"{endpoint}_{hash(frozenset(params.items()))}.json"
@@ -553,17 +1506,19 @@ class ProPublicaClient:
     def _get(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
         if self.cache_directory:
             cache_path = self._get_cache_path(endpoint, params)
-            if os.path.exists(cache_path):
-                with open(cache_path, "r") as f:
+            cached = find_cached(cache_path)
+            if cached:
+                self._count("cache_hits")
+                with open_cached(cached) as f:
                     return json.load(f)
+            self._count("cache_misses")
 
-        response = httpx.get(f"{self.BASE_URL}/{endpoint}", params=params)
+        response = self._http_get(f"{self.BASE_URL}/{endpoint}", params=params)
         response.raise_for_status()
         data = response.json()
 
         if self.cache_directory:
-            with open(cache_path, "w") as f:
-                json.dump(data, f)
+            write_cached(cache_path, json.dumps(data), self.cache_compression)
 
         return data
 
@@ -582,18 +1537,96 @@ class ProPublicaClient:
         data = self._get("search.json", params)
         return SearchResponse(**data)
 
+    def _index_files(self) -> Dict[int, str]:
+        """
+        The IRS index files in the cache, by year.
+        """
+        index_dir = os.path.join(self.cache_directory, "irs_indices")
+        if not os.path.isdir(index_dir):
+            return {}
+        files = {}
+        for filename in os.listdir(index_dir):
+            match = re.fullmatch(r"index_(\d{4})\.csv", filename)
+            if match:
+                files[int(match.group(1))] = os.path.join(index_dir, filename)
+        return dict(sorted(files.items()))
+
+    def get_name_index(self) -> OrganizationNameIndex:
+        """
+        Get the local index of organization names, building it from the IRS
+        index files in the cache the first time. Nothing is downloaded; call
+        download_irs_indices() first to cover more years.
+
+        Returns:
+            OrganizationNameIndex: The index, shared by every call.
+        """
+        import pandas as pd
+
+        with self._name_index_lock:
+            if self._name_index is None:
+                name_index = OrganizationNameIndex()
+                for year, path in self._index_files().items():
+                    self._debug(f"Indexing organization names from {path}")
+                    for chunk in pd.read_csv(
+                        path,
+                        usecols=["EIN", "TAXPAYER_NAME"],
+                        dtype=str,
+                        chunksize=100_000,
+                    ):
+                        name_index.add_rows(chunk)
+                self._name_index = name_index
+            return self._name_index
+
+    def search_local(self, query: str, limit: int = 100) -> SearchResponse:
+        """
+        Search for organizations by name in the cached IRS indices, without
+        any requests. The IRS indices carry no location, so the results have
+        no city or state.
+
+        Args:
+            query (str): The search query string.
+            limit (int): The maximum number of results.
+
+        Returns:
+            SearchResponse: An object containing the search results, best
+                matches first.
+        """
+        matches = self.get_name_index().search(query, limit=limit)
+        organizations = [
+            Organization(ein=int(ein), name=name, score=score)
+            for ein, name, score in matches
+            if ein.isdigit()
+        ]
+        return SearchResponse(
+            total_results=len(organizations),
+            organizations=organizations,
+            num_pages=1,
+            cur_page=1,
+            per_page=limit,
+            search_query=query,
+        )
+
     def search(
         self, query: str, state: str | None = None, city: str | None = None
     ) -> SearchResponse:
         """
         Search for a query in the ProPublica database.
 
+        If the client was created with `local_search=True`, the cached IRS
+        indices are searched first (see search_local), and the remote API is
+        only used if nothing matches, or to filter by state or city.
+
         Args:
             query (str): The search query string.
 
         Returns:
             SearchResponse: An object containing the search results.
         """
+        if self.local_search and not state and not city:
+            results = self.search_local(query)
+            if results.organizations:
+                return results
+
         # Depagination:
         page = 0
         results = self._paginated_search(query, page)
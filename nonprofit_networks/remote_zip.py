@@ -0,0 +1,153 @@
+import io
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+# The suffix of the zip that is fetched first: enough for the end of central
+# directory record, its zip64 locator, and any archive comment
+TAIL_SIZE = 1 << 16
+# The largest range fetched at once to read several members of a zip
+MAX_COALESCED_FETCH = 8 << 20
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
+
+class RangeNotSupported(Exception):
+    """
+    Raised when a server does not answer a Range request with a partial
+    response, so the file has to be downloaded whole.
+    """
+
+
+def parse_content_range(header: Optional[str]) -> tuple[int, int, int]:
+    """
+    Parse a `Content-Range: bytes start-end/size` header.
+
+    Returns:
+        tuple[int, int, int]: The first and last byte, and the total size.
+    """
+    match = _CONTENT_RANGE.fullmatch((header or "").strip())
+    if not match:
+        raise RangeNotSupported(f"Unexpected Content-Range {header!r}")
+    start, end, size = (int(group) for group in match.groups())
+    return start, end, size
+
+
+class HttpRangeFile(io.RawIOBase):
+    """
+    A read-only, seekable file over a remote file, which reads bytes with
+    HTTP Range requests as they are needed.
+
+    It can be opened with `zipfile.ZipFile`, which then only reads the end of
+    the archive, its central directory, and the members that are extracted.
+    Every read fetches at least `min_fetch` bytes, and the last few ranges
+    fetched are kept, so the small reads of zip headers don't each cost a
+    request. `prefetch()` fetches one range covering several members that
+    are about to be read.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[int, int], bytes],
+        size: int,
+        tail: bytes = b"",
+        min_fetch: int = TAIL_SIZE,
+        max_chunks: int = 4,
+    ):
+        """
+        Arguments:
+            fetch (Callable): Fetches the bytes from `start` to `end`
+                (inclusive) of the remote file.
+            size (int): The size of the remote file.
+            tail (bytes): The last bytes of the file, if already fetched.
+            min_fetch (int): The smallest range to fetch at once.
+            max_chunks (int): The number of fetched ranges to keep.
+        """
+        super().__init__()
+        self._fetch = fetch
+        self._size = size
+        self._position = 0
+        self.min_fetch = min_fetch
+        self.max_chunks = max_chunks
+        self._chunks: OrderedDict[int, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        if tail:
+            self._chunks[size - len(tail)] = tail
+        self.bytes_fetched = 0
+        self.fetch_count = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence {whence}")
+        if position < 0:
+            raise OSError("Negative seek position")
+        self._position = position
+        return position
+
+    def _cached(self, start: int, end: int) -> Optional[bytes]:
+        for chunk_start, chunk in self._chunks.items():
+            if chunk_start <= start and end <= chunk_start + len(chunk):
+                self._chunks.move_to_end(chunk_start)
+                return chunk[start - chunk_start : end - chunk_start]
+        return None
+
+    def _read_range(self, start: int, end: int) -> bytes:
+        with self._lock:
+            data = self._cached(start, end)
+            if data is not None:
+                return data
+            fetch_end = min(max(end, start + self.min_fetch), self._size)
+            chunk = self._fetch(start, fetch_end - 1)
+            if len(chunk) != fetch_end - start:
+                raise OSError(
+                    f"Expected {fetch_end - start} bytes at {start}, got {len(chunk)}"
+                )
+            self.fetch_count += 1
+            self.bytes_fetched += len(chunk)
+            self._chunks[start] = chunk
+            while len(self._chunks) > self.max_chunks:
+                self._chunks.popitem(last=False)
+            return chunk[: end - start]
+
+    def prefetch(self, start: int, end: int):
+        """
+        Fetch the bytes from `start` to `end` (exclusive) in one request, if
+        they are not already fetched, so that reading them costs nothing.
+        """
+        end = min(end, self._size)
+        if start < end:
+            self._read_range(start, end)
+
+    def readinto(self, buffer) -> int:
+        end = min(self._position + len(buffer), self._size)
+        if end <= self._position:
+            return 0
+        data = self._read_range(self._position, end)
+        buffer[: len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+
+__all__ = [
+    "HttpRangeFile",
+    "MAX_COALESCED_FETCH",
+    "RangeNotSupported",
+    "TAIL_SIZE",
+    "parse_content_range",
+]
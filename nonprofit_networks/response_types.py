@@ -1,5 +1,11 @@
 from typing import List, Optional, Dict, Any, Union
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+
+class _FilingModel(BaseModel):
+    # There are dozens of filing models, so building their validators when
+    # the module is imported is slow; build each one on first use instead
+    model_config = ConfigDict(defer_build=True)
 
 
 def convert_amount_to_float(v):
@@ -12,36 +18,36 @@ def convert_amount_to_float(v):
         return v
 
 
-class Address_(BaseModel):
+class Address_(_FilingModel):
     AddressLine1Txt: str
     CityNm: str
     StateAbbreviationCd: str
     ZIPCd: str
 
 
-class BusinessName_(BaseModel):
+class BusinessName_(_FilingModel):
     BusinessNameLine1Txt: str
     BusinessNameLine2Txt: Optional[str] = None
 
 
-class PreparerFirmName_(BaseModel):
+class PreparerFirmName_(_FilingModel):
     BusinessNameLine1Txt: str
 
 
-class PreparerFirmGrp_(BaseModel):
+class PreparerFirmGrp_(_FilingModel):
     PreparerFirmEIN: str
     PreparerFirmName: PreparerFirmName_
     PreparerUSAddress: Address_
 
 
-class Filer_(BaseModel):
+class Filer_(_FilingModel):
     EIN: str
     BusinessName: BusinessName_
     BusinessNameControlTxt: str
     USAddress: Address_
 
 
-class BusinessOfficerGrp_(BaseModel):
+class BusinessOfficerGrp_(_FilingModel):
     PersonNm: str
     PersonTitleTxt: str
     SignatureDt: str
@@ -49,34 +55,34 @@ class BusinessOfficerGrp_(BaseModel):
     PhoneNum: Optional[str] = None
 
 
-class PersonFullName_(BaseModel):
+class PersonFullName_(_FilingModel):
     PersonFirstNm: str
     PersonLastNm: str
 
 
-class SigningOfficerGrp_(BaseModel):
+class SigningOfficerGrp_(_FilingModel):
     PersonFullName: PersonFullName_
     SSN: str
 
 
-class PreparerPersonGrp_(BaseModel):
+class PreparerPersonGrp_(_FilingModel):
     PreparerPersonNm: Optional[str] = None
     PTIN: str
     PhoneNum: str
     PreparationDt: Optional[str] = None
 
 
-class TrustedCustomerGrp_(BaseModel):
+class TrustedCustomerGrp_(_FilingModel):
     TrustedCustomerCd: str
     AuthenticationAssuranceLevelCd: str
     IdentityAssuranceLevelCd: str
 
 
-class AdditionalFilerInformation_(BaseModel):
+class AdditionalFilerInformation_(_FilingModel):
     TrustedCustomerGrp: TrustedCustomerGrp_
 
 
-class ReturnHeader_(BaseModel):
+class ReturnHeader_(_FilingModel):
     binaryAttachmentCnt: str = Field(alias="@binaryAttachmentCnt")
     ReturnTs: str
     TaxPeriodEndDt: str
@@ -93,18 +99,18 @@ class ReturnHeader_(BaseModel):
     BuildTS: str
 
 
-class Organization501IndicatorGrp_(BaseModel):
+class Organization501IndicatorGrp_(_FilingModel):
     Organization501Ind: str
     Organization501cTypeTxt: str
 
 
-class BooksInCareOfDetail_(BaseModel):
+class BooksInCareOfDetail_(_FilingModel):
     PersonNm: str
     USAddress: Address_
     PhoneNum: str
 
 
-class Post2017NOLCarryoverGrp_(BaseModel):
+class Post2017NOLCarryoverGrp_(_FilingModel):
     PrincipalBusinessActivityCd: str
     AvlblPost2017NOLCarryoverAmt: Union[str, float]
 
@@ -114,7 +120,7 @@ class Post2017NOLCarryoverGrp_(BaseModel):
         return convert_amount_to_float(v)
 
 
-class NetOperatingLossDeductionAmt_(BaseModel):
+class NetOperatingLossDeductionAmt_(_FilingModel):
     referenceDocumentId: str = Field(alias="@referenceDocumentId")
     text: Union[str, float] = Field(alias="#text")
 
@@ -124,7 +130,7 @@ class NetOperatingLossDeductionAmt_(BaseModel):
         return convert_amount_to_float(v)
 
 
-class IRS990T_(BaseModel):
+class IRS990T_(_FilingModel):
     documentId: str = Field(alias="@documentId")
     Organization501IndicatorGrp: Organization501IndicatorGrp_
     BookValueAssetsEOYAmt: str
@@ -153,17 +159,17 @@ class IRS990T_(BaseModel):
         extra = "allow"
 
 
-class OtherIncomeAmt_(BaseModel):
+class OtherIncomeAmt_(_FilingModel):
     referenceDocumentId: str = Field(alias="@referenceDocumentId")
     text: str = Field(alias="#text")
 
 
-class OtherDeductionsAmt_(BaseModel):
+class OtherDeductionsAmt_(_FilingModel):
     referenceDocumentId: str = Field(alias="@referenceDocumentId")
     text: str = Field(alias="#text")
 
 
-class RentIncomePropertyGrp_(BaseModel):
+class RentIncomePropertyGrp_(_FilingModel):
     USAddress: Optional[Address_]
     RentPersonalPropertyAmt: Optional[str] = None
     RentRealPersonalPropertyAmt: Optional[str] = None
@@ -171,7 +177,7 @@ class RentIncomePropertyGrp_(BaseModel):
     DeductionsConnectedRentIncmAmt: Optional[str] = None
 
 
-class IRS990TScheduleA_(BaseModel):
+class IRS990TScheduleA_(_FilingModel):
     documentId: str = Field(alias="@documentId")
     PrincipalBusinessActivityCd: str
     SequenceReferenceNum: str
@@ -208,7 +214,7 @@ class IRS990TScheduleA_(BaseModel):
         extra = "allow"
 
 
-class Form990PartVIISectionAGrp_(BaseModel):
+class Form990PartVIISectionAGrp_(_FilingModel):
     PersonNm: str
     TitleTxt: str
     AverageHoursPerWeekRt: Union[str, float]
@@ -234,7 +240,7 @@ class Form990PartVIISectionAGrp_(BaseModel):
         return convert_amount_to_float(v)
 
 
-class ContractorCompensationGrp_(BaseModel):
+class ContractorCompensationGrp_(_FilingModel):
     ContractorName: Dict[str, Any]
     ContractorAddress: Dict[str, Any]
     ServicesDesc: str
@@ -246,7 +252,7 @@ class ContractorCompensationGrp_(BaseModel):
         return convert_amount_to_float(v)
 
 
-class ProgramServiceRevenueGrp_(BaseModel):
+class ProgramServiceRevenueGrp_(_FilingModel):
     Desc: str
     BusinessCd: str
     TotalRevenueColumnAmt: Union[str, float]
@@ -260,7 +266,7 @@ class ProgramServiceRevenueGrp_(BaseModel):
         return convert_amount_to_float(v)
 
 
-class IRS990_(BaseModel):
+class IRS990_(_FilingModel):
     documentId: str = Field(alias="@documentId")
     PrincipalOfficerNm: str
     USAddress: Address_
@@ -325,12 +331,12 @@ class IRS990_(BaseModel):
         extra = "allow"
 
 
-class IRS990ScheduleA_(BaseModel):
+class IRS990ScheduleA_(_FilingModel):
     documentId: str = Field(alias="@documentId")
     SchoolInd: Optional[str] = None
 
 
-class IRS990ScheduleD_(BaseModel):
+class IRS990ScheduleD_(_FilingModel):
     documentId: str = Field(alias="@documentId")
     LandGrp: Optional[Dict[str, Any]] = None
     BuildingsGrp: Optional[Dict[str, Any]] = None
@@ -338,22 +344,22 @@ class IRS990ScheduleD_(BaseModel):
     TotalBookValueLandBuildingsAmt: Optional[str] = None
 
 
-class IRS990ScheduleJ_(BaseModel):
+class IRS990ScheduleJ_(_FilingModel):
     documentId: str = Field(alias="@documentId")
     CompensationCommitteeInd: Optional[str] = None
     SeverancePaymentInd: str
     SupplementalNonqualRtrPlanInd: str
 
 
-class DisregardedEntityName_(BaseModel):
+class DisregardedEntityName_(_FilingModel):
     BusinessNameLine1Txt: str
 
 
-class DirectControllingEntityName_(BaseModel):
+class DirectControllingEntityName_(_FilingModel):
     BusinessNameLine1Txt: str
 
 
-class DisregardedEntitiesGrp_(BaseModel):
+class DisregardedEntitiesGrp_(_FilingModel):
     DisregardedEntityName: DisregardedEntityName_
     USAddress: Address_
     EIN: str
@@ -362,7 +368,7 @@ class DisregardedEntitiesGrp_(BaseModel):
     DirectControllingEntityName: DirectControllingEntityName_
 
 
-class IdRelatedTaxExemptOrgGrp_(BaseModel):
+class IdRelatedTaxExemptOrgGrp_(_FilingModel):
     DisregardedEntityName: DisregardedEntityName_
     USAddress: Optional[Address_] = None
     EIN: Optional[str] = None
@@ -377,11 +383,11 @@ class IdRelatedTaxExemptOrgGrp_(BaseModel):
         extra = "allow"  # Allow additional fields
 
 
-class OtherOrganizationName_(BaseModel):
+class OtherOrganizationName_(_FilingModel):
     BusinessNameLine1Txt: str
 
 
-class TransactionsRelatedOrgGrp_(BaseModel):
+class TransactionsRelatedOrgGrp_(_FilingModel):
     OtherOrganizationName: OtherOrganizationName_
     TransactionTypeTxt: str
     InvolvedAmt: Union[str, float]
@@ -393,7 +399,7 @@ class TransactionsRelatedOrgGrp_(BaseModel):
         return convert_amount_to_float(v)
 
 
-class IRS990ScheduleR_(BaseModel):
+class IRS990ScheduleR_(_FilingModel):
     documentId: str = Field(alias="@documentId")
     IdDisregardedEntitiesGrp: Optional[List[DisregardedEntitiesGrp_]] = None
     IdRelatedTaxExemptOrgGrp: Optional[
@@ -437,11 +443,11 @@ class IRS990ScheduleR_(BaseModel):
         return [self.IdRelatedTaxExemptOrgGrp]
 
 
-class RecipientBusinessName_(BaseModel):
+class RecipientBusinessName_(_FilingModel):
     BusinessNameLine1Txt: str
 
 
-class RecipientTable_(BaseModel):
+class RecipientTable_(_FilingModel):
     RecipientBusinessName: RecipientBusinessName_
     USAddress: Address_
     RecipientEIN: Optional[str] = None
@@ -456,12 +462,12 @@ class RecipientTable_(BaseModel):
         return convert_amount_to_float(v) if v is not None else None
 
 
-class SupplementalInformationDetail_(BaseModel):
+class SupplementalInformationDetail_(_FilingModel):
     FormAndLineReferenceDesc: str
     ExplanationTxt: str
 
 
-class IRS990ScheduleI_(BaseModel):
+class IRS990ScheduleI_(_FilingModel):
     documentId: str = Field(alias="@documentId")
     GrantRecordsMaintainedInd: str
     RecipientTable: Union[List[RecipientTable_], RecipientTable_]
@@ -484,7 +490,7 @@ class IRS990ScheduleI_(BaseModel):
         return [self.RecipientTable]
 
 
-class ReturnData_(BaseModel):
+class ReturnData_(_FilingModel):
     documentCnt: str = Field(alias="@documentCnt")
     IRS990: Optional[IRS990_] = None
     IRS990ScheduleA: Optional[IRS990ScheduleA_] = None
@@ -500,7 +506,7 @@ class ReturnData_(BaseModel):
         extra = "allow"
 
 
-class Return_(BaseModel):
+class Return_(_FilingModel):
     xmlns: str = Field(alias="@xmlns")
     xmlns_xsi: str = Field(alias="@xmlns:xsi")
     xsi_schemaLocation: Optional[str] = Field(None, alias="@xsi:schemaLocation")
@@ -509,7 +515,7 @@ class Return_(BaseModel):
     ReturnData: ReturnData_
 
 
-class FullFiling(BaseModel):
+class FullFiling(_FilingModel):
     Return: Return_
 
     def get_compensations(self):
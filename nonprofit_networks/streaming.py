@@ -0,0 +1,120 @@
+import queue
+import threading
+from typing import Any, Callable, Iterator
+
+Event = dict[str, Any]
+
+
+class NodeSetGraph:
+    """
+    Stands in for the graph of a builder that does not retain its network.
+
+    It remembers which nodes have been added, so that a crawl still visits
+    every organization once, but drops all attributes and edges. Memory use
+    grows only with the number of EINs seen, not with filings or grants.
+    """
+
+    def __init__(self):
+        self.graph: dict[str, Any] = {}
+        self._nodes: dict[Any, None] = {}
+        self._edge_count = 0
+
+    def add_node(self, node, **attributes):
+        self._nodes[node] = None
+
+    def add_edge(self, u, v, **attributes):
+        self._nodes[u] = None
+        self._nodes[v] = None
+        self._edge_count += 1
+
+    def has_edge(self, u, v) -> bool:
+        return False
+
+    def __contains__(self, node) -> bool:
+        return node in self._nodes
+
+    def __iter__(self):
+        return iter(self._nodes)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def number_of_nodes(self) -> int:
+        return len(self._nodes)
+
+    def number_of_edges(self) -> int:
+        return self._edge_count
+
+    def is_directed(self) -> bool:
+        return True
+
+    def is_multigraph(self) -> bool:
+        return True
+
+
+class _StreamClosed(Exception):
+    pass
+
+
+def iter_events(
+    crawl: Callable[[Callable[[Event], None]], None], max_pending: int = 1024
+) -> Iterator[Event]:
+    """
+    Run a crawl in a background thread and yield the events it emits.
+
+    Arguments:
+        crawl (Callable): Runs the crawl, calling the function it is given
+            with every event.
+        max_pending (int): The number of events that may wait to be consumed
+            before the crawl blocks, which bounds memory use when the
+            consumer is slower than the crawl.
+
+    Returns:
+        Iterator[dict]: The events. Closing the iterator early stops the crawl
+            at the next event; an exception in the crawl is re-raised once the
+            events before it have been consumed.
+    """
+    events: queue.Queue = queue.Queue(maxsize=max_pending)
+    closed = threading.Event()
+    done = object()
+    errors: list[BaseException] = []
+
+    def put(item) -> bool:
+        while not closed.is_set():
+            try:
+                events.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def emit(event: Event):
+        if not put(event):
+            raise _StreamClosed()
+
+    def run():
+        try:
+            crawl(emit)
+        except _StreamClosed:
+            pass
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            put(done)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        while True:
+            event = events.get()
+            if event is done:
+                break
+            yield event
+        thread.join()
+        if errors:
+            raise errors[0]
+    finally:
+        closed.set()
+
+
+__all__ = ["NodeSetGraph", "iter_events"]
@@ -1,3 +1,8 @@
+import abc
+import re
+from typing import Iterable, Optional
+
+
 def deep_dict_access(data: dict, key: str, default=None, raise_keyerror=False):
     """
     Access a nested dictionary using a dot-separated key.
@@ -13,4 +18,118 @@ def deep_dict_access(data: dict, key: str, default=None, raise_keyerror=False):
     return data
 
 
-__all__ = ["deep_dict_access"]
+def as_list(value) -> list:
+    """
+    A repeated XML element as a list: xmltodict gives a single element as
+    itself, and a missing one as None.
+    """
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def as_amount(value, default: Optional[float] = None) -> Optional[float]:
+    """
+    Parse an amount reported in a filing: a number, or a string such as
+    "1234", "1,234" or "$1,234.00".
+
+    Arguments:
+        value: The amount.
+        default (float): What to return if the amount is missing or is not
+            a number.
+
+    Returns:
+        float: The amount, or `default`.
+    """
+    if value is None or isinstance(value, bool):
+        return default
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace(",", "").replace("$", "").strip())
+    except ValueError:
+        return default
+
+
+def filing_rows(
+    filing, method: str, path: str
+) -> tuple[Optional[str], Optional[str], Optional[int], list[dict]]:
+    """
+    Get the filer and the rows of one repeated group of a filing, either a
+    FullFiling or the parsed XML dictionary of one.
+
+    Arguments:
+        filing (FullFiling | dict): The filing.
+        method (str): The FullFiling method that returns the rows, e.g.
+            "get_grant_recipients".
+        path (str): The dot-separated path of the rows in the XML, e.g.
+            "Return.ReturnData.IRS990ScheduleI.RecipientTable".
+
+    Returns:
+        tuple: The filer's EIN, name and tax year, and the rows as
+            dictionaries with the XML element names as keys.
+    """
+    if isinstance(filing, dict):
+        ein = deep_dict_access(filing, "Return.ReturnHeader.Filer.EIN")
+        name = deep_dict_access(
+            filing, "Return.ReturnHeader.Filer.BusinessName.BusinessNameLine1Txt"
+        )
+        year = deep_dict_access(filing, "Return.ReturnHeader.TaxYr")
+        rows = [
+            row
+            for row in as_list(deep_dict_access(filing, path))
+            if isinstance(row, dict)
+        ]
+    else:
+        header = filing.Return.ReturnHeader
+        ein, name, year = header.Filer.EIN, filing.get_name(), header.TaxYr
+        rows = [row.model_dump() for row in getattr(filing, method)()]
+    year = int(year) if year and str(year).isdigit() else None
+    return (str(ein) if ein else None), name, year, rows
+
+
+class FilingIndex(abc.ABC):
+    """
+    The base of the local indices built from filings: GrantIndex,
+    OfficerIndex and VendorIndex. Subclasses implement `add_filing`.
+    """
+
+    @classmethod
+    def from_client(cls, client, **kwargs):
+        """
+        Build an index from every filing in a client's on-disk cache, without
+        making any requests. Keyword arguments are passed to the constructor.
+        """
+        index = cls(**kwargs)
+        index.add_filings(client.iter_cached_filings())
+        return index
+
+    def add_filings(self, filings: Iterable):
+        for filing in filings:
+            self.add_filing(filing)
+
+    @abc.abstractmethod
+    def add_filing(self, filing):
+        """
+        Add the rows of one filing (a FullFiling or its parsed XML) to the
+        index.
+        """
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalize a person or organization name for matching: lowercase, with
+    punctuation removed and whitespace collapsed.
+    """
+    name = re.sub(r"[^\w\s]", " ", str(name).lower())
+    return " ".join(name.split())
+
+
+__all__ = [
+    "FilingIndex",
+    "as_amount",
+    "as_list",
+    "deep_dict_access",
+    "filing_rows",
+    "normalize_name",
+]
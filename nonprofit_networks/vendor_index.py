@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import hashlib
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import TYPE_CHECKING, Any, Iterator, Optional, Union
+
+from pydantic import BaseModel
+
+from .utils import FilingIndex, as_amount, filing_rows, normalize_name
+
+if TYPE_CHECKING:
+    from .response_types import FullFiling
+
+# Legal forms and filler words that don't help to tell firms apart
+_NAME_STOPWORDS = {
+    "the",
+    "and",
+    "of",
+    "inc",
+    "incorporated",
+    "llc",
+    "llp",
+    "lllp",
+    "lp",
+    "pllc",
+    "pc",
+    "pa",
+    "plc",
+    "ltd",
+    "limited",
+    "co",
+    "corp",
+    "corporation",
+    "company",
+    "dba",
+}
+
+# Spellings of common address words, by their USPS abbreviation
+_ADDRESS_ABBREVIATIONS = {
+    "street": "st",
+    "avenue": "ave",
+    "road": "rd",
+    "boulevard": "blvd",
+    "drive": "dr",
+    "lane": "ln",
+    "place": "pl",
+    "court": "ct",
+    "parkway": "pkwy",
+    "highway": "hwy",
+    "suite": "ste",
+    "floor": "fl",
+    "north": "n",
+    "south": "s",
+    "east": "e",
+    "west": "w",
+}
+
+
+class VendorRecord(BaseModel):
+    name: str
+    ein: str
+    organization: Optional[str] = None
+    year: Optional[int] = None
+    address: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    zip: Optional[str] = None
+    services: Optional[str] = None
+    compensation: Optional[float] = None
+
+
+def canonical_name(name: str) -> str:
+    """
+    The form of a contractor name that is compared: normalized, without
+    legal forms such as "LLP" or "Inc", so "Smith & Jones, L.L.P." and
+    "SMITH AND JONES LLP" are the same.
+    """
+    name = normalize_name(name.replace(".", ""))
+    return " ".join(t for t in name.split() if t not in _NAME_STOPWORDS)
+
+
+def canonical_address(address: Optional[str]) -> str:
+    """
+    A street address, normalized and with the USPS abbreviations, so that
+    "100 Main Street, Suite 5" and "100 MAIN ST STE 5" are the same.
+    """
+    if not address:
+        return ""
+    return " ".join(
+        _ADDRESS_ABBREVIATIONS.get(t, t) for t in normalize_name(address).split()
+    )
+
+
+def vendor_key(name: str, zip_code: Optional[str] = None) -> str:
+    """
+    A short hash identifying a contractor: its canonical name, and the first
+    five digits of its ZIP code, if it has one.
+    """
+    canonical = f"{canonical_name(name)}|{(zip_code or '')[:5]}"
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def _contractor_name(name: dict) -> Optional[str]:
+    """
+    The name of a ContractorName, which is either a business or a person.
+    """
+    if not isinstance(name, dict):
+        return name if isinstance(name, str) else None
+    if isinstance(name.get("PersonNm"), str):
+        return name["PersonNm"]
+    business = name.get("BusinessName") or {}
+    line1 = business.get("BusinessNameLine1Txt")
+    if not isinstance(line1, str):
+        return None
+    line2 = business.get("BusinessNameLine2Txt")
+    return f"{line1} {line2}" if isinstance(line2, str) else line1
+
+
+def _contractor_address(address: dict) -> dict[str, Optional[str]]:
+    if not isinstance(address, dict):
+        return {}
+    us = address.get("USAddress")
+    if isinstance(us, dict):
+        return {
+            "address": us.get("AddressLine1Txt"),
+            "city": us.get("CityNm"),
+            "state": us.get("StateAbbreviationCd"),
+            "zip": us.get("ZIPCd"),
+        }
+    foreign = address.get("ForeignAddress")
+    if isinstance(foreign, dict):
+        return {
+            "address": foreign.get("AddressLine1Txt"),
+            "city": foreign.get("CityNm"),
+            "state": foreign.get("CountryCd"),
+            "zip": foreign.get("ForeignPostalCd"),
+        }
+    return {}
+
+
+def _vendor_records(filing: Union[FullFiling, dict[str, Any]]) -> list[VendorRecord]:
+    """
+    Extract the contractor compensation rows of a filing, either a FullFiling
+    or the parsed XML dictionary of one.
+    """
+    ein, organization, year, rows = filing_rows(
+        filing,
+        "get_contractor_compensation",
+        "Return.ReturnData.IRS990.ContractorCompensationGrp",
+    )
+    if not ein:
+        return []
+    records = []
+    for row in rows:
+        name = _contractor_name(row.get("ContractorName"))
+        if not name or not name.strip():
+            continue
+        services = row.get("ServicesDesc")
+        records.append(
+            VendorRecord(
+                name=name,
+                ein=ein,
+                organization=organization,
+                year=year,
+                services=services if isinstance(services, str) else None,
+                compensation=as_amount(row.get("CompensationAmt")),
+                **_contractor_address(row.get("ContractorAddress")),
+            )
+        )
+    return records
+
+
+class VendorIndex(FilingIndex):
+    """
+    A local index of the independent contractors (law firms, consultancies,
+    management companies...) that organizations report paying in Part VII
+    Section B of their 990 filings.
+
+    Each contractor is identified by a hashed key of its canonical name and
+    ZIP code. Near-duplicate spellings are merged into one vendor as records
+    are added: a new key is only compared against the vendors in its blocks
+    (the vendors at the same ZIP code sharing a name token), and joins the
+    most similar one if it is similar enough.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        match_address: bool = True,
+        max_block_size: int = 5000,
+    ):
+        """
+        Create an empty VendorIndex.
+
+        Arguments:
+            threshold (float): The similarity (0 to 1) of two canonical names
+                above which they are considered the same vendor.
+            match_address (bool): Only merge contractors at the same ZIP
+                code, so that the offices of a national firm are separate
+                vendors. If False, contractors are merged by name alone.
+            max_block_size (int): Name tokens shared by more vendors than
+                this (e.g. "consulting") are not used for blocking when a
+                name has rarer tokens.
+        """
+        self.threshold = threshold
+        self.match_address = match_address
+        self.max_block_size = max_block_size
+        self._names: dict[str, str] = {}
+        self._parents: dict[str, str] = {}
+        self._records: dict[str, list[VendorRecord]] = {}
+        self._seen: set[tuple] = set()
+        self._postings: dict[tuple[str, str], set[str]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(records) for records in self._records.values())
+
+    def add_filing(self, filing: Union[FullFiling, dict[str, Any]]):
+        """
+        Add the contractors of a filing (a FullFiling or its parsed XML) to
+        the index. Adding the same filing twice has no effect.
+        """
+        for record in _vendor_records(filing):
+            self.add_record(record)
+
+    def _zip(self, record: VendorRecord) -> str:
+        return (record.zip or "")[:5] if self.match_address else ""
+
+    def add_record(self, record: VendorRecord):
+        name = canonical_name(record.name)
+        if not name:
+            return
+        zip_code = self._zip(record)
+        key = vendor_key(record.name, zip_code)
+        seen = (
+            record.ein,
+            record.year,
+            key,
+            record.services,
+            record.compensation,
+        )
+        if seen in self._seen:
+            return
+        self._seen.add(seen)
+
+        if key not in self._records:
+            self._names[key] = name
+            self._parents[key] = key
+            self._records[key] = []
+            match = self._best_match(name, zip_code)
+            if match is not None:
+                self._parents[key] = self.vendor_id(match)
+            for token in set(name.split()):
+                self._postings.setdefault((zip_code, token), set()).add(key)
+        self._records[key].append(record)
+
+    def _best_match(self, name: str, zip_code: str) -> Optional[str]:
+        blocks = sorted(
+            (self._postings.get((zip_code, t), set()) for t in set(name.split())),
+            key=len,
+        )
+        blocks = [block for block in blocks if block]
+        if not blocks:
+            return None
+        usable = [block for block in blocks if len(block) <= self.max_block_size]
+        best, best_score = None, self.threshold
+        for candidate in set().union(*(usable or blocks[:1])):
+            score = SequenceMatcher(None, name, self._names[candidate]).ratio()
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+    def vendor_id(self, key: str) -> str:
+        """
+        The key of the vendor that a contractor key was merged into.
+        """
+        root = key
+        while self._parents[root] != root:
+            root = self._parents[root]
+        # Point every key on the path straight at the root
+        while self._parents[key] != root:
+            self._parents[key], key = root, self._parents[key]
+        return root
+
+    def lookup(self, name: str, zip_code: Optional[str] = None) -> Optional[str]:
+        """
+        Find the vendor a contractor name (and ZIP code) belongs to.
+
+        Returns:
+            str: The vendor's key, or None if no similar contractor is known.
+        """
+        zip_code = (zip_code or "")[:5] if self.match_address else ""
+        key = vendor_key(name, zip_code)
+        if key in self._parents:
+            return self.vendor_id(key)
+        match = self._best_match(canonical_name(name), zip_code)
+        return self.vendor_id(match) if match is not None else None
+
+    def vendors(self) -> Iterator[tuple[str, list[VendorRecord]]]:
+        """
+        Iterate over the vendors and all the records merged into each.
+
+        Returns:
+            Iterator[tuple[str, list[VendorRecord]]]: (vendor key, records)
+        """
+        merged: dict[str, list[VendorRecord]] = {}
+        for key, records in self._records.items():
+            merged.setdefault(self.vendor_id(key), []).extend(records)
+        yield from merged.items()
+
+
+def vendor_attributes(records: list[VendorRecord]) -> dict[str, Any]:
+    """
+    The attributes of a vendor: its most frequent name and address, and every
+    other spelling of its name as `aliases`.
+    """
+    names = Counter(record.name for record in records)
+    addresses = Counter(
+        (record.address, record.city, record.state, record.zip)
+        for record in records
+        if record.address
+    )
+    address, city, state, zip_code = (
+        addresses.most_common(1)[0][0] if addresses else (None, None, None, None)
+    )
+    return {
+        "name": names.most_common(1)[0][0],
+        "aliases": sorted(names),
+        "address": canonical_address(address) or None,
+        "city": city,
+        "state": state,
+        "zip": zip_code,
+    }
+
+
+__all__ = [
+    "VendorIndex",
+    "VendorRecord",
+    "canonical_address",
+    "canonical_name",
+    "vendor_attributes",
+    "vendor_key",
+]
@@ -0,0 +1,16 @@
+# filings.py
+
+
+def filing_json(ein, name, year, return_data):
+    """
+    The parsed XML of a filing by `ein` for `year`, with the given ReturnData.
+    """
+    return {
+        "Return": {
+            "ReturnHeader": {
+                "TaxYr": str(year),
+                "Filer": {"EIN": ein, "BusinessName": {"BusinessNameLine1Txt": name}},
+            },
+            "ReturnData": return_data,
+        }
+    }
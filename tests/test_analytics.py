@@ -0,0 +1,67 @@
+# test_analytics.py
+
+import networkx as nx
+import pytest
+
+pytest.importorskip("scipy")
+
+from nonprofit_networks import analytics  # noqa: E402
+
+
+def _graph():
+    #   R -> A (1000) -> C (300)
+    #   R -> B (500)  -> C (100), B -> D (900)
+    graph = nx.MultiDiGraph()
+    for ein in "RABCD":
+        graph.add_node(ein, name=f"Org {ein}", __labels__={"Organization"})
+    for grantor, recipient, amount in [
+        ("R", "A", 1000.0),
+        ("R", "B", 500.0),
+        ("A", "C", 300.0),
+        ("B", "C", 100.0),
+        ("B", "D", 900.0),
+    ]:
+        graph.add_edge(grantor, recipient, amount=amount, __labels__={"GrantFunded"})
+    graph.add_node("Jane Doe", __labels__={"Person"})
+    graph.add_edge("Jane Doe", "A", __labels__={"WorksFor"})
+    return graph
+
+
+def test_propagate_flow_attributes_money_proportionally():
+    flow = analytics.propagate_flow(_graph(), "R")
+    assert flow.loc["A", "flow"] == 1000.0
+    assert flow.loc["A", "depth"] == 1
+    # A passes on all 300 it granted; B only received 500 of the 1000 it
+    # granted, so half of each of its grants is attributed to R
+    assert flow.loc["C", "flow"] == pytest.approx(300.0 + 50.0)
+    assert flow.loc["D", "flow"] == pytest.approx(450.0)
+    assert flow.loc["D", "depth"] == 2
+    assert "R" not in flow.index
+
+    decayed = analytics.propagate_flow(_graph(), "R", decay=0.5)
+    assert decayed.loc["D", "flow"] == pytest.approx(225.0)
+
+
+def test_depth_totals():
+    totals = analytics.depth_totals(_graph(), "R")
+    assert totals.to_dict("index") == {
+        1: {"organizations": 2, "grants": 2, "amount": 1500.0},
+        2: {"organizations": 2, "grants": 3, "amount": 1300.0},
+    }
+    assert len(analytics.depth_totals(_graph(), "R", max_depth=1)) == 1
+
+
+def test_weighted_pagerank_matches_networkx():
+    graph = _graph()
+    graph.remove_node("Jane Doe")
+    ranks = analytics.weighted_pagerank(graph, tol=1.0e-10, max_iter=500)
+    expected = nx.pagerank(graph, weight="amount", tol=1.0e-10, max_iter=500)
+    for ein, rank in expected.items():
+        assert ranks.loc[ein, "pagerank"] == pytest.approx(rank, rel=1.0e-6)
+
+
+def test_top_intermediaries():
+    top = analytics.top_intermediaries(_graph(), n=1)
+    assert list(top.index) == ["B"]
+    assert top.loc["B", "pass_through"] == 500.0
+    assert top.loc["B", "name"] == "Org B"
@@ -0,0 +1,74 @@
+# test_array_graph.py
+
+import pickle
+
+import networkx as nx
+import pytest
+
+from nonprofit_networks import export
+from nonprofit_networks.array_graph import ArrayGraph
+
+
+def _graph():
+    graph = ArrayGraph()
+    graph.add_node("A", name="Alpha", net_assets=10.0, __labels__={"Organization"})
+    graph.add_node("B", name="Beta", __labels__={"Organization"})
+    graph.add_edge("A", "B", amount=100.0, memo="General", __labels__={"GrantFunded"})
+    graph.add_edge("A", "B", amount=25.0, memo="General", __labels__={"GrantFunded"})
+    graph.add_edge("A", "C", amount=None, memo=None, __labels__={"GrantFunded"})
+    graph.add_edge("Jane Doe", "A", __labels__={"StaffMember"})
+    return graph
+
+
+def test_node_attributes_read_and_write_columns():
+    graph = _graph()
+    assert "C" in graph and len(graph) == 4
+    assert graph.nodes["A"]["net_assets"] == 10.0
+    assert "net_assets" not in graph.nodes["B"]
+    assert graph.nodes["C"].get("name") is None
+
+    graph.nodes["B"]["object_id"] = "123"
+    graph.add_node("B", revenue="50")
+    assert dict(graph.nodes["B"]) == {
+        "name": "Beta",
+        "__labels__": {"Organization"},
+        "revenue": 50.0,
+        "object_id": "123",
+    }
+
+
+def test_edges_and_removal():
+    graph = _graph()
+    assert graph.has_edge("A", "B") and not graph.has_edge("B", "A")
+    assert [d["amount"] for d in graph["A"]["B"].values()] == [100.0, 25.0]
+    assert graph["A"]["C"][2] == {
+        "amount": None,
+        "memo": None,
+        "__labels__": {"GrantFunded"},
+    }
+
+    graph.remove_edges_from(
+        (u, v, k) for u, v, k in graph.out_edges("A", keys=True) if v == "B"
+    )
+    assert not graph.has_edge("A", "B")
+    assert graph.number_of_edges() == 2
+
+    restored = pickle.loads(pickle.dumps(graph))
+    nx_graph = restored.to_networkx()
+    assert sorted(nx_graph.edges()) == [("A", "C"), ("Jane Doe", "A")]
+    assert nx_graph.nodes["A"]["name"] == "Alpha"
+
+
+def test_sparse_adjacency_matches_networkx():
+    pytest.importorskip("scipy")
+    graph = _graph()
+    matrix, nodes = export.to_sparse_adjacency(graph)
+    expected, expected_nodes = export.to_sparse_adjacency(graph.to_networkx())
+    assert nodes == expected_nodes
+    assert (matrix != expected).nnz == 0
+    assert matrix[0, 1] == 125.0
+
+    counts, _ = export.to_sparse_adjacency(graph, weight=None, label=None)
+    assert counts.sum() == 4
+
+    assert ArrayGraph.from_networkx(nx.MultiDiGraph()).number_of_nodes() == 0
@@ -0,0 +1,113 @@
+# test_cache_files.py
+
+import json
+import os
+import zipfile
+
+import pytest
+import xmltodict
+
+from nonprofit_networks import cache_files
+from nonprofit_networks.propublica_sdk import ProPublicaClient
+
+FILING_XML = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    "<Return><ReturnHeader><TaxYr>2023</TaxYr></ReturnHeader>"
+    + "<Note>Grant to a nonprofit</Note>" * 200
+    + "</Return>"
+)
+
+
+@pytest.mark.parametrize("compression", [None, "gzip", "zstd"])
+def test_write_and_read_back(tmp_path, compression):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    path = str(tmp_path / "filing.xml")
+
+    stored = cache_files.write_cached(path, FILING_XML, compression)
+    assert stored == cache_files.compressed_path(path, compression)
+    assert cache_files.find_cached(path) == stored
+    with cache_files.open_cached(stored) as f:
+        assert xmltodict.parse(f)["Return"]["ReturnHeader"]["TaxYr"] == "2023"
+
+    # Rewriting in another format replaces the old copy
+    cache_files.write_cached(path, FILING_XML, None if compression else "gzip")
+    assert not os.path.exists(stored)
+
+
+def test_compressed_filings_are_smaller(tmp_path):
+    path = str(tmp_path / "filing.xml")
+    plain = os.path.getsize(cache_files.write_cached(path, FILING_XML, None))
+    gzipped = os.path.getsize(cache_files.write_cached(path, FILING_XML, "gzip"))
+    assert gzipped * 10 < plain
+
+
+def test_unknown_compression_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ProPublicaClient(cache_directory=str(tmp_path), cache_compression="brotli")
+
+
+def test_migrate_cache_compresses_and_decompresses(tmp_path):
+    cache = tmp_path / "cache"
+    (cache / "xml_files" / "2024" / "B1").mkdir(parents=True)
+    (cache / "irs_indices").mkdir()
+    (cache / "xml_files" / "2024" / "B1" / "1_public.xml").write_text(FILING_XML)
+    (cache / "xml_files" / "2024" / "B1" / "B1.zip").write_bytes(b"zip")
+    (cache / "search.json_1.json").write_text(json.dumps({"total_results": 0}))
+    (cache / "irs_indices" / "index_2024.csv").write_text("EIN\n1\n")
+    (cache / "irs_indices" / "index_2024.csv.meta.json").write_text("{}")
+
+    counts = cache_files.migrate_cache(str(cache), "gzip")
+    assert counts["converted"] == 2
+    assert counts["bytes_after"] < counts["bytes_before"]
+    assert sorted(
+        os.path.relpath(os.path.join(d, f), cache)
+        for d, _, files in os.walk(cache)
+        for f in files
+    ) == [
+        os.path.join("irs_indices", "index_2024.csv"),
+        os.path.join("irs_indices", "index_2024.csv.meta.json"),
+        "search.json_1.json.gz",
+        os.path.join("xml_files", "2024", "B1", "1_public.xml.gz"),
+        os.path.join("xml_files", "2024", "B1", "B1.zip"),
+    ]
+    assert cache_files.migrate_cache(str(cache), "gzip")["unchanged"] == 2
+
+    client = ProPublicaClient(cache_directory=str(cache))
+    assert client.migrate_cache()["converted"] == 2
+    assert (cache / "xml_files" / "2024" / "B1" / "1_public.xml").read_text() == (
+        FILING_XML
+    )
+
+
+def test_client_reads_and_writes_compressed_cache(tmp_path, monkeypatch):
+    client = ProPublicaClient(cache_directory=str(tmp_path), cache_compression="gzip")
+    batch_dir = tmp_path / "xml_files" / "2024" / "B1"
+    batch_dir.mkdir(parents=True)
+    with zipfile.ZipFile(batch_dir / "B1.zip", "w") as zf:
+        zf.writestr("202401_public.xml", FILING_XML)
+
+    path = client._download_xml_batch(2024, "202401", "B1")
+    assert path == str(batch_dir / "202401_public.xml.gz")
+    filing = client._read_indexed_filing(2024, "202401", "B1", as_json=True)
+    assert filing["Return"]["ReturnHeader"]["TaxYr"] == "2023"
+    assert [
+        f["Return"]["ReturnHeader"]["TaxYr"] for f in client.iter_cached_filings()
+    ] == ["2023"]
+    assert client.stats()["cache_hits"] == 2
+
+    class Response:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"total_results": 0, "organizations": []}
+
+    monkeypatch.setattr(client, "_http_get", lambda url, **kwargs: Response())
+    assert client._get("search.json", {"q": "x"}) == client._get(
+        "search.json", {"q": "x"}
+    )
+    assert client.stats()["cache_misses"] == 1
+    assert client._get_cache_path("search.json", {"q": "x"}) + ".gz" in [
+        str(p) for p in tmp_path.iterdir()
+    ]
@@ -0,0 +1,139 @@
+# test_cli.py
+
+import io
+import json
+import pickle
+
+import networkx as nx
+
+from nonprofit_networks import cli
+from nonprofit_networks.propublica_sdk import ProPublicaClient
+
+
+def test_indices_prints_statuses(tmp_path, monkeypatch, capsys):
+    calls = []
+
+    def download(self, years=None, force=False, max_workers=4):
+        calls.append((years, force, max_workers))
+        return {2023: "unchanged", 2024: "downloaded"}
+
+    monkeypatch.setattr(ProPublicaClient, "download_irs_indices", download)
+    code = cli.main(
+        ["--cache-directory", str(tmp_path), "--quiet", "indices", "2023", "2024"]
+    )
+
+    assert code == 0
+    assert calls == [([2023, 2024], False, 4)]
+    assert capsys.readouterr().out.splitlines() == [
+        "2023\tunchanged",
+        "2024\tdownloaded",
+    ]
+
+
+def test_filings_writes_ndjson(tmp_path, monkeypatch):
+    def get_full_filing(self, ein, year, month=None, as_json=False):
+        if ein == "999999999":
+            raise ValueError("No filings")
+        self._count("filing_count")
+        return {"Return": {"ein": ein, "year": year}}
+
+    monkeypatch.setattr(ProPublicaClient, "get_full_filing", get_full_filing)
+    eins = tmp_path / "eins.txt"
+    eins.write_text("# seeds\n111111111\n\n999999999\n222222222\n")
+    output = tmp_path / "filings.ndjson"
+
+    code = cli.main(
+        [
+            "--cache-directory",
+            str(tmp_path / "cache"),
+            "--quiet",
+            "filings",
+            str(eins),
+            "--year",
+            "2023",
+            "--workers",
+            "2",
+            "--output",
+            str(output),
+        ]
+    )
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert code == 1
+    assert [r["ein"] for r in records] == ["111111111", "222222222"]
+    assert records[0]["filing"]["Return"]["year"] == 2023
+
+
+def test_progress_line_reports_rates_and_hit_rate(tmp_path):
+    client = ProPublicaClient(cache_directory=str(tmp_path))
+    stream = io.StringIO()
+    with cli.ProgressReporter(client, interval=60, stream=stream) as progress:
+        progress.total = 4
+        progress.advance(2)
+        for name in ("request_count", "filing_count", "cache_hits", "cache_hits"):
+            client._count(name)
+        client._count("cache_misses")
+        line = progress.line()
+
+    assert line.startswith("2/4 done | 1 requests (")
+    assert "1 filings (" in line
+    assert "cache hits 67%" in line
+    # The final line is printed when the job ends
+    assert stream.getvalue().strip().startswith("2/4 done")
+
+
+def test_export_converts_a_pickled_graph(tmp_path):
+    graph = nx.MultiDiGraph()
+    graph.add_node("A", name="Alpha", __labels__={"Organization"})
+    graph.add_node("B", name="Beta", __labels__={"Organization"})
+    graph.add_edge("A", "B", amount=10.0, __labels__={"GrantFunded"})
+    with open(tmp_path / "graph.pickle", "wb") as f:
+        pickle.dump(graph, f)
+
+    code = cli.main(
+        [
+            "--cache-directory",
+            str(tmp_path / "cache"),
+            "--quiet",
+            "export",
+            str(tmp_path / "graph.pickle"),
+            "--format",
+            "ndjson",
+            "--output",
+            str(tmp_path / "graph.ndjson"),
+        ]
+    )
+
+    lines = (tmp_path / "graph.ndjson").read_text().splitlines()
+    assert code == 0
+    assert [json.loads(line)["type"] for line in lines] == ["node", "node", "edge"]
+
+
+def test_grants_keeps_the_other_seeds_when_one_fails(tmp_path, monkeypatch, capsys):
+    from nonprofit_networks.network_builder import GrantmakerNetworkBuilder
+
+    def build_network(self, ein, depth, year, budget=None, best_first=False):
+        if ein == "999999999":
+            raise TypeError("malformed filing")
+        self.graph.add_node(ein, name=f"Org {ein}")
+
+    monkeypatch.setattr(GrantmakerNetworkBuilder, "build_network", build_network)
+    seeds = tmp_path / "seeds.txt"
+    seeds.write_text("111111111\n999999999\n222222222\n")
+    output = tmp_path / "graph.pickle"
+
+    code = cli.main(
+        [
+            "--cache-directory",
+            str(tmp_path / "cache"),
+            "--quiet",
+            "grants",
+            str(seeds),
+            "--output",
+            str(output),
+        ]
+    )
+
+    assert code == 1
+    assert sorted(cli._load_graph(str(output)).nodes) == ["111111111", "222222222"]
+    assert "999999999\tfailed\tmalformed filing" in capsys.readouterr().err
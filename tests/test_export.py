@@ -0,0 +1,96 @@
+# test_export.py
+
+import json
+import sys
+
+import networkx as nx
+import pytest
+
+from nonprofit_networks import export
+
+
+def _graph():
+    graph = nx.MultiDiGraph()
+    graph.add_node(
+        "A", name="Alpha & Co", net_assets=1000.0, __labels__={"Organization"}
+    )
+    graph.add_node("B", name="Beta", revenue=50.0, __labels__={"Organization"})
+    graph.add_node("Jane Doe", __labels__={"Person"})
+    graph.add_edge("A", "B", amount=100.0, memo="General", __labels__={"GrantFunded"})
+    graph.add_edge("A", "B", amount="25", memo=None, __labels__={"GrantFunded"})
+    graph.add_edge("Jane Doe", "A", title="Director", __labels__={"WorksFor"})
+    return graph
+
+
+def test_sparse_adjacency_sums_parallel_grants():
+    pytest.importorskip("scipy")
+    matrix, nodes = export.to_sparse_adjacency(_graph())
+
+    assert nodes == ["A", "B", "Jane Doe"]
+    assert matrix.shape == (3, 3)
+    assert matrix.nnz == 1
+    assert matrix[0, 1] == 125.0
+
+    counts, _ = export.to_sparse_adjacency(_graph(), weight=None, label=None)
+    assert counts[0, 1] == 2.0
+    assert counts[2, 0] == 1.0
+
+
+def test_tables():
+    graph = _graph()
+    nodes = export.node_table(graph)
+    edges = export.edge_table(graph)
+
+    assert list(nodes["id"]) == ["A", "B", "Jane Doe"]
+    assert list(nodes["label"]) == ["Organization", "Organization", "Person"]
+    assert nodes.loc[0, "net_assets"] == 1000.0
+    assert list(edges["amount"].fillna(0)) == [100.0, 25.0, 0.0]
+    assert list(edges["label"]) == ["GrantFunded", "GrantFunded", "WorksFor"]
+
+
+def test_ndjson_is_one_record_per_line(tmp_path):
+    path = tmp_path / "graph.ndjson"
+    export.write_ndjson(_graph(), str(path))
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["type"] for r in records] == ["node"] * 3 + ["edge"] * 3
+    assert records[0]["name"] == "Alpha & Co"
+    assert records[3]["source"] == "A" and records[3]["amount"] == 100.0
+
+
+def test_graphml_can_be_read_back(tmp_path):
+    path = tmp_path / "graph.graphml"
+    export.write_graphml(_graph(), str(path))
+
+    graph = nx.read_graphml(str(path), force_multigraph=True)
+    assert graph.is_directed()
+    assert graph.nodes["A"]["name"] == "Alpha & Co"
+    assert graph.nodes["A"]["net_assets"] == 1000.0
+    assert sorted(d["amount"] for _, _, d in graph.edges("A", data=True)) == [
+        25.0,
+        100.0,
+    ]
+
+
+def test_parquet_export_without_pyarrow_explains_how_to_install_it(
+    tmp_path, monkeypatch
+):
+    # A None entry in sys.modules makes the import raise ImportError
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    monkeypatch.setitem(sys.modules, "pyarrow.parquet", None)
+    paths = str(tmp_path / "nodes.parquet"), str(tmp_path / "edges.parquet")
+    with pytest.raises(ImportError, match="pip install pyarrow"):
+        export.to_parquet(_graph(), *paths)
+    with pytest.raises(ImportError, match="pip install pyarrow"):
+        export.ParquetSink(*paths)
+
+
+def test_parquet_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    import pandas as pd
+
+    nodes_path, edges_path = tmp_path / "nodes.parquet", tmp_path / "edges.parquet"
+    export.to_parquet(_graph(), str(nodes_path), str(edges_path))
+
+    assert list(pd.read_parquet(nodes_path)["id"]) == ["A", "B", "Jane Doe"]
+    assert len(pd.read_parquet(edges_path)) == 3
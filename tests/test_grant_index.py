@@ -0,0 +1,73 @@
+# test_grant_index.py
+
+from nonprofit_networks.grant_index import GrantIndex
+from nonprofit_networks.network_builder import GrantmakerNetworkBuilder
+
+from .filings import filing_json
+
+
+def _filing_json(ein, name, year, grants):
+    return filing_json(
+        ein,
+        name,
+        year,
+        {
+            "IRS990ScheduleI": {
+                "RecipientTable": [
+                    {
+                        "RecipientEIN": recipient,
+                        "RecipientBusinessName": {
+                            "BusinessNameLine1Txt": f"Org {recipient}"
+                        },
+                        "CashGrantAmt": str(amount),
+                        "PurposeOfGrantTxt": "General support",
+                    }
+                    for recipient, amount in grants
+                ]
+            }
+        },
+    )
+
+
+def _index():
+    index = GrantIndex()
+    index.add_filings(
+        [
+            _filing_json("A", "Alpha", 2023, [("C", 100), ("D", 5)]),
+            _filing_json("B", "Beta", 2023, [("C", 300)]),
+            _filing_json("B", "Beta", 2023, [("C", 300)]),
+            _filing_json("R", "Root", 2023, [("A", 1000)]),
+            _filing_json("R", "Root", 2022, [("B", 50)]),
+        ]
+    )
+    return index
+
+
+def test_funders_are_found_by_recipient():
+    index = _index()
+    assert len(index) == 5
+    assert [(r.grantor_ein, r.amount) for r in index.funders("C")] == [
+        ("B", 300.0),
+        ("A", 100.0),
+    ]
+    assert [r.grantor_ein for r in index.funders("B", year=2023)] == []
+    assert index.name("C") == "Org C"
+    assert [r.recipient_ein for r in index.grants("A")] == ["C", "D"]
+
+
+def test_upstream_network_needs_no_requests():
+    builder = GrantmakerNetworkBuilder(client=None, grant_index=_index())
+    builder.build_upstream_network("C", depth=2, year=2023)
+    graph = builder.get_graph()
+
+    assert sorted((u, v) for u, v, _ in graph.edges) == [
+        ("A", "C"),
+        ("B", "C"),
+        ("R", "A"),
+    ]
+    assert graph["B"]["C"][0]["amount"] == 300.0
+    assert graph.nodes["R"]["name"] == "Root"
+
+    # Running it again does not duplicate grants
+    builder.build_upstream_network("C", depth=2, year=2023)
+    assert graph.number_of_edges() == 3
@@ -0,0 +1,237 @@
+# test_http_policy.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from nonprofit_networks.http_policy import (
+    CircuitOpenError,
+    RequestPolicy,
+    RequestRunner,
+)
+from nonprofit_networks.propublica_sdk import ProPublicaClient
+
+URL = "https://projects.propublica.org/nonprofits/organizations/1"
+
+
+def _responder(*outcomes):
+    """
+    A `send` function that returns (or raises) each outcome in turn.
+    """
+    calls = []
+
+    def send(timeout):
+        calls.append(timeout)
+        outcome = outcomes[min(len(calls), len(outcomes)) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome)
+
+    return send, calls
+
+
+def test_retries_with_jitter_until_success():
+    runner = RequestRunner({"api": RequestPolicy(retries=3, backoff=1.0)})
+    send, calls = _responder(httpx.ConnectError("refused"), 503, 200)
+    delays = []
+
+    response = runner.get("api", URL, send, sleep=delays.append)
+
+    assert response.status_code == 200
+    assert len(calls) == 3
+    assert calls[0].connect == 5.0 and calls[0].read == 15.0
+    assert 0 <= delays[0] <= 1.0 and 0 <= delays[1] <= 2.0
+
+    # Other statuses are returned without retrying, and so is the last attempt
+    send, calls = _responder(404)
+    assert runner.get("api", URL, send, sleep=delays.append).status_code == 404
+    send, calls = _responder(503)
+    assert runner.get("api", URL, send, sleep=delays.append).status_code == 503
+    assert len(calls) == 4
+
+
+def test_deadline_bounds_all_attempts():
+    runner = RequestRunner(
+        {"api": RequestPolicy(deadline=0.5, retries=5, backoff=10.0, max_backoff=10.0)}
+    )
+    send, calls = _responder(httpx.ReadTimeout("slow"))
+    with pytest.raises(httpx.TimeoutException):
+        runner.get("api", URL, send, sleep=lambda delay: time.sleep(0.6))
+    assert len(calls) <= 2
+    assert calls[0].read <= 0.5
+
+
+def test_circuit_breaker_opens_per_host_and_recovers():
+    runner = RequestRunner(
+        {"api": RequestPolicy(retries=0)}, failure_threshold=2, reset_timeout=0.1
+    )
+    send, calls = _responder(500, 500, 200)
+    runner.get("api", URL, send)
+    runner.get("api", URL, send)
+    with pytest.raises(CircuitOpenError):
+        runner.get("api", URL, send)
+    assert len(calls) == 2
+    # Other hosts are not affected
+    other, _ = _responder(200)
+    assert runner.get("api", "https://apps.irs.gov/x", other).status_code == 200
+
+    time.sleep(0.15)
+    assert runner.get("api", URL, send).status_code == 200
+    assert not runner.breaker(URL).is_open
+
+
+def test_circuit_breaker_trial_is_released_by_other_errors():
+    runner = RequestRunner(
+        {"api": RequestPolicy(retries=0)}, failure_threshold=1, reset_timeout=0.05
+    )
+    send, _ = _responder(500)
+    runner.get("api", URL, send)
+    time.sleep(0.06)
+
+    def interrupted(timeout):
+        raise KeyError("not a transport error")
+
+    # The trial request fails without a response to judge the host by
+    with pytest.raises(KeyError):
+        runner.get("api", URL, interrupted)
+    # so the next request is let through as the trial instead
+    ok, calls = _responder(200)
+    assert runner.get("api", URL, ok).status_code == 200
+    assert not runner.breaker(URL).is_open
+
+
+def test_slow_requests_are_hedged():
+    runner = RequestRunner(
+        {"api": RequestPolicy(hedge_percentile=0.9, hedge_min_samples=3, retries=0)}
+    )
+    fast, _ = _responder(200)
+    for _ in range(3):
+        runner.get("api", URL, fast)
+    assert runner.latency_percentile("api", 0.9) < 0.1
+
+    senders = []
+
+    def send(timeout):
+        # The request and its duplicate are sent from separate pools
+        primary = threading.current_thread().name.startswith("hedged-request-primary")
+        senders.append(primary)
+        if primary:
+            time.sleep(0.3)
+            raise httpx.ReadTimeout("slow")
+        return httpx.Response(200)
+
+    response = runner.get("api", URL, send)
+    runner.close()
+    assert response.status_code == 200
+    assert sorted(senders) == [False, True]
+
+
+def test_hedged_duplicate_wins_against_a_slow_request():
+    runner = RequestRunner(
+        {"api": RequestPolicy(hedge_percentile=0.9, hedge_min_samples=3, retries=0)}
+    )
+    fast, _ = _responder(200)
+    for _ in range(3):
+        runner.get("api", URL, fast)
+
+    def send(timeout):
+        # The request succeeds, but long after its duplicate
+        if threading.current_thread().name.startswith("hedged-request-primary"):
+            time.sleep(1.0)
+            return httpx.Response(200, text="primary")
+        return httpx.Response(200, text="duplicate")
+
+    started = time.monotonic()
+    response = runner.get("api", URL, send)
+    elapsed = time.monotonic() - started
+    runner.close()
+    assert response.text == "duplicate"
+    assert elapsed < 0.5
+
+
+def test_requests_are_not_hedged_behind_a_busy_pool():
+    runner = RequestRunner(
+        {"api": RequestPolicy(hedge_percentile=0.5, hedge_min_samples=3)}
+    )
+    calls = []
+
+    def send(timeout, seconds=0.1):
+        calls.append(timeout)
+        time.sleep(seconds)
+        return httpx.Response(200)
+
+    for _ in range(3):
+        runner.get("api", URL, send)
+
+    # Occupy every thread of the pool, so that a request queued behind them
+    # would look slow and be hedged
+    release = threading.Event()
+    runner._hedge_pool = ThreadPoolExecutor(max_workers=16)
+    busy = [runner._hedge_pool.submit(release.wait, 5) for _ in range(16)]
+    try:
+        response = runner.get("api", URL, lambda timeout: send(timeout, 0.01))
+    finally:
+        release.set()
+    runner.close()
+    assert response.status_code == 200
+    assert all(future.result() for future in busy)
+    assert len(calls) == 4
+
+
+def test_client_closes_its_hedge_pool(tmp_path):
+    with ProPublicaClient(cache_directory=str(tmp_path)) as client:
+        pool = client._requests._hedge_pool = ThreadPoolExecutor(max_workers=1)
+    assert client._requests._hedge_pool is None
+    with pytest.raises(RuntimeError):
+        pool.submit(time.sleep, 0)
+
+
+def test_client_applies_endpoint_policies(tmp_path, monkeypatch):
+    statuses = [503, 200]
+    seen = []
+
+    def handler(request):
+        seen.append(request.extensions["timeout"])
+        return httpx.Response(statuses.pop(0), json={"total_results": 0})
+
+    http = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(
+        httpx,
+        "get",
+        lambda url, timeout, **kwargs: http.get(url, timeout=timeout, **kwargs),
+    )
+    client = ProPublicaClient(
+        cache_directory=str(tmp_path),
+        request_policies={"api": RequestPolicy(read_timeout=2.0, backoff=0.0)},
+    )
+
+    assert client._get("search.json", {"q": "x"}) == {"total_results": 0}
+    assert client.stats()["requests"] == 2
+    assert seen[0]["read"] == 2.0
+
+
+def test_hedging_threads_are_bounded():
+    runner = RequestRunner(
+        {"api": RequestPolicy(hedge_percentile=0.5, hedge_min_samples=3)},
+        max_hedged=2,
+    )
+    fast, _ = _responder(200)
+    for _ in range(3):
+        runner.get("api", URL, fast)
+
+    def slow(timeout):
+        time.sleep(0.2)
+        return httpx.Response(200)
+
+    with ThreadPoolExecutor(max_workers=8) as callers:
+        responses = list(
+            callers.map(lambda _: runner.get("api", URL, slow), range(8))
+        )
+    hedging = len(runner._request_pool._threads) + len(runner._hedge_pool._threads)
+    runner.close()
+    assert all(response.status_code == 200 for response in responses)
+    # One thread per hedged request, and one per duplicate
+    assert hedging <= 4
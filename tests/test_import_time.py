@@ -0,0 +1,77 @@
+# test_import_time.py
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Cold start of `import nonprofit_networks` plus creating a client, in seconds
+IMPORT_BUDGET = 0.5
+
+_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import nonprofit_networks
+nonprofit_networks.ProPublicaClient(cache_directory=sys.argv[1])
+elapsed = time.perf_counter() - start
+heavy = [
+    "pandas",
+    "numpy",
+    "bs4",
+    "networkx",
+    "nonprofit_networks.array_graph",
+    "nonprofit_networks.response_types",
+]
+print(json.dumps({"elapsed": elapsed, "loaded": [m for m in heavy if m in sys.modules]}))
+"""
+
+_BUILDER_SCRIPT = """
+import json, sys
+import nonprofit_networks.network_builder
+heavy = [
+    "pandas",
+    "numpy",
+    "bs4",
+    "nonprofit_networks.array_graph",
+    "nonprofit_networks.response_types",
+]
+print(json.dumps({"loaded": [m for m in heavy if m in sys.modules]}))
+"""
+
+
+def _cold_start(cache_directory, script=_SCRIPT) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", script, str(cache_directory)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def test_client_startup_does_not_import_heavy_dependencies(tmp_path):
+    assert _cold_start(tmp_path)["loaded"] == []
+
+
+@pytest.mark.skipif(
+    not os.environ.get("BENCHMARK"), reason="set BENCHMARK=1 to run benchmarks"
+)
+def test_client_startup_is_within_budget(tmp_path):
+    # Wall-clock time depends on the machine and its load, so this only runs
+    # as a benchmark; the other tests check what keeps startup fast
+    elapsed = min(_cold_start(tmp_path)["elapsed"] for _ in range(3))
+    print(f"\nimport and client startup: {elapsed * 1000:.0f} ms")
+    assert elapsed < IMPORT_BUDGET
+
+
+def test_builders_do_not_import_pandas_numpy_or_the_filing_models(tmp_path):
+    assert _cold_start(tmp_path, _BUILDER_SCRIPT)["loaded"] == []
+
+
+def test_full_filing_is_still_importable_from_the_client_module():
+    from nonprofit_networks.propublica_sdk import FullFiling
+    from nonprofit_networks.response_types import FullFiling as model
+
+    assert FullFiling is model
@@ -0,0 +1,122 @@
+# test_name_index.py
+
+import os
+import random
+import string
+import time
+
+import pandas as pd
+import pytest
+
+from nonprofit_networks import name_index
+from nonprofit_networks.name_index import OrganizationNameIndex
+from nonprofit_networks.propublica_sdk import ProPublicaClient, SearchResponse
+
+INDEX_ROWS = pd.DataFrame(
+    {
+        "RETURN_ID": [1, 2, 3, 4, 5],
+        "EIN": ["142007220", "131624100", "530196605", "941156268", "142007220"],
+        "TAX_PERIOD": [202212, 202212, 202212, 202212, 202312],
+        "TAXPAYER_NAME": [
+            "PRO PUBLICA INC",
+            "AMERICAN CIVIL LIBERTIES UNION FOUNDATION INC",
+            "AMERICAN RED CROSS",
+            "WIKIMEDIA FOUNDATION INC",
+            "PROPUBLICA INC",
+        ],
+        "RETURN_TYPE": ["990"] * 5,
+        "OBJECT_ID": ["1", "2", "3", "4", "5"],
+    }
+)
+
+
+def test_exact_prefix_and_fuzzy_matches():
+    index = OrganizationNameIndex()
+    index.add_rows(INDEX_ROWS)
+    assert len(index) == 4
+    # The latest name wins
+    assert index.name("142007220") == "PROPUBLICA INC"
+    assert index.search("pro publica") == []
+
+    assert [ein for ein, _, _ in index.search("american red cross")] == ["530196605"]
+    assert [ein for ein, _, _ in index.search("American")] == [
+        "530196605",
+        "131624100",
+    ]
+    assert [ein for ein, _, _ in index.search("wiki found")] == ["941156268"]
+    assert [ein for ein, _, _ in index.search("wikimedia fundation")] == ["941156268"]
+    assert index.search("nonexistent") == []
+
+
+def test_client_search_is_served_locally(tmp_path, monkeypatch):
+    index_dir = tmp_path / "irs_indices"
+    index_dir.mkdir()
+    INDEX_ROWS.to_csv(index_dir / "index_2023.csv", index=False)
+    client = ProPublicaClient(cache_directory=str(tmp_path), local_search=True)
+
+    remote_queries = []
+
+    def remote(query, page=0):
+        remote_queries.append(query)
+        return SearchResponse(
+            total_results=0, organizations=[], num_pages=0, cur_page=0, per_page=25
+        )
+
+    monkeypatch.setattr(client, "_paginated_search", remote)
+    response = client.search("red cross")
+    assert response.total_results == 1
+    assert response.organizations[0].ein == 530196605
+    assert response.organizations[0].name == "AMERICAN RED CROSS"
+    assert remote_queries == []
+
+    # No local match, or a location filter, falls back to the API
+    client.search("unknown charity")
+    client.search("red cross", state="DC")
+    assert remote_queries == ["unknown charity", "red cross"]
+
+
+def _random_vocabulary(size, seed=0):
+    rng = random.Random(seed)
+    letters = string.ascii_lowercase
+    return list(
+        {"".join(rng.choices(letters, k=rng.randint(4, 12))) for _ in range(size)}
+    )
+
+
+def test_fuzzy_matches_compare_few_tokens_of_a_large_vocabulary(monkeypatch):
+    # About the size of the vocabulary of every name in the IRS indices
+    vocabulary = _random_vocabulary(200_000)
+    index = OrganizationNameIndex()
+    for i in range(0, len(vocabulary), 3):
+        index.add(str(i), " ".join(vocabulary[i : i + 3]))
+    index.add("1", "WIKIMEDIA FOUNDATION INC")
+
+    compared = []
+
+    class CountingMatcher(name_index.SequenceMatcher):
+        def __init__(self, isjunk, a, b):
+            compared.append(b)
+            super().__init__(isjunk, a, b)
+
+    monkeypatch.setattr(name_index, "SequenceMatcher", CountingMatcher)
+    assert [ein for ein, _, _ in index.search("wikimedia fundation")] == ["1"]
+    assert len(compared) <= name_index._MAX_FUZZY_CANDIDATES
+
+
+@pytest.mark.skipif(
+    not os.environ.get("BENCHMARK"), reason="set BENCHMARK=1 to run benchmarks"
+)
+def test_fuzzy_search_benchmark():
+    # Reports the timing (run with -s to see it), without asserting on it
+    vocabulary = _random_vocabulary(200_000)
+    index = OrganizationNameIndex()
+    for i in range(0, len(vocabulary), 3):
+        index.add(str(i), " ".join(vocabulary[i : i + 3]))
+    index.search("warmup fundation")
+
+    queries = [word[:2] + word[3:] + "x" for word in vocabulary[:200]]
+    start = time.perf_counter()
+    for query in queries:
+        index.search(query)
+    elapsed = (time.perf_counter() - start) / len(queries)
+    print(f"\nfuzzy search over {len(vocabulary)} tokens: {elapsed * 1000:.2f} ms")
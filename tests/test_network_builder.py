@@ -0,0 +1,714 @@
+# test_network_builder.py
+
+import json
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from nonprofit_networks import export
+from nonprofit_networks.propublica_sdk import (
+    FilingNotFoundError,
+    Person,
+    ProPublicaClient,
+)
+from nonprofit_networks.filing_store import FilingHandle, FilingStore
+from nonprofit_networks.officer_index import OfficerIndex, OfficerRecord
+from nonprofit_networks.array_graph import ArrayGraph
+from nonprofit_networks.network_builder import (
+    ArrayGrantmakerNetworkBuilder,
+    CrawlBudget,
+    GrantmakerNetworkBuilder,
+    RelatedOrgNetworkBuilder,
+    StaffNetworkBuilder,
+    TemporalGrantNetworkBuilder,
+)
+
+
+class FakeFiling:
+    def __init__(
+        self, ein, name, grants=(), net_assets=0.0, revexp=(0.0, 0.0), staff=()
+    ):
+        self.ein = ein
+        self.name = name
+        self.staff = [
+            SimpleNamespace(PersonNm=person, TitleTxt="Director") for person in staff
+        ]
+        self.grants = [
+            SimpleNamespace(
+                RecipientEIN=recipient, CashGrantAmt=amount, PurposeOfGrantTxt=memo
+            )
+            for recipient, amount, memo in grants
+        ]
+        self.net_assets = net_assets
+        self.revexp = revexp
+
+    def get_name(self):
+        return self.name
+
+    def get_compensations(self):
+        return self.staff
+
+    def get_grant_recipients(self):
+        return self.grants
+
+    def get_net_assets(self):
+        return self.net_assets
+
+    def get_total_revexp(self):
+        return self.revexp
+
+
+class FakeClient:
+    def __init__(self, filings):
+        self.filings = filings
+        self.calls = []
+        self.request_count = 0
+        self.people = {}
+        self.people_searches = []
+        self._lock = threading.Lock()
+
+    def search_people(self, query):
+        with self._lock:
+            self.people_searches.append(query)
+        return self.people.get(query.lower(), [])
+
+    def get_full_filing(self, ein, year, month=None, as_json=False):
+        with self._lock:
+            self.calls.append((ein, year))
+            self.request_count += 1
+        if ein not in self.filings:
+            raise ValueError(f"No filings found for EIN {ein}")
+        return self.filings[ein]
+
+
+BUILDER_CLASSES = [GrantmakerNetworkBuilder, ArrayGrantmakerNetworkBuilder]
+
+
+@pytest.fixture
+def diamond_client():
+    # A -> B, A -> C, B -> D, C -> D, D -> A, and B -> X (missing filing)
+    return FakeClient(
+        {
+            "A": FakeFiling("A", "Alpha", [("B", 100.0, "b"), ("C", 50.0, "c")]),
+            "B": FakeFiling("B", "Beta", [("D", 10.0, "d"), ("X", 5.0, "x")]),
+            "C": FakeFiling("C", "Gamma", [("D", 20.0, "d")]),
+            "D": FakeFiling("D", "Delta", [("A", 1.0, "a")]),
+        }
+    )
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_grantmaker_bfs_fetches_each_filing_once(diamond_client, max_workers):
+    builder = GrantmakerNetworkBuilder(diamond_client, max_workers=max_workers)
+    builder.build_network("A", depth=5, year=2023)
+    graph = builder.get_graph()
+
+    assert set(graph.nodes) == {"A", "B", "C", "D"}
+    assert sorted((u, v) for u, v, _ in graph.edges) == [
+        ("A", "B"),
+        ("A", "C"),
+        ("B", "D"),
+        ("C", "D"),
+        ("D", "A"),
+    ]
+    assert graph.nodes["B"]["name"] == "Beta"
+    assert graph["A"]["B"][0]["amount"] == 100.0
+    fetched = [ein for ein, _ in diamond_client.calls]
+    assert sorted(fetched) == ["A", "B", "C", "D", "X"]
+
+
+def test_grantmaker_depth_limits_expansion(diamond_client):
+    builder = GrantmakerNetworkBuilder(diamond_client)
+    builder.build_network("A", depth=1, year=2023)
+    graph = builder.get_graph()
+    assert set(graph.nodes) == {"A", "B", "C"}
+    assert graph.number_of_edges() == 2
+
+    builder = GrantmakerNetworkBuilder(diamond_client)
+    builder.build_network("A", depth=0, year=2023)
+    assert builder.get_graph().number_of_nodes() == 0
+
+
+def test_add_organizations_adds_nodes_without_grants(diamond_client):
+    builder = GrantmakerNetworkBuilder(diamond_client, max_workers=4)
+    added = builder.add_organizations(["A", "X", "C", "A"], year=2023)
+    graph = builder.get_graph()
+
+    assert added == ["A", "C"]
+    assert set(graph.nodes) == {"A", "C"}
+    assert graph.nodes["C"]["name"] == "Gamma"
+    assert graph.number_of_edges() == 0
+
+
+def test_nodes_hold_handles_not_filings(diamond_client):
+    store = FilingStore(diamond_client, max_cached=1)
+    builder = GrantmakerNetworkBuilder(diamond_client, filing_store=store)
+    builder.build_network("A", depth=1, year=2023)
+    node = builder.get_graph().nodes["A"]
+
+    assert isinstance(node["filing"], FilingHandle)
+    assert node["name"] == "Alpha"
+    assert node["net_assets"] == 0.0
+    assert node["filing"].load() is diamond_client.filings["A"]
+    assert node["filing"].get_name() == "Alpha"
+    assert node["filing"].name == "Alpha"
+
+    # Unknown attributes don't load the filing
+    calls = list(diamond_client.calls)
+    store.invalidate("A", 2023)
+    assert not hasattr(node["filing"], "nonexistent")
+    assert not hasattr(node["filing"], "__array__")
+    assert diamond_client.calls == calls
+
+    restored = pickle.loads(pickle.dumps(builder.get_graph()))
+    with pytest.raises(ValueError):
+        restored.nodes["A"]["filing"].load()
+    store.attach(restored)
+    assert restored.nodes["A"]["filing"].load().get_name() == "Alpha"
+
+
+def test_filing_store_dedupes_fetches(diamond_client):
+    store = FilingStore(diamond_client)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: store.try_get("B", 2023), range(32)))
+    assert store.try_get("missing", 2023) is None
+    assert store.try_get("missing", 2023) is None
+    assert diamond_client.calls == [("B", 2023), ("missing", 2023)]
+
+
+def test_filing_store_wakes_waiters_when_summarizing_fails():
+    # A filing without revenue and expenses cannot be summarized
+    client = FakeClient({"B": FakeFiling("B", "Beta", revexp=None)})
+    store = FilingStore(client)
+    results = []
+    # Daemon threads, so that waiters that are never woken fail the test
+    # rather than hang it
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(store.try_get("B", 2023)), daemon=True
+        )
+        for _ in range(16)
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    for thread in threads:
+        thread.join(timeout=max(0, deadline - time.monotonic()))
+    assert results == [None] * 16
+    with pytest.raises(TypeError):
+        store.get("B", 2023)
+    assert client.calls == [("B", 2023)]
+    assert ("B", 2023) not in store
+
+
+def test_filing_store_prefetch_skips_filings_that_fail_to_summarize():
+    client = BatchFakeClient(
+        {
+            "A": FakeFiling("A", "Alpha"),
+            "B": FakeFiling("B", "Beta", revexp=None),
+            "C": FakeFiling("C", "Gamma"),
+        },
+        indexed={"A", "B"},
+    )
+    store = FilingStore(client)
+
+    filings = store.prefetch(["A", "B", "C"], 2023)
+
+    assert sorted(filings) == ["A"]
+    assert store.failed("B", 2023) and ("B", 2023) not in store
+    assert store.summary("A", 2023)["name"] == "Alpha"
+    # Nothing is left in flight: B is not fetched again, and C is fetched
+    # on its own
+    assert store.try_get("B", 2023) is None
+    assert store.try_get("C", 2023).name == "Gamma"
+    assert client.calls == [("C", 2023)]
+
+
+@pytest.fixture
+def fan_client():
+    # A funds B, C and D with different amounts; each of those funds one more org
+    return FakeClient(
+        {
+            "A": FakeFiling(
+                "A", "Alpha", [("B", 10.0, "b"), ("C", 1000.0, "c"), ("D", 100.0, "d")]
+            ),
+            "B": FakeFiling("B", "Beta", [("E", 1.0, "e")]),
+            "C": FakeFiling("C", "Gamma", [("F", 500.0, "f")]),
+            "D": FakeFiling("D", "Delta", [("G", 50.0, "g")]),
+            "E": FakeFiling("E", "Epsilon"),
+            "F": FakeFiling("F", "Zeta"),
+            "G": FakeFiling("G", "Eta"),
+        }
+    )
+
+
+def test_best_first_spends_budget_on_largest_grants(fan_client):
+    builder = GrantmakerNetworkBuilder(fan_client, max_workers=1)
+    builder.build_network(
+        "A", depth=2, year=2023, budget=CrawlBudget(max_nodes=4), best_first=True
+    )
+    assert set(builder.get_graph().nodes) == {"A", "C", "F", "D"}
+    assert builder.budget_exhausted == "max_nodes"
+
+
+def test_best_first_without_budget_matches_bfs(fan_client):
+    bfs = GrantmakerNetworkBuilder(fan_client)
+    bfs.build_network("A", depth=2, year=2023)
+    best = GrantmakerNetworkBuilder(fan_client)
+    best.build_network("A", depth=2, year=2023, best_first=True)
+    assert set(bfs.get_graph().edges) == set(best.get_graph().edges)
+    assert best.budget_exhausted is None
+
+
+def test_budget_min_grant_amount_and_requests(fan_client):
+    builder = GrantmakerNetworkBuilder(fan_client)
+    builder.build_network(
+        "A", depth=2, year=2023, budget=CrawlBudget(min_grant_amount=100.0)
+    )
+    assert set(builder.get_graph().nodes) == {"A", "C", "D", "F"}
+
+    builder = GrantmakerNetworkBuilder(fan_client, max_workers=1)
+    builder.build_network("A", depth=2, year=2023, budget=CrawlBudget(max_requests=3))
+    assert builder.get_graph().number_of_nodes() == 3
+    assert builder.budget_exhausted == "max_requests"
+
+
+@pytest.mark.parametrize("builder_class", BUILDER_CLASSES)
+@pytest.mark.parametrize("best_first", [False, True])
+def test_resume_from_checkpoint_completes_crawl(
+    fan_client, tmp_path, best_first, builder_class
+):
+    checkpoint = str(tmp_path / "crawl.pkl")
+    builder = builder_class(fan_client, max_workers=1, checkpoint_path=checkpoint)
+    builder.build_network(
+        "A", depth=2, year=2023, budget=CrawlBudget(max_nodes=3), best_first=best_first
+    )
+    assert builder.get_graph().number_of_nodes() == 3
+
+    resumed = builder_class(fan_client, checkpoint_path=checkpoint)
+    resumed.resume()
+    full = GrantmakerNetworkBuilder(fan_client)
+    full.build_network("A", depth=2, year=2023)
+    assert set(resumed.get_graph().nodes) == set(full.get_graph().nodes)
+    assert sorted(resumed.get_graph().edges) == sorted(full.get_graph().edges)
+    assert resumed.get_graph().nodes["C"]["filing"].get_name() == "Gamma"
+
+
+@pytest.mark.parametrize("best_first", [False, True])
+def test_array_builder_matches_networkx_builder(diamond_client, best_first):
+    expected = GrantmakerNetworkBuilder(diamond_client)
+    expected.build_network("A", depth=3, year=2023, best_first=best_first)
+    builder = ArrayGrantmakerNetworkBuilder(diamond_client)
+    builder.build_network("A", depth=3, year=2023, best_first=best_first)
+
+    assert isinstance(builder.graph, ArrayGraph)
+    graph, expected_graph = builder.get_graph(), expected.get_graph()
+    assert list(graph.nodes) == list(expected_graph.nodes)
+    assert sorted((u, v, d["amount"]) for u, v, d in graph.edges(data=True)) == sorted(
+        (u, v, d["amount"]) for u, v, d in expected_graph.edges(data=True)
+    )
+    assert graph.nodes["B"]["name"] == "Beta"
+    assert graph.nodes["B"]["filing"].get_name() == "Beta"
+    assert graph["A"]["B"][0]["__labels__"] == {"GrantFunded"}
+    assert graph.graph["missing_recipients"] == {"X": ["B"]}
+    columns = ["source", "target", "amount", "memo"]
+    assert sorted(builder.edge_table()[columns].itertuples(index=False)) == sorted(
+        expected.edge_table()[columns].itertuples(index=False)
+    )
+
+
+def test_stream_network_without_retaining_the_graph(diamond_client):
+    builder = GrantmakerNetworkBuilder(diamond_client, retain_graph=False)
+    events = list(builder.stream_network("A", depth=5, year=2023, max_pending=2))
+
+    nodes = [e for e in events if e["type"] == "node"]
+    edges = [e for e in events if e["type"] == "edge"]
+    assert [e["id"] for e in nodes] == ["A", "B", "C", "D"]
+    assert nodes[1]["name"] == "Beta" and nodes[1]["label"] == "Organization"
+    assert sorted((e["source"], e["target"], e["amount"]) for e in edges) == [
+        ("A", "B", 100.0),
+        ("A", "C", 50.0),
+        ("B", "D", 10.0),
+        ("C", "D", 20.0),
+        ("D", "A", 1.0),
+    ]
+    assert {e["year"] for e in edges} == {2023}
+    # Every node is seen once, but nothing else is kept
+    assert builder.get_graph().number_of_edges() == 5
+    assert not hasattr(builder.get_graph(), "edges")
+
+    # Closing the stream early stops the crawl
+    stream = GrantmakerNetworkBuilder(diamond_client).stream_network("A", depth=5)
+    assert next(stream)["id"] == "A"
+    stream.close()
+
+
+def test_on_event_sink_matches_ndjson_export(diamond_client, tmp_path):
+    path = tmp_path / "events.ndjson"
+    with export.NDJSONSink(str(path)) as sink:
+        builder = GrantmakerNetworkBuilder(diamond_client, on_event=sink)
+        builder.build_network("A", depth=5, year=2023)
+    builder.write_ndjson(str(tmp_path / "graph.ndjson"))
+
+    def records(name):
+        lines = (tmp_path / name).read_text().splitlines()
+        return sorted(
+            json.dumps({**json.loads(line), "year": None}, sort_keys=True)
+            for line in lines
+        )
+
+    assert records("events.ndjson") == records("graph.ndjson")
+
+
+class IndexedFakeClient(FakeClient):
+    def __init__(self, filings, object_ids):
+        super().__init__(filings)
+        self.object_ids = object_ids
+
+    def download_irs_indices(self, years=None, force=False):
+        pass
+
+    def get_index_object_ids(self, eins, year):
+        return {ein: self.object_ids[ein] for ein in eins if ein in self.object_ids}
+
+    def invalidate_filing(self, ein, year):
+        pass
+
+
+@pytest.mark.parametrize("builder_class", BUILDER_CLASSES)
+def test_refresh_only_refetches_changed_filings(diamond_client, builder_class):
+    client = IndexedFakeClient(
+        dict(diamond_client.filings), {"A": "1", "B": "1", "C": "1", "D": "1"}
+    )
+    builder = builder_class(client, track_index_changes=True)
+    builder.build_network("A", depth=2, year=2023)
+    graph = builder.get_graph()
+    assert graph.nodes["B"]["object_id"] == "1"
+    assert graph.graph["missing_recipients"] == {"X": ["B"]}
+
+    # B files an amended return that funds C instead of D, and X's filing appears
+    client.filings["B"] = FakeFiling("B", "Beta", [("C", 7.0, "c"), ("X", 5.0, "x")])
+    client.filings["X"] = FakeFiling("X", "Chi")
+    client.object_ids.update({"B": "2", "X": "1"})
+    client.calls.clear()
+    builder.refresh(2023)
+    graph = builder.get_graph()
+
+    assert sorted(ein for ein, _ in client.calls) == ["B", "X"]
+    assert sorted(v for _, v in graph.out_edges("B")) == ["C", "X"]
+    assert graph.nodes["B"]["object_id"] == "2"
+    assert graph.nodes["X"]["name"] == "Chi"
+    assert graph.graph["missing_recipients"] == {}
+
+
+def test_aggregate_folds_repeated_grants():
+    client = IndexedFakeClient(
+        {
+            "A": FakeFiling(
+                "A",
+                "Alpha",
+                [
+                    ("B", 100.0, "x"),
+                    ("B", 50.0, "y"),
+                    ("B", 30.0, "z"),
+                    ("C", 5.0, None),
+                ],
+            ),
+            "B": FakeFiling("B", "Beta"),
+            "C": FakeFiling("C", "Gamma"),
+        },
+        {"A": "1", "B": "1", "C": "1"},
+    )
+    builder = GrantmakerNetworkBuilder(
+        client, aggregate=True, max_purposes=2, track_index_changes=True
+    )
+    builder.build_network("A", depth=2, year=2023)
+    graph = builder.get_graph()
+
+    assert not graph.is_multigraph()
+    assert graph.number_of_edges() == 2
+    edge = graph["A"]["B"]
+    assert edge["amount"] == 180.0
+    assert edge["count"] == 3
+    assert edge["max_amount"] == 100.0
+    assert edge["purposes"] == ["x", "y"]
+    assert edge["year"] == 2023
+    assert "grant" not in edge
+    assert graph["A"]["C"]["purposes"] == []
+
+    # A refreshed filing replaces the aggregated edges rather than adding to them
+    client.filings["A"] = FakeFiling("A", "Alpha", [("B", 10.0, "x")])
+    client.object_ids["A"] = "2"
+    builder.refresh(2023)
+    assert list(graph.edges(data="amount")) == [("A", "B", 10.0)]
+
+
+class YearlyFakeClient(FakeClient):
+    def get_full_filing(self, ein, year, month=None, as_json=False):
+        with self._lock:
+            self.calls.append((ein, year))
+            self.request_count += 1
+        if (ein, year) not in self.filings:
+            raise FilingNotFoundError(f"No filings found for EIN {ein} in {year}")
+        return self.filings[(ein, year)]
+
+
+@pytest.mark.parametrize("aggregate", [False, True])
+def test_temporal_network_tags_edges_with_year(aggregate):
+    client = YearlyFakeClient(
+        {
+            ("A", 2022): FakeFiling("A", "Alpha", [("B", 10.0, "b")]),
+            ("A", 2023): FakeFiling(
+                "A", "Alpha Fund", [("B", 20.0, "b"), ("C", 5.0, "c")]
+            ),
+            ("B", 2022): FakeFiling("B", "Beta", net_assets=1.0),
+            ("B", 2023): FakeFiling("B", "Beta", net_assets=2.0),
+            ("C", 2023): FakeFiling("C", "Gamma"),
+        }
+    )
+    builder = TemporalGrantNetworkBuilder(client, aggregate=aggregate)
+    builder.build_network("A", depth=1, years=range(2021, 2024))
+    graph = builder.get_graph()
+
+    assert sorted(
+        (u, v, d["year"], d["amount"]) for u, v, d in graph.edges(data=True)
+    ) == [
+        ("A", "B", 2022, 10.0),
+        ("A", "B", 2023, 20.0),
+        ("A", "C", 2023, 5.0),
+    ]
+    assert graph.nodes["A"]["name"] == "Alpha Fund"
+    assert graph.nodes["B"]["financials"][2022]["net_assets"] == 1.0
+    assert set(graph.nodes["B"]["filings"]) == {2022, 2023}
+
+    snapshot = builder.snapshot(2022)
+    assert set(snapshot.nodes) == {"A", "B"}
+    assert snapshot.number_of_edges() == 1
+    assert graph.graph["unfiled_years"] == [2021]
+    assert graph.graph["failed_years"] == {}
+
+
+class FailingYearClient(YearlyFakeClient):
+    def get_full_filing(self, ein, year, month=None, as_json=False):
+        if year == 2022:
+            raise httpx.ConnectError("Connection refused")
+        return super().get_full_filing(ein, year, month, as_json)
+
+
+def test_temporal_network_records_failed_years():
+    client = FailingYearClient(
+        {
+            ("A", 2022): FakeFiling("A", "Alpha", [("B", 10.0, "b")]),
+            ("A", 2023): FakeFiling("A", "Alpha", [("B", 20.0, "b")]),
+            ("B", 2023): FakeFiling("B", "Beta"),
+        }
+    )
+    builder = TemporalGrantNetworkBuilder(client)
+    builder.build_network("A", depth=1, years=[2021, 2022, 2023])
+    graph = builder.get_graph()
+
+    assert [d["year"] for _, _, d in graph.edges(data=True)] == [2023]
+    assert graph.graph["unfiled_years"] == [2021]
+    assert graph.graph["failed_years"] == {2022: "ConnectError: Connection refused"}
+
+
+def test_temporal_network_finds_unfiled_years_in_the_irs_index(tmp_path, monkeypatch):
+    index_dir = tmp_path / "irs_indices"
+    index_dir.mkdir()
+    header = "RETURN_ID,FILING_TYPE,EIN,TAX_PERIOD,SUB_DATE,TAXPAYER_NAME,RETURN_TYPE,DLN,OBJECT_ID\n"
+    for year in (2022, 2023):
+        (index_dir / f"index_{year}.csv").write_text(
+            header + f"1,EFILE,222222222,{year - 1}12,1/1/{year},OTHER,990,1,{year}01\n"
+        )
+    client = ProPublicaClient(cache_directory=str(tmp_path))
+    # No filing on ProPublica either, so the IRS index is searched without a month
+    monkeypatch.setattr(client, "_propublica_xml", lambda ein, year: None)
+
+    builder = TemporalGrantNetworkBuilder(client)
+    builder.build_network("111111111", depth=1, years=[2021, 2022])
+    graph = builder.get_graph()
+
+    assert graph.graph["unfiled_years"] == [2021, 2022]
+    assert graph.graph["failed_years"] == {}
+
+
+def test_temporal_network_fails_years_whose_index_is_unavailable(
+    tmp_path, monkeypatch
+):
+    client = ProPublicaClient(cache_directory=str(tmp_path))
+    monkeypatch.setattr(client, "_propublica_xml", lambda ein, year: None)
+    # The index download fails, so no index file is written
+    monkeypatch.setattr(client, "download_irs_indices", lambda years: {})
+
+    builder = TemporalGrantNetworkBuilder(client)
+    builder.build_network("111111111", depth=1, years=[2022])
+    graph = builder.get_graph()
+
+    assert graph.graph["unfiled_years"] == []
+    assert graph.graph["failed_years"] == {
+        2022: "IndexUnavailableError: No index data found for 2022"
+    }
+
+
+def test_staff_network_searches_each_name_once():
+    client = FakeClient(
+        {
+            "A": FakeFiling(
+                "A", "Alpha", [("B", 1.0, "b")], staff=["Jane Doe", "Ann Lee"]
+            ),
+            "B": FakeFiling("B", "Beta", staff=["JANE DOE", "Bob Roe"]),
+        }
+    )
+    client.people = {
+        "jane doe": [
+            Person(name="Jane Doe", nonprofit="Gamma Fund", nonprofit_ein="C"),
+            Person(name="Jane Doe", nonprofit="Beta", nonprofit_ein="B"),
+        ]
+    }
+    grants = GrantmakerNetworkBuilder(client)
+    grants.build_network("A", depth=1, year=2023)
+    staff = StaffNetworkBuilder(client, existing_graph=grants.get_graph())
+    staff.build_network()
+    graph = staff.get_graph()
+
+    assert sorted(client.people_searches) == ["Ann Lee", "Bob Roe", "JANE DOE"]
+    assert graph.nodes["Jane Doe"]["__labels__"] == {"Person"}
+    assert graph.nodes["C"]["name"] == "Gamma Fund"
+    assert graph.has_edge("Jane Doe", "C")
+    assert graph.has_edge("B", "Bob Roe")
+
+
+def test_staff_network_links_shared_board_members_offline():
+    client = FakeClient(
+        {
+            "A": FakeFiling("A", "Alpha", [("B", 1.0, "b")], staff=["Jane Doe"]),
+            "B": FakeFiling("B", "Beta", staff=["Bob Roe"]),
+        }
+    )
+    index = OfficerIndex()
+    index.add_record(OfficerRecord(name="Jane Doe", ein="A", organization="Alpha"))
+    index.add_record(OfficerRecord(name="DOE, JANE", ein="B", organization="Beta"))
+    index.add_record(OfficerRecord(name="Bob Roe", ein="C", organization="Gamma"))
+
+    grants = GrantmakerNetworkBuilder(client)
+    grants.build_network("A", depth=1, year=2023)
+    staff = StaffNetworkBuilder(
+        client, existing_graph=grants.get_graph(), officer_index=index
+    )
+    staff.build_network()
+    graph = staff.get_graph()
+
+    assert client.people_searches == []
+    assert graph.has_edge("Jane Doe", "B")
+    assert not graph.has_edge("Jane Doe", "A")
+    assert graph.has_edge("Bob Roe", "C")
+    assert graph.nodes["C"]["name"] == "Gamma"
+
+
+class ScheduleRFiling(FakeFiling):
+    def __init__(self, ein, name, related=(), disregarded=(), transactions=()):
+        super().__init__(ein, name)
+        self.related = [
+            SimpleNamespace(
+                EIN=related_ein,
+                DisregardedEntityName=SimpleNamespace(BusinessNameLine1Txt=name),
+                ControlledOrganizationInd=controlled,
+                DirectControllingEntityName=None,
+                ExemptCodeSectionTxt="501(c)(3)",
+                PublicCharityStatusTxt="3",
+            )
+            for related_ein, name, controlled in related
+        ]
+        self.disregarded = [
+            SimpleNamespace(
+                EIN=entity_ein,
+                DisregardedEntityName=SimpleNamespace(BusinessNameLine1Txt=name),
+                DirectControllingEntityName=SimpleNamespace(
+                    BusinessNameLine1Txt=self.name
+                ),
+                PrimaryActivitiesTxt="Real estate",
+            )
+            for entity_ein, name in disregarded
+        ]
+        self.transactions = [
+            SimpleNamespace(
+                OtherOrganizationName=SimpleNamespace(BusinessNameLine1Txt=name),
+                TransactionTypeTxt=kind,
+                InvolvedAmt=amount,
+                MethodOfAmountDeterminationTxt="Cost",
+            )
+            for name, kind, amount in transactions
+        ]
+
+    def get_related_tax_exempt_orgs(self):
+        return self.related
+
+    def get_disregarded_entities(self):
+        return self.disregarded
+
+    def get_transactions_related_orgs(self):
+        return self.transactions
+
+
+class BatchFakeClient(FakeClient):
+    def __init__(self, filings, indexed):
+        super().__init__(filings)
+        self.indexed = indexed
+        self.bulk_calls = []
+
+    def get_indexed_filings(self, eins, year, max_workers=8):
+        self.bulk_calls.append(sorted(eins))
+        return {ein: self.filings[ein] for ein in eins if ein in self.indexed}
+
+
+def test_related_org_builder_fetches_each_level_in_bulk():
+    client = BatchFakeClient(
+        {
+            "100": ScheduleRFiling(
+                "100",
+                "Health System",
+                related=[("200", "Hospital", "X"), ("300", "Foundation", None)],
+                disregarded=[("900", "Parking LLC")],
+                transactions=[
+                    ("HOSPITAL", "Loans to", 1000.0),
+                    ("Unlisted Partnership", "Sale of assets", 50),
+                ],
+            ),
+            "200": ScheduleRFiling(
+                "200", "Hospital", related=[("100", "Health System", None)]
+            ),
+            "300": ScheduleRFiling(
+                "300", "Foundation", related=[("400", "Clinic", "X")]
+            ),
+            "400": ScheduleRFiling("400", "Clinic"),
+        },
+        indexed={"100", "200", "400"},
+    )
+    builder = RelatedOrgNetworkBuilder(client, max_workers=2)
+    builder.build_network("100", depth=2, year=2023)
+    graph = builder.get_graph()
+
+    # Each level is resolved with one bulk call; 300 is not in the index
+    assert client.bulk_calls == [["100"], ["200", "300"], ["400"]]
+    assert sorted(ein for ein, _ in client.calls) == ["300"]
+    assert graph.nodes["300"]["name"] == "Foundation"
+    assert graph.nodes["400"]["name"] == "Clinic"
+
+    hospital = graph["100"]["200"]
+    labels = sorted(next(iter(e["__labels__"])) for e in hospital.values())
+    assert labels == ["RelatedOrganization", "RelatedTransaction"]
+    related = next(e for e in hospital.values() if "controlled" in e)
+    assert related["controlled"] and not graph["100"]["300"][0]["controlled"]
+    transaction = next(e for e in hospital.values() if "amount" in e)
+    assert (transaction["transaction_type"], transaction["amount"]) == (
+        "Loans to",
+        1000.0,
+    )
+    assert graph.nodes["900"]["__labels__"] == {"DisregardedEntity"}
+    assert graph["100"]["900"][0]["controlling_entity"] == "Health System"
+    assert graph["100"]["Unlisted Partnership"][0]["amount"] == 50.0
+    assert graph.has_edge("200", "100")
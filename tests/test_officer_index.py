@@ -0,0 +1,55 @@
+# test_officer_index.py
+
+from nonprofit_networks.officer_index import OfficerIndex, OfficerRecord
+
+from .filings import filing_json
+
+
+def _filing_json(ein, name, year, officers):
+    return filing_json(
+        ein,
+        name,
+        year,
+        {
+            "IRS990": {
+                "Form990PartVIISectionAGrp": [
+                    {
+                        "PersonNm": person,
+                        "TitleTxt": "Director",
+                        "ReportableCompFromOrgAmt": "0",
+                    }
+                    for person in officers
+                ]
+            }
+        },
+    )
+
+
+def test_lookup_matches_similar_names_across_filings():
+    index = OfficerIndex(threshold=0.9)
+    index.add_filing(_filing_json("1", "Alpha", 2023, ["Jane Q Doe", "Ann Lee"]))
+    index.add_filing(_filing_json("2", "Beta", 2023, ["DOE, JANE", "Bob Roe Jr"]))
+    index.add_filing(_filing_json("2", "Beta", 2023, ["DOE, JANE"]))
+    index.add_record(OfficerRecord(name="Jane Dolan", ein="3"))
+
+    assert len(index) == 5
+    matches = index.lookup("Jane Doe", exclude_ein="1")
+    assert [(record.ein, record.organization) for record, _ in matches] == [
+        ("2", "Beta")
+    ]
+    assert matches[0][1] == 1.0
+    assert [r.ein for r, _ in index.lookup("Bob Roe")] == ["2"]
+    assert [r.ein for r, _ in index.lookup("Jane Doe", threshold=0.7)] == [
+        "1",
+        "2",
+        "3",
+    ]
+    assert index.lookup("Nobody Here") == []
+
+
+def test_common_tokens_are_not_used_for_blocking():
+    index = OfficerIndex(max_block_size=2)
+    for ein, surname in enumerate(["Smith", "Jones", "Brown"]):
+        index.add_record(OfficerRecord(name=f"John {surname}", ein=str(ein)))
+    assert index._candidates("john jones") == {1}
+    assert [r.ein for r, _ in index.lookup("John Jones")] == ["1"]
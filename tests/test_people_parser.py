@@ -0,0 +1,114 @@
+# test_people_parser.py
+
+import os
+import time
+
+import pytest
+
+# BeautifulSoup is a dev dependency, only used as the reference parser
+BeautifulSoup = pytest.importorskip("bs4").BeautifulSoup
+
+from nonprofit_networks.propublica_sdk import Person, _parse_people_page
+
+SAVED_PAGE = os.path.join(os.path.dirname(__file__), "data", "people_search.html")
+
+
+def _reference_parse(html):
+    # The original full-tree parser, kept to check the fast one against
+    soup = BeautifulSoup(html, "html.parser")
+    people = []
+    for person in soup.select(".result-row"):
+        name = person.select_one(".result-item__hed").text.strip()
+        city = (
+            person.select_one(".nowrap.text-sub").text.strip()
+            if person.select_one(".nowrap.text-sub")
+            else None
+        )
+        city_year = str(city).split("•")
+        city = city_year[0] if len(city_year) > 0 else None
+        if len(city_year) > 1:
+            year = city_year[1].strip()
+            if year.isdigit():
+                city = city_year[0].strip()
+                year = int(year.strip())
+            else:
+                year = None
+        else:
+            year = None
+
+        city, state = city.split(",") if city else (None, None)
+        city = city.strip() if city else None
+        state = state.strip() if state else None
+
+        title = person.select_one(".margin-right")
+        if title:
+            at = title.select_one("a")
+            title = title.text.strip().split("at\n")[0].strip()
+            if at:
+                np = at.text.strip().split("\n")[0].strip()
+                np_url = at["href"]
+                np_url = (
+                    str(np_url)
+                    if str(np_url).startswith("http")
+                    else ("https://projects.propublica.org" + str(np_url))
+                )
+                np_ein = np_url.split("organizations/")[-1]
+            else:
+                np = None
+                np_ein = None
+        else:
+            title = None
+            np = None
+            np_ein = None
+
+        people.append(
+            Person(
+                name=name,
+                year=year,
+                city=city,
+                state=state,
+                title=title,
+                nonprofit=np,
+                nonprofit_ein=np_ein,
+            )
+        )
+
+    return people
+
+
+def _read_page():
+    with open(SAVED_PAGE, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_fast_parser_matches_full_tree_parser():
+    html = _read_page()
+    people = _parse_people_page(html)
+
+    assert len(people) == 25
+    assert people == _reference_parse(html)
+    assert any(p.year is None and p.city for p in people)
+    assert any(p.title and p.nonprofit is None for p in people)
+    assert any(p.title is None for p in people)
+    assert _parse_people_page("<html><body>No results</body></html>") == []
+
+
+@pytest.mark.skipif(
+    not os.environ.get("BENCHMARK"), reason="set BENCHMARK=1 to run benchmarks"
+)
+def test_fast_parser_benchmark():
+    # Reports the timings (run with -s to see them), without asserting on
+    # them: they depend on the machine and its load
+    html = _read_page()
+
+    def best_of(parse, runs=5):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            parse(html)
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    reference = best_of(_reference_parse)
+    fast = best_of(_parse_people_page)
+    print(f"full tree: {reference * 1000:.1f} ms, fast: {fast * 1000:.1f} ms")
@@ -1,7 +1,16 @@
 # test_propublica_sdk.py
 
+import zipfile
+
+import httpx
+import pandas as pd
 import pytest
-from nonprofit_networks.propublica_sdk import ProPublicaClient, SearchResponse
+from nonprofit_networks.propublica_sdk import (
+    FilingNotFoundError,
+    Person,
+    ProPublicaClient,
+    SearchResponse,
+)
 
 
 def test_search():
@@ -74,3 +83,291 @@ def test_selective_index_download(tmp_path):
     index_files = list(index_dir.glob("*.csv"))
     assert len(index_files) == 1
     assert "index_2022.csv" in str(index_files[0])
+
+
+def test_search_people_is_cached_by_normalized_name(tmp_path, monkeypatch):
+    client = ProPublicaClient(cache_directory=str(tmp_path / "cache"))
+    pages = []
+
+    def scrape(query, page=1):
+        pages.append((query, page))
+        if page > 1:
+            return []
+        return [Person(name="Jane Doe", nonprofit="Alpha", nonprofit_ein="1")]
+
+    monkeypatch.setattr(client, "_scrape_people_page", scrape)
+    assert len(client.search_people("Jane Doe")) == 1
+    assert len(client.search_people("  jane   DOE ")) == 1
+    assert pages == [("Jane Doe", 1), ("Jane Doe", 2)]
+
+    # A new client reads the results back from the disk cache
+    fresh = ProPublicaClient(cache_directory=str(tmp_path / "cache"))
+    monkeypatch.setattr(fresh, "_scrape_people_page", scrape)
+    assert fresh.search_people("jane doe")[0].nonprofit_ein == "1"
+    assert len(pages) == 2
+
+
+INDEX_HEADER = "RETURN_ID,FILING_TYPE,EIN,TAX_PERIOD,SUB_DATE,TAXPAYER_NAME,RETURN_TYPE,DLN,OBJECT_ID\n"
+
+
+def _index_row(i, ein, name):
+    return f"{i},EFILE,{ein},202212,1/1/2023,{name},990,{i},20230{i}\n"
+
+
+def test_download_irs_indices_revalidates_and_appends(tmp_path, monkeypatch):
+    served = {
+        2022: INDEX_HEADER + _index_row(1, "111111111", "ALPHA FUND"),
+        2023: INDEX_HEADER + _index_row(2, "222222222", "BETA TRUST"),
+    }
+    requests = []
+
+    def handler(request):
+        year = int(request.url.path.split("/")[-2])
+        etag = f'"{hash(served[year])}"'
+        requests.append((year, request.headers.get("If-None-Match")))
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304)
+        return httpx.Response(
+            200, content=served[year].encode(), headers={"ETag": etag}
+        )
+
+    http = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(httpx, "stream", http.stream)
+    client = ProPublicaClient(cache_directory=str(tmp_path))
+
+    statuses = client.download_irs_indices([2022, 2023])
+    assert statuses == {2022: "downloaded", 2023: "downloaded"}
+    assert all(etag is None for _, etag in requests)
+    index_2023 = client._get_index_data(2023)
+    assert client.search_local("gamma").organizations == []
+
+    # The IRS appends filings to the 2023 index and rewrites the 2022 one
+    served[2023] += _index_row(3, "333333333", "GAMMA FOUNDATION")
+    served[2023] += _index_row(4, "042103580", "DELTA TRUST")
+    served[2022] = INDEX_HEADER + _index_row(1, "111111111", "ALPHA FUND INC")
+    requests.clear()
+    statuses = client.download_irs_indices([2022, 2023])
+    assert statuses == {2022: "downloaded", 2023: "appended"}
+    assert all(etag is not None for _, etag in requests)
+
+    # Only the new row was added to what was already loaded
+    assert client._index_cache[2023] is not index_2023
+    assert list(client._index_cache[2023].EIN) == [
+        "222222222",
+        "333333333",
+        "042103580",
+    ]
+    assert client.search_local("gamma").organizations[0].ein == 333333333
+    # EINs keep their leading zeros, so the organization is listed once
+    assert len(client.search_local("delta").organizations) == 1
+    assert client.get_index_object_ids(["42103580"], 2022) == {"42103580": "202304"}
+    assert 2022 not in client._index_cache
+
+    assert client.download_irs_indices([2022, 2023]) == {
+        2022: "unchanged",
+        2023: "unchanged",
+    }
+
+
+def test_sample_from_irs_indices_streams_and_stratifies(tmp_path):
+    index_dir = tmp_path / "irs_indices"
+    index_dir.mkdir()
+    for year in (2022, 2023):
+        rows = "".join(
+            _index_row(i, f"{year}{i:05d}", f"ORG {i}").replace(
+                ",990,", ",990PF," if i % 4 == 0 else ",990,"
+            )
+            for i in range(1, 41)
+        )
+        (index_dir / f"index_{year}.csv").write_text(INDEX_HEADER + rows)
+    client = ProPublicaClient(cache_directory=str(tmp_path))
+
+    sample = client.sample_from_irs_indices(10, years=[2022, 2023], seed=1, chunksize=7)
+    assert len(sample) == 10
+    assert sample.EIN.is_unique
+    assert set(sample.INDEX_YEAR) <= {2022, 2023}
+    assert sample.equals(
+        client.sample_from_irs_indices(10, years=[2022, 2023], seed=1, chunksize=7)
+    )
+
+    stratified = client.sample_from_irs_indices(
+        3, years=[2022, 2023], stratify_by=["INDEX_YEAR", "RETURN_TYPE"], chunksize=7
+    )
+    assert stratified.groupby(["INDEX_YEAR", "RETURN_TYPE"]).size().to_dict() == {
+        (2022, "990"): 3,
+        (2022, "990PF"): 3,
+        (2023, "990"): 3,
+        (2023, "990PF"): 3,
+    }
+    # Strata with fewer rows than requested are returned whole
+    assert len(client.sample_from_irs_indices(100, years=[2022])) == 40
+
+    with pytest.raises(ValueError):
+        client.sample_from_irs_indices(3, years=[2022], stratify_by="STATE")
+
+
+def _filing_xml(
+    name, revenue, net_assets, period="2023-12-31", form="IRS990", schedule=""
+):
+    # Schedules are left unclosed by default, to check that they are not read
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<Return xmlns="http://www.irs.gov/efile" returnVersion="2023v4.0">'
+        f"<ReturnHeader><TaxPeriodEndDt>{period}</TaxPeriodEndDt>"
+        f"<ReturnTypeCd>{form[3:]}</ReturnTypeCd><Filer><EIN>1</EIN>"
+        f"<BusinessName><BusinessNameLine1Txt>{name}</BusinessNameLine1Txt>"
+        "</BusinessName></Filer></ReturnHeader>"
+        f'<ReturnData documentCnt="2"><{form}>'
+        f"<CYTotalRevenueAmt>{revenue}</CYTotalRevenueAmt>"
+        "<CYTotalExpensesAmt>10</CYTotalExpensesAmt>"
+        f"<NetAssetsOrFundBalancesEOYAmt>{net_assets}</NetAssetsOrFundBalancesEOYAmt>"
+        f"</{form}><IRS990ScheduleA>{schedule or '<Broken>'}"
+        "</ReturnData></Return>"
+    )
+
+
+def test_get_financial_history(tmp_path, monkeypatch):
+    index_dir = tmp_path / "irs_indices"
+    index_dir.mkdir()
+    header = INDEX_HEADER.strip() + ",XML_BATCH_ID\n"
+    (index_dir / "index_2024.csv").write_text(
+        header
+        + "1,EFILE,111111111,202312,1/1/2024,ALPHA FUND,990,1,202401,B1\n"
+        + "2,EFILE,222222222,202312,1/1/2024,BETA TRUST,990PF,2,202402,B1\n"
+    )
+    (index_dir / "index_2023.csv").write_text(header)
+    batch_dir = tmp_path / "xml_files" / "2024" / "B1"
+    batch_dir.mkdir(parents=True)
+    with zipfile.ZipFile(batch_dir / "B1.zip", "w") as zf:
+        zf.writestr("202401_public.xml", _filing_xml("ALPHA FUND", 1500, 900))
+        zf.writestr(
+            "202402_public.xml", _filing_xml("BETA TRUST", 0, 0, form="IRS990PF")
+        )
+    client = ProPublicaClient(cache_directory=str(tmp_path))
+    monkeypatch.setattr(client, "_propublica_xml", lambda ein, year: None)
+
+    history = client.get_financial_history(
+        ["111111111", "222222222"], [2022, 2023], max_workers=4
+    )
+
+    assert list(history.index) == [
+        ("111111111", 2022),
+        ("111111111", 2023),
+        ("222222222", 2022),
+        ("222222222", 2023),
+    ]
+    alpha = history.loc[("111111111", 2023)]
+    assert alpha["name"] == "ALPHA FUND"
+    assert alpha["tax_period"] == 202312
+    assert (alpha["revenue"], alpha["expenses"], alpha["net_assets"]) == (
+        1500.0,
+        10.0,
+        900.0,
+    )
+    assert not alpha["missing"]
+    beta = history.loc[("222222222", 2023)]
+    assert beta["return_type"] == "990PF" and pd.isna(beta["revenue"])
+    assert history.loc[("111111111", 2022), "missing"]
+    assert history.loc[("111111111", 2022), "error"] == "No filing found"
+
+
+def test_get_indexed_filings_reads_each_batch_once(tmp_path, monkeypatch):
+    index_dir = tmp_path / "irs_indices"
+    index_dir.mkdir()
+    (index_dir / "index_2024.csv").write_text(
+        INDEX_HEADER.strip()
+        + ",XML_BATCH_ID\n"
+        + "1,EFILE,111111111,202312,1/1/2024,ALPHA,990,1,202401,B1\n"
+        + "2,EFILE,222222222,202312,1/1/2024,BETA,990,2,202402,B2\n"
+        + "3,EFILE,333333333,202312,1/1/2024,GAMMA,990,3,202403,B1\n"
+    )
+    for batch, members in {"B1": ("202401", "202403"), "B2": ("202402",)}.items():
+        batch_dir = tmp_path / "xml_files" / "2024" / batch
+        batch_dir.mkdir(parents=True)
+        with zipfile.ZipFile(batch_dir / f"{batch}.zip", "w") as zf:
+            for object_id in members:
+                zf.writestr(
+                    f"{object_id}_public.xml",
+                    _filing_xml(
+                        f"ORG {object_id}", 1, 1, schedule="</IRS990ScheduleA>"
+                    ),
+                )
+    client = ProPublicaClient(cache_directory=str(tmp_path))
+    batches = []
+    read = client._read_indexed_filing
+    monkeypatch.setattr(
+        client,
+        "_read_indexed_filing",
+        lambda year, object_id, batch_id, as_json: (
+            batches.append(batch_id) or read(year, object_id, batch_id, as_json)
+        ),
+    )
+
+    filings = client.get_indexed_filings(
+        ["11-1111111", "222222222", "333333333", "444444444"], 2023, as_json=True
+    )
+
+    assert sorted(filings) == ["11-1111111", "222222222", "333333333"]
+    assert (
+        filings["333333333"]["Return"]["ReturnHeader"]["Filer"]["BusinessName"][
+            "BusinessNameLine1Txt"
+        ]
+        == "ORG 202403"
+    )
+    # The members of a batch are read one after the other, by one worker
+    assert sorted(batches) == ["B1", "B1", "B2"]
+    assert client.stats()["filings"] == 3
+
+
+def test_get_full_filing_without_month_reads_the_latest_indexed_filing(
+    tmp_path, monkeypatch
+):
+    index_dir = tmp_path / "irs_indices"
+    index_dir.mkdir()
+    (index_dir / "index_2024.csv").write_text(
+        INDEX_HEADER.strip()
+        + ",XML_BATCH_ID\n"
+        + "1,EFILE,111111111,202306,1/1/2024,ALPHA,990,1,202401,B1\n"
+        + "2,EFILE,111111111,202312,1/1/2024,ALPHA,990,2,202402,B1\n"
+    )
+    batch_dir = tmp_path / "xml_files" / "2024" / "B1"
+    batch_dir.mkdir(parents=True)
+    with zipfile.ZipFile(batch_dir / "B1.zip", "w") as zf:
+        for object_id in ("202401", "202402"):
+            zf.writestr(
+                f"{object_id}_public.xml",
+                _filing_xml(f"ORG {object_id}", 1, 1, schedule="</IRS990ScheduleA>"),
+            )
+    client = ProPublicaClient(cache_directory=str(tmp_path))
+    monkeypatch.setattr(client, "_propublica_xml", lambda ein, year: None)
+
+    filing = client.get_full_filing("111111111", 2023, as_json=True)
+    assert (
+        filing["Return"]["ReturnHeader"]["Filer"]["BusinessName"][
+            "BusinessNameLine1Txt"
+        ]
+        == "ORG 202402"
+    )
+    with pytest.raises(FilingNotFoundError):
+        client.get_full_filing("222222222", 2023)
+
+
+def test_iter_sample_filings_fetches_a_bounded_window(tmp_path, monkeypatch):
+    sample = pd.DataFrame(
+        {"INDEX_YEAR": [2024] * 100, "OBJECT_ID": [str(i) for i in range(100)]}
+    )
+    client = ProPublicaClient(cache_directory=str(tmp_path))
+    fetched = []
+
+    def read(year, object_id, batch_id, as_json=False):
+        fetched.append(object_id)
+        return {"object_id": object_id}
+
+    monkeypatch.setattr(client, "_read_indexed_filing", read)
+    filings = client.iter_sample_filings(sample, max_workers=2)
+    first = [next(filings) for _ in range(3)]
+    filings.close()
+
+    assert [filing["object_id"] for _, filing in first] == ["0", "1", "2"]
+    # The three rows taken, and at most 2 * max_workers rows ahead of them
+    assert len(fetched) <= 3 + 2 * 2
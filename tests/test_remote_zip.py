@@ -0,0 +1,181 @@
+# test_remote_zip.py
+
+import io
+from concurrent.futures import ThreadPoolExecutor
+import os
+import time
+import zipfile
+
+import httpx
+import pytest
+
+from nonprofit_networks.cache_files import open_cached
+from nonprofit_networks.propublica_sdk import ProPublicaClient
+from nonprofit_networks.remote_zip import (
+    HttpRangeFile,
+    RangeNotSupported,
+    parse_content_range,
+)
+
+FILING_XML = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    "<Return><ReturnHeader><TaxYr>2023</TaxYr></ReturnHeader></Return>"
+)
+
+
+def _batch_zip(filler_members=20):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i in range(filler_members):
+            # Incompressible, so the zip is much bigger than one filing
+            zf.writestr(f"2024010{i:02d}_public.xml", os.urandom(100_000))
+        zf.writestr("202401999_public.xml", FILING_XML)
+    return buffer.getvalue()
+
+
+class ZipServer:
+    def __init__(self, content, ranges=True):
+        self.content = content
+        self.ranges = ranges
+        self.bytes_sent = 0
+        self.requests = 0
+
+    def __call__(self, request):
+        self.requests += 1
+        header = request.headers.get("Range")
+        if not self.ranges or not header:
+            self.bytes_sent += len(self.content)
+            return httpx.Response(200, content=self.content)
+        first, last = header.removeprefix("bytes=").split("-")
+        size = len(self.content)
+        if not first:
+            first, last = max(size - int(last), 0), size - 1
+        first, last = int(first), min(int(last), size - 1)
+        body = self.content[first : last + 1]
+        self.bytes_sent += len(body)
+        return httpx.Response(
+            206,
+            content=body,
+            headers={"Content-Range": f"bytes {first}-{last}/{size}"},
+        )
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    def serve(server):
+        http = httpx.Client(transport=httpx.MockTransport(server))
+        monkeypatch.setattr(httpx, "get", http.get)
+        monkeypatch.setattr(httpx, "stream", http.stream)
+        return server
+
+    return serve
+
+
+def test_range_file_reads_like_a_local_file():
+    content = _batch_zip(filler_members=3)
+    fetched = []
+
+    def fetch(start, end):
+        fetched.append((start, end))
+        return content[start : end + 1]
+
+    f = HttpRangeFile(fetch, len(content), tail=content[-100:], min_fetch=1000)
+    with zipfile.ZipFile(f) as zf:
+        assert zf.read("202401999_public.xml").decode() == FILING_XML
+        assert len(zf.namelist()) == 4
+    assert f.bytes_fetched < len(content) / 10
+    assert parse_content_range("bytes 0-9/10") == (0, 9, 10)
+    with pytest.raises(RangeNotSupported):
+        parse_content_range(None)
+
+
+def test_remote_zip_fetches_only_the_filing(tmp_path, serve):
+    content = _batch_zip()
+    server = serve(ZipServer(content))
+    client = ProPublicaClient(cache_directory=str(tmp_path), remote_zip=True)
+
+    path = client._download_xml_batch(2024, "202401999", "b1")
+    with open_cached(path) as f:
+        assert f.read().decode() == FILING_XML
+    assert not (tmp_path / "xml_files" / "2024" / "B1" / "B1.zip").exists()
+    assert server.bytes_sent < len(content) / 10
+
+    # The central directory is kept, and a missing filing costs no request
+    requests = server.requests
+    assert client._download_xml_batch(2024, "999999999", "B1") is None
+    assert server.requests == requests
+
+
+def test_remote_zip_falls_back_to_whole_download(tmp_path, serve):
+    content = _batch_zip(filler_members=2)
+    server = serve(ZipServer(content, ranges=False))
+    client = ProPublicaClient(cache_directory=str(tmp_path), remote_zip=True)
+
+    path = client._download_xml_batch(2024, "202401999", "B1")
+    with open_cached(path) as f:
+        assert f.read().decode() == FILING_XML
+    assert (tmp_path / "xml_files" / "2024" / "B1" / "B1.zip").read_bytes() == content
+    # One range probe, then the whole zip
+    assert server.requests == 2
+
+
+def test_remote_batches_are_read_concurrently(tmp_path, serve):
+    batches = {f"B{i}": _batch_zip(filler_members=1) for i in range(8)}
+
+    def server(request):
+        batch = request.url.path.rsplit("/", 1)[-1].removesuffix(".zip")
+        return ZipServer(batches[batch])(request)
+
+    serve(server)
+    client = ProPublicaClient(cache_directory=str(tmp_path), remote_zip=True)
+
+    def read(task):
+        round, batch = task
+        # Use a separate directory per round, so every lookup reads remotely
+        batch_dir = str(tmp_path / f"round{round}" / batch)
+        return client._extract_remote_filing(2024, "202401999", batch, batch_dir)
+
+    tasks = [(round, batch) for round in range(4) for batch in batches]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        paths = list(pool.map(read, tasks))
+
+    assert all(path is not None for path in paths)
+    assert len(client._remote_zips) == 4
+
+
+def test_concurrent_reads_of_one_remote_batch_are_coalesced(tmp_path, serve):
+    object_ids = [f"20240199{i}" for i in range(8)]
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i, object_id in enumerate(object_ids):
+            zf.writestr(f"{object_id}_public.xml", FILING_XML)
+            # Far enough apart that each filing would take its own request
+            zf.writestr(f"filler{i}.bin", os.urandom(100_000))
+    content = buffer.getvalue()
+    client = ProPublicaClient(cache_directory=str(tmp_path), remote_zip=True)
+    zip_server = ZipServer(content)
+
+    def server(request):
+        if request.headers["Range"].startswith("bytes=-"):
+            # Hold the central directory until every reader is waiting
+            deadline = time.monotonic() + 5
+            while (
+                sum(client._remote_wanted.get("2024/B1", {}).values()) < 8
+                and time.monotonic() < deadline
+            ):
+                time.sleep(0.01)
+        return zip_server(request)
+
+    serve(server)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        paths = list(
+            pool.map(
+                lambda object_id: client._download_xml_batch(2024, object_id, "B1"),
+                object_ids,
+            )
+        )
+
+    assert all(path is not None for path in paths)
+    # One central directory read, then one range for all eight filings
+    assert zip_server.requests == 2
+    assert client._remote_wanted == {}
@@ -0,0 +1,39 @@
+# test_utils.py
+
+import math
+
+import pytest
+
+from nonprofit_networks.utils import FilingIndex, as_amount, as_list, filing_rows
+
+from .filings import filing_json
+
+
+def test_amounts_are_parsed_with_one_rule():
+    assert as_amount("1,234") == 1234.0
+    assert as_amount(" $1,234.50 ") == 1234.5
+    assert as_amount(7) == 7.0
+    assert as_amount(None) is None
+    assert as_amount("", default=0.0) == 0.0
+    assert as_amount("n/a", default=0.0) == 0.0
+    assert math.isnan(as_amount(True, default=math.nan))
+
+
+def test_filing_rows_of_parsed_xml():
+    row = {"PersonNm": "Jane Doe"}
+    filing = filing_json("1", "Alpha", 2023, {"IRS990": {"Grp": row}})
+    assert as_list(None) == [] and as_list(row) == [row]
+    assert filing_rows(filing, "get_rows", "Return.ReturnData.IRS990.Grp") == (
+        "1",
+        "Alpha",
+        2023,
+        [row],
+    )
+
+
+def test_filing_indices_must_implement_add_filing():
+    class Incomplete(FilingIndex):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,117 @@
+# test_vendor_index.py
+
+from nonprofit_networks.network_builder import VendorNetworkBuilder
+from nonprofit_networks.vendor_index import (
+    VendorIndex,
+    VendorRecord,
+    canonical_address,
+    canonical_name,
+    vendor_key,
+)
+
+from .filings import filing_json
+
+
+def _contractor(name, address, zip_code, services="Legal", amount="250000"):
+    return {
+        "ContractorName": {"BusinessName": {"BusinessNameLine1Txt": name}},
+        "ContractorAddress": {
+            "USAddress": {
+                "AddressLine1Txt": address,
+                "CityNm": "Boston",
+                "StateAbbreviationCd": "MA",
+                "ZIPCd": zip_code,
+            }
+        },
+        "ServicesDesc": services,
+        "CompensationAmt": amount,
+    }
+
+
+def _filing_json(ein, name, year, contractors):
+    return filing_json(
+        ein, name, year, {"IRS990": {"ContractorCompensationGrp": contractors}}
+    )
+
+
+def test_names_and_addresses_are_canonical():
+    assert canonical_name("Smith & Jones, L.L.P.") == "smith jones"
+    assert canonical_name("SMITH AND JONES LLP") == "smith jones"
+    assert canonical_address("100 Main Street, Suite 5") == "100 main st ste 5"
+    assert vendor_key("Smith & Jones, LLP", "02110-1234") == vendor_key(
+        "SMITH AND JONES", "02110"
+    )
+    assert vendor_key("Smith & Jones", "02110") != vendor_key("Smith & Jones", "10001")
+
+
+def test_near_duplicates_are_merged_within_a_block():
+    index = VendorIndex(threshold=0.9)
+    filings = [
+        _filing_json(
+            "1",
+            "Alpha",
+            2023,
+            [
+                _contractor("Smith & Jones LLP", "100 Main Street", "02110"),
+                _contractor("Acme Consulting Inc", "5 Elm St", "02110", "Consulting"),
+            ],
+        ),
+        # A single row is not wrapped in a list
+        _filing_json(
+            "2", "Beta", 2023, _contractor("Smtih and Jones", "100 Main St", "02110")
+        ),
+        _filing_json(
+            "3",
+            "Gamma",
+            2023,
+            [_contractor("Smith & Jones LLP", "1 Broadway", "10001")],
+        ),
+    ]
+    index.add_filings(filings)
+    index.add_filings(filings[:1])
+
+    assert len(index) == 4
+    boston = index.lookup("SMITH & JONES", "02110")
+    assert boston == index.lookup("Smtih and Jones LLP", "02110")
+    assert boston != index.lookup("Smith & Jones", "10001")
+    assert index.lookup("Acme Consulting", "02110") not in (None, boston)
+    assert index.lookup("Nobody", "02110") is None
+
+    by_name = VendorIndex(match_address=False)
+    by_name.add_filings(filings)
+    assert len(dict(by_name.vendors())) == 2
+
+    index.add_record(VendorRecord(name="Smith Jones", ein="4", zip="02110"))
+    vendors = dict(index.vendors())
+    assert sorted(r.ein for r in vendors[boston]) == ["1", "2", "4"]
+
+
+def test_vendor_network_is_bipartite():
+    filings = [
+        _filing_json(
+            "1",
+            "Alpha",
+            2023,
+            [_contractor("Smith & Jones LLP", "100 Main Street", "02110")],
+        ),
+        _filing_json(
+            "2",
+            "Beta",
+            2022,
+            [_contractor("SMITH AND JONES", "100 Main St", "02110", amount="1,000")],
+        ),
+    ]
+    builder = VendorNetworkBuilder()
+    builder.build_network(filings)
+    builder.build_network([])
+    graph = builder.get_graph()
+
+    vendors = [n for n, d in graph.nodes(data=True) if d["__labels__"] == {"Vendor"}]
+    assert len(vendors) == 1
+    vendor = graph.nodes[vendors[0]]
+    assert vendor["aliases"] == ["SMITH AND JONES", "Smith & Jones LLP"]
+    assert vendor["address"] == "100 main st"
+    assert graph.nodes["2"]["name"] == "Beta"
+    assert graph.number_of_edges() == 2
+    edge = graph["2"][vendors[0]][0]
+    assert (edge["amount"], edge["memo"], edge["year"]) == (1000.0, "Legal", 2022)